@@ -3,77 +3,28 @@ Advanced Elliott Wave Optimizer
 Tests logic variations, not just parameters
 """
 
-import yfinance as yf
-import pandas as pd
+import os
+import sys
 import numpy as np
 from itertools import product
 import warnings
 warnings.filterwarnings('ignore')
 
-print("Downloading NQ 4H data...")
-ticker = yf.Ticker("NQ=F")
-df = ticker.history(period="2y", interval="4h")
-print(f"Downloaded {len(df)} bars")
-
-opens = df['Open'].values
-highs = df['High'].values
-lows = df['Low'].values
-closes = df['Close'].values
-volumes = df['Volume'].values
-
-# Calculate indicators
-def calc_ema(data, period):
-    ema = np.zeros(len(data))
-    ema[0] = data[0]
-    mult = 2 / (period + 1)
-    for i in range(1, len(data)):
-        ema[i] = (data[i] * mult) + (ema[i-1] * (1 - mult))
-    return ema
-
-def calc_rsi(data, period=14):
-    rsi = np.zeros(len(data))
-    for i in range(period, len(data)):
-        gains = 0
-        losses = 0
-        for j in range(i - period, i):
-            change = data[j+1] - data[j]
-            if change > 0:
-                gains += change
-            else:
-                losses -= change
-        avg_gain = gains / period
-        avg_loss = losses / period
-        if avg_loss == 0:
-            rsi[i] = 100
-        else:
-            rs = avg_gain / avg_loss
-            rsi[i] = 100 - (100 / (1 + rs))
-    return rsi
-
-def calc_atr(highs, lows, closes, period=14):
-    atr = np.zeros(len(closes))
-    for i in range(1, len(closes)):
-        tr = max(highs[i] - lows[i], abs(highs[i] - closes[i-1]), abs(lows[i] - closes[i-1]))
-        if i < period:
-            atr[i] = tr
-        else:
-            atr[i] = (atr[i-1] * (period - 1) + tr) / period
-    return atr
-
-ema50 = calc_ema(closes, 50)
-ema200 = calc_ema(closes, 200)
-rsi = calc_rsi(closes, 14)
-atr = calc_atr(highs, lows, closes, 14)
-avg_volume = pd.Series(volumes).rolling(20).mean().values
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backtest'))
+from bars import BarArrays
+from indicators import shared_cache
+from pivots import find_pivots
 
 def find_zigzag(highs, lows, depth=12, deviation=2.0):
     pivots = []
     direction = 0
     last_price = 0
     
-    for i in range(depth, len(highs) - depth):
-        is_ph = all(highs[i] > highs[i-j] and highs[i] > highs[i+j] for j in range(1, depth + 1))
-        is_pl = all(lows[i] < lows[i-j] and lows[i] < lows[i+j] for j in range(1, depth + 1))
+    ph_mask, pl_mask = find_pivots(highs, lows, depth, ignore_nan=False)
+    
+    for i in np.flatnonzero(ph_mask | pl_mask).tolist():
+        is_ph = ph_mask[i]
+        is_pl = pl_mask[i]
         
         if is_ph:
             if direction == -1 and last_price > 0 and abs(highs[i] - last_price) / last_price * 100 >= deviation:
@@ -99,9 +50,34 @@ def find_zigzag(highs, lows, depth=12, deviation=2.0):
     
     return pivots
 
-pivots = find_zigzag(highs, lows, 12, 2.0)
-
-def backtest(params):
+def load_data():
+    """Download NQ 4H bars from Yahoo Finance; returns the arrays backtest() takes, by name"""
+    import yfinance as yf
+    print("Downloading NQ 4H data...")
+    ticker = yf.Ticker("NQ=F")
+    df = ticker.history(period="2y", interval="4h")
+    print(f"Downloaded {len(df)} bars")
+
+    opens = df['Open'].values
+    highs = df['High'].values
+    lows = df['Low'].values
+    closes = df['Close'].values
+    volumes = df['Volume'].values
+
+    # Calculate indicators
+    bars = BarArrays.from_df(df)
+    indicators = shared_cache(bars)
+    ema200 = indicators.get('recursive_ema', 200)
+    rsi = indicators.get('window_rsi', 14).copy()
+    rsi[:14] = 0
+    avg_volume = indicators.get('volume_sma', 20)
+
+    pivots = find_zigzag(highs, lows, 12, 2.0)
+
+    return {'opens': opens, 'highs': highs, 'lows': lows, 'closes': closes, 'volumes': volumes,
+            'ema200': ema200, 'rsi': rsi, 'avg_volume': avg_volume, 'pivots': pivots}
+
+def backtest(params, opens, highs, lows, closes, volumes, ema200, rsi, avg_volume, pivots):
     min_strength = params['min_strength']
     sl_pct = params['sl_pct']
     tp_fib = params['tp_fib']
@@ -198,39 +174,46 @@ param_grid = {
     'require_sweep': [True, False]
 }
 
-combinations = [dict(zip(param_grid.keys(), v)) for v in product(*param_grid.values())]
-print(f"\nTesting {len(combinations)} combinations...\n")
-
-results = []
-best = None
-
-for i, params in enumerate(combinations):
-    result = backtest(params)
-    results.append(result)
-    if result['win_rate'] > (best['win_rate'] if best else 0) and result['signals'] >= 10:
-        best = result
-    if (i + 1) % 200 == 0:
-        print(f"Progress: {i+1}/{len(combinations)} - Best so far: {best['win_rate']:.1f}%" if best else f"Progress: {i+1}/{len(combinations)}")
-
-results.sort(key=lambda x: (x['win_rate'], x['signals']), reverse=True)
-
-print("\n" + "="*70)
-print("TOP 10 RESULTS")
-print("="*70)
-
-for i, r in enumerate(results[:10]):
-    if r['signals'] >= 5:
-        p = r['params']
-        print(f"\n#{i+1} Win Rate: {r['win_rate']:.1f}% ({r['wins']}/{r['wins']+r['losses']}) - {r['signals']} signals")
-        print(f"   min_str={p['min_strength']}, SL={p['sl_pct']}%, TP={p['tp_fib']}, gap={p['signal_gap']}")
-        print(f"   trend={p['use_trend_filter']}, rsi={p['use_rsi_filter']}, vol={p['use_volume_filter']}, sweep={p['require_sweep']}")
-
-print("\n" + "="*70)
-print("BEST CONFIGURATION")
-print("="*70)
-if best:
-    print(f"\nWin Rate: {best['win_rate']:.1f}%")
-    print(f"Signals: {best['signals']} ({best['wins']} wins, {best['losses']} losses)")
-    print(f"\nParameters:")
-    for k, v in best['params'].items():
-        print(f"  {k}: {v}")
+def main():
+    data = load_data()
+
+    combinations = [dict(zip(param_grid.keys(), v)) for v in product(*param_grid.values())]
+    print(f"\nTesting {len(combinations)} combinations...\n")
+
+    results = []
+    best = None
+
+    for i, params in enumerate(combinations):
+        result = backtest(params, **data)
+        results.append(result)
+        if result['win_rate'] > (best['win_rate'] if best else 0) and result['signals'] >= 10:
+            best = result
+        if (i + 1) % 200 == 0:
+            print(f"Progress: {i+1}/{len(combinations)} - Best so far: {best['win_rate']:.1f}%" if best else f"Progress: {i+1}/{len(combinations)}")
+
+    results.sort(key=lambda x: (x['win_rate'], x['signals']), reverse=True)
+
+    print("\n" + "="*70)
+    print("TOP 10 RESULTS")
+    print("="*70)
+
+    for i, r in enumerate(results[:10]):
+        if r['signals'] >= 5:
+            p = r['params']
+            print(f"\n#{i+1} Win Rate: {r['win_rate']:.1f}% ({r['wins']}/{r['wins']+r['losses']}) - {r['signals']} signals")
+            print(f"   min_str={p['min_strength']}, SL={p['sl_pct']}%, TP={p['tp_fib']}, gap={p['signal_gap']}")
+            print(f"   trend={p['use_trend_filter']}, rsi={p['use_rsi_filter']}, vol={p['use_volume_filter']}, sweep={p['require_sweep']}")
+
+    print("\n" + "="*70)
+    print("BEST CONFIGURATION")
+    print("="*70)
+    if best:
+        print(f"\nWin Rate: {best['win_rate']:.1f}%")
+        print(f"Signals: {best['signals']} ({best['wins']} wins, {best['losses']} losses)")
+        print(f"\nParameters:")
+        for k, v in best['params'].items():
+            print(f"  {k}: {v}")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,10 +6,18 @@ Python implementation for testing and optimization
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
 import json
 import os
 
+from bars import BarArrays, as_bars, engine_frame
+from pivots import cached_zigzag, bullish_swings
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_signals, resolve_table
+from signal_table import SignalTable
+from datacache import read_csv_cached
+
 @dataclass
 class Signal:
     bar: int
@@ -19,6 +27,7 @@ class Signal:
     filled: bool = False
     filled_bar: int = 0
     result: int = 0  # 0=open, 1=win, -1=loss
+    exit_bar: int = -1  # bar where TP/SL was hit, -1 while open
 
 @dataclass
 class BacktestResult:
@@ -27,23 +36,31 @@ class BacktestResult:
     losses: int
     open_trades: int
     win_rate: float
-    signals: List[Signal]
+    signals: SignalTable  # indexing/iterating gives Signal objects
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class ElliottICTBacktester:
-    def __init__(self, df: pd.DataFrame, params: dict = None):
+    # Methods timed as nested stages when profiling is on
+    PROFILE_CALLS = {'check_fib_entry': 'signals.setup'}
+    
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], params: dict = None):
         """
-        df: DataFrame with columns: Open, High, Low, Close, Volume
+        df: BarArrays (shared, not copied) or DataFrame with columns: Open, High, Low, Close, Volume
         params: dict with backtesting parameters
+        self.df is this instance's own frame over the shared arrays (see
+        bars.engine_frame): extra DataFrame columns are kept, added ones stay local
         """
-        self.df = df.copy()
-        # Normalize column names
-        self.df.columns = [str(c).lower() for c in self.df.columns]
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
         # Make sure we have required columns
         required = ['open', 'high', 'low', 'close', 'volume']
         for col in required:
             if col not in self.df.columns:
                 raise ValueError(f"Missing required column: {col}")
         
+        # Indicator columns are shared by every backtester built from this df
+        self.indicators = shared_cache(df, self.df)
+        
         # Default parameters (OPTIMIZED v21)
         self.params = {
             'sl_pct': 6.0,
@@ -66,67 +83,27 @@ class ElliottICTBacktester:
         if params:
             self.params.update(params)
         
-        self.signals: List[Signal] = []
+        self.signals = SignalTable(Signal)
         self.zigzag_points = []
+        self._pivot_count = np.zeros(len(self.df), dtype=np.int64)
         
     def calculate_rsi(self, period=14) -> pd.Series:
-        delta = self.df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        return self.indicators.series('rsi', period)
     
     def calculate_zigzag(self) -> List[Tuple[int, float, int]]:
         """Returns list of (bar_index, price, direction) where direction: 1=high, -1=low"""
-        depth = self.params['zz_depth']
-        dev = self.params['zz_dev']
-        
-        highs = self.df['high'].values
-        lows = self.df['low'].values
-        
-        points = []
-        direction = 0
-        last_price = 0.0
-        
-        for i in range(depth, len(self.df) - depth):
-            # Check for pivot high
-            is_ph = True
-            for j in range(1, depth + 1):
-                if highs[i] <= highs[i - j] or highs[i] <= highs[i + j]:
-                    is_ph = False
-                    break
-            
-            # Check for pivot low
-            is_pl = True
-            for j in range(1, depth + 1):
-                if lows[i] >= lows[i - j] or lows[i] >= lows[i + j]:
-                    is_pl = False
-                    break
-            
-            if is_ph and direction != 1:
-                if last_price == 0 or abs(highs[i] - last_price) / last_price * 100 >= dev:
-                    if direction == 1 and points and highs[i] > points[-1][1]:
-                        points[-1] = (i, highs[i], 1)
-                    else:
-                        points.append((i, highs[i], 1))
-                    direction = 1
-                    last_price = highs[i]
-            
-            if is_pl and direction != -1:
-                if last_price == 0 or abs(lows[i] - last_price) / last_price * 100 >= dev:
-                    if direction == -1 and points and lows[i] < points[-1][1]:
-                        points[-1] = (i, lows[i], -1)
-                    else:
-                        points.append((i, lows[i], -1))
-                    direction = -1
-                    last_price = lows[i]
-        
-        self.zigzag_points = points
-        return points
+        self.zigzag_points, self._pivot_count = cached_zigzag(
+            self.bars, self.params['zz_depth'], self.params['zz_dev'])
+        return self.zigzag_points
+    
+    def recent_pivots(self, bar: int, count: int = 3) -> List[Tuple[int, float, int]]:
+        """Last `count` ZigZag points confirmed at or before bar"""
+        n = self._pivot_count[bar]
+        return self.zigzag_points[max(0, n - count):n]
     
     def check_wave2_setup(self, bar: int) -> Tuple[bool, float]:
         """Check if we have a valid Wave 2 setup at given bar"""
-        points = [p for p in self.zigzag_points if p[0] <= bar]
+        points = self.recent_pivots(bar)
         if len(points) < 3:
             return False, 0.0
         
@@ -146,7 +123,7 @@ class ElliottICTBacktester:
     
     def check_fib_entry(self, bar: int) -> Tuple[bool, float, float, float]:
         """Check if price is at 0.79 Fib retracement level for BULLISH setup"""
-        points = [p for p in self.zigzag_points if p[0] <= bar]
+        points = self.recent_pivots(bar)
         if len(points) < 2:
             return False, 0.0, 0.0, 0.0
         
@@ -203,20 +180,20 @@ class ElliottICTBacktester:
         
         # Trend filter (EMA 200)
         if self.params['use_trend_filter']:
-            ema = self.df['close'].rolling(self.params['ema_period']).mean().iloc[bar]
-            if not pd.isna(ema) and close > ema:
+            ema = self.indicators.get('sma', self.params['ema_period'])[bar]
+            if not np.isnan(ema) and close > ema:
                 score += 1
         
         # RSI filter
         if self.params['use_rsi_filter']:
-            rsi = self.calculate_rsi().iloc[bar]
-            if not pd.isna(rsi) and rsi < self.params['rsi_threshold']:
+            rsi = self.indicators.get('rsi', 14)[bar]
+            if not np.isnan(rsi) and rsi < self.params['rsi_threshold']:
                 score += 1
         
         # Volume filter
         if self.params['use_volume_filter']:
-            avg_vol = self.df['volume'].rolling(20).mean().iloc[bar]
-            if not pd.isna(avg_vol) and self.df['volume'].iloc[bar] > avg_vol * 0.8:
+            avg_vol = self.indicators.get('volume_sma', 20)[bar]
+            if not np.isnan(avg_vol) and self.df['volume'].iloc[bar] > avg_vol * 0.8:
                 score += 1
         
         # Bullish candle
@@ -225,13 +202,14 @@ class ElliottICTBacktester:
         
         return score
     
-    def run_backtest(self) -> BacktestResult:
-        """Run the backtest"""
-        self.signals = []
-        self.calculate_zigzag()
-        
+    def generate_signals(self) -> SignalTable:
+        """Scan bar by bar for Fib entries (calculate_zigzag must have run)"""
+        signals = SignalTable(Signal)
         last_signal_bar = -self.params['signal_gap'] - 1
         
+        if self.params['use_trend_filter']:
+            trend_ma = self.indicators.get('sma', self.params['ema_period'])
+        
         # Generate signals
         for bar in range(self.params['zz_depth'] + 1, len(self.df) - 1):
             # Check gap between signals
@@ -256,8 +234,8 @@ class ElliottICTBacktester:
             
             # Check trend filter
             if self.params['use_trend_filter']:
-                ema = self.df['close'].rolling(self.params['ema_period']).mean().iloc[bar]
-                if pd.isna(ema) or self.df['close'].iloc[bar] <= ema:
+                ema = trend_ma[bar]
+                if np.isnan(ema) or self.df['close'].iloc[bar] <= ema:
                     continue
             
             # Signal fires! Entry at the 0.79 Fib price
@@ -274,37 +252,71 @@ class ElliottICTBacktester:
             rr_ratio = self.params.get('rr_ratio', 2.0)
             tp = entry + (risk * rr_ratio)
             
-            self.signals.append(Signal(bar=bar, entry=entry, tp=tp, sl=sl))
+            signals.append(bar=bar, entry=entry, tp=tp, sl=sl)
             last_signal_bar = bar
         
+        return signals
+    
+    def generate_signals_batch(self) -> SignalTable:
+        """
+        Same signals as generate_signals(), but the fib-touch, bullish-candle
+        and trend conditions are whole-array masks; only the signal_gap
+        spacing runs sequentially over the candidate bars
+        """
+        close = self.df['close'].values
+        low = self.df['low'].values
+        
+        swing_high, swing_low = bullish_swings(self.zigzag_points, self._pivot_count)
+        fib_level = self.params.get('fib_entry_level', 0.79)
+        fib_price = swing_high - ((swing_high - swing_low) * fib_level)
+        tolerance = (swing_high - swing_low) * self.params.get('fib_tolerance', 0.02)
+        
+        # NaN swings (no bullish leg) compare False, like check_fib_entry's early return
+        candidate = (swing_high > swing_low) & (low <= fib_price) & (close >= (fib_price - tolerance))
+        candidate &= close > self.df['open'].values
+        if self.params['use_trend_filter']:
+            candidate &= close > self.indicators.get('sma', self.params['ema_period'])
+        candidate[:self.params['zz_depth'] + 1] = False
+        candidate[-1:] = False
+        
+        gap = self.params['signal_gap']
+        bars = []
+        last_signal_bar = -gap - 1
+        for bar in np.flatnonzero(candidate).tolist():
+            if bar - last_signal_bar > gap:
+                bars.append(bar)
+                last_signal_bar = bar
+        
+        entry = fib_price[bars]
+        sl_buffer = (swing_high[bars] - swing_low[bars]) * 0.02
+        sl = swing_low[bars] - sl_buffer
+        risk = entry - sl
+        tp = entry + (risk * self.params.get('rr_ratio', 2.0))
+        
+        return SignalTable.from_arrays(Signal, bars, entry, tp, sl)
+    
+    def run_backtest(self, batch: bool = False) -> BacktestResult:
+        """
+        Run the backtest
+        batch=True generates signals with generate_signals_batch (same result, faster on long files)
+        """
+        profile = begin_profile(self)
+        self.calculate_zigzag()
+        profile.lap('pivots', len(self.zigzag_points))
+        self.signals = self.generate_signals_batch() if batch else self.generate_signals()
+        profile.lap('signals', max(0, len(self.df) - self.params['zz_depth'] - 2))
+        
         # Process signals - IMMEDIATE ENTRY (market order at signal close)
-        # Then check TP/SL from the NEXT bar
-        for signal in self.signals:
-            # Entry is immediate at signal bar close
-            signal.filled = True
-            signal.filled_bar = signal.bar
-            
-            # Check TP/SL from the bar AFTER entry
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                # Check SL first (worst case)
-                if low <= signal.sl:
-                    signal.result = -1
-                    break
-                
-                # Check TP
-                if high >= signal.tp:
-                    signal.result = 1
-                    break
+        # Then check TP/SL from the NEXT bar, SL first (worst case)
+        self.signals.filled = True
+        resolve_table(self.signals, self.df['high'].values, self.df['low'].values)
+        profile.lap('resolve', len(self.signals))
         
         # Calculate results
-        wins = sum(1 for s in self.signals if s.result == 1)
-        losses = sum(1 for s in self.signals if s.result == -1)
-        open_trades = sum(1 for s in self.signals if s.result == 0)
+        wins, losses, open_trades = self.signals.counts()
         total = len(self.signals)
         win_rate = (wins / (wins + losses) * 100) if (wins + losses) > 0 else 0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
@@ -312,8 +324,147 @@ class ElliottICTBacktester:
             losses=losses,
             open_trades=open_trades,
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
+    
+    def run_batch(self, param_list: List[dict]) -> List[BacktestResult]:
+        """
+        Evaluate many parameter combos on this dataset in one pass.
+        Returns one BacktestResult per entry of param_list (entries override
+        self.params), identical to ElliottICTBacktester(df, p).run_backtest(batch=True).
+        Combos are grouped by pivot structure (zz_depth, zz_dev); inside a
+        group the fib/tolerance masks are built for all combos at once, one
+        row per (fib_entry_level, fib_tolerance), and every unfiltered
+        candidate is resolved by a single resolve_signals call. The trend
+        filter and signal_gap then only select among resolved candidates.
+        The RSI/volume settings don't enter signal generation in this engine,
+        so combos that differ only there are evaluated once and share a result.
+        Stage timings are per group, not per combo: they go to profiling.TOTALS
+        (always, it's four clock reads per group) and results carry no profile.
+        """
+        combos = [{**self.params, **(p or {})} for p in param_list]
+        keys = [self._batch_key(p) for p in combos]
+        
+        groups = {}
+        for key, p in zip(keys, combos):
+            group = groups.setdefault((p['zz_depth'], p['zz_dev']), {})
+            group.setdefault(key, p)
+        
+        results = {}
+        for (depth, dev), group in groups.items():
+            results.update(self._run_group(depth, dev, group))
+        return [results[key] for key in keys]
+    
+    @staticmethod
+    def _batch_key(p: dict) -> tuple:
+        """The parameters that change generate_signals_batch's output"""
+        trend = bool(p['use_trend_filter'])
+        return (p['zz_depth'], p['zz_dev'], p.get('fib_entry_level', 0.79),
+                p.get('fib_tolerance', 0.02), trend, p['ema_period'] if trend else None,
+                p['signal_gap'], p.get('rr_ratio', 2.0))
+    
+    def _run_group(self, depth: int, dev: float, group: dict) -> dict:
+        """
+        run_batch for combos sharing (zz_depth, zz_dev); group maps _batch_key -> params.
+        The unfiltered candidates of each (fib level, tolerance) are found once,
+        with a per-candidate trend bit per ema_period, and resolved once per
+        rr_ratio: a signal's entry/TP/SL depend only on its bar, so every
+        trend/gap combo is a mask plus the gap pass over those candidates.
+        """
+        close = self.df['close'].values
+        low = self.df['low'].values
+        
+        profile = Profile()
+        points, counts = cached_zigzag(self.bars, depth, dev)
+        swing_high, swing_low = bullish_swings(points, counts)
+        profile.lap('pivots', len(points))
+        leg = swing_high - swing_low
+        base = (swing_high > swing_low) & (close > self.df['open'].values)
+        base[:depth + 1] = False
+        base[-1:] = False
+        
+        # One mask row per distinct (fib level, tolerance)
+        rows = {}
+        for key in group:
+            rows.setdefault((key[2], key[3]), len(rows))
+        fib_levels = np.array([r[0] for r in rows], dtype=float)[:, None]
+        tolerances = np.array([r[1] for r in rows], dtype=float)[:, None]
+        fib_price = swing_high - (leg * fib_levels)
+        candidate = base & (low <= fib_price) & (close >= (fib_price - (leg * tolerances)))
+        candidates = [np.flatnonzero(candidate[row]) for row in range(len(rows))]
+        
+        # Filter bits per candidate, keyed (row, ema_period)
+        trend_bits = {}
+        for key in group:
+            if key[4]:
+                row = rows[(key[2], key[3])]
+                if (row, key[5]) not in trend_bits:
+                    cand = candidates[row]
+                    trend_bits[(row, key[5])] = close[cand] > self.indicators.get('sma', key[5])[cand]
+        
+        # Every candidate as a signal, per (row, rr_ratio)
+        levels = {}
+        for key in group:
+            row = rows[(key[2], key[3])]
+            if (row, key[7]) not in levels:
+                cand = candidates[row]
+                entry = fib_price[row, cand]
+                sl = swing_low[cand] - (leg[cand] * 0.02)
+                tp = entry + ((entry - sl) * key[7])
+                levels[(row, key[7])] = np.stack([entry, tp, sl])
+        profile.lap('signals', len(close))
+        
+        order = list(levels)
+        outcomes, exit_bars = resolve_signals(
+            self.df['high'].values, low,
+            np.concatenate([candidates[row] for row, _ in order]),
+            np.concatenate([levels[k][1] for k in order]),
+            np.concatenate([levels[k][2] for k in order]))
+        # (bar, outcome, exit bar) rows per (row, rr_ratio), gathered per combo below
+        resolved = {}
+        start = 0
+        for k in order:
+            end = start + len(candidates[k[0]])
+            resolved[k] = np.stack([candidates[k[0]], outcomes[start:end], exit_bars[start:end]])
+            start = end
+        profile.lap('resolve', len(outcomes))
+        
+        results = {}
+        for key in group:
+            row = rows[(key[2], key[3])]
+            cand = candidates[row]
+            positions = np.flatnonzero(trend_bits[(row, key[5])]) if key[4] else np.arange(len(cand))
+            
+            # Gap spacing: from each kept candidate jump to the first one more
+            # than signal_gap bars later (same picks as the bar-by-bar scan)
+            passed = cand[positions]
+            jump = np.searchsorted(passed, passed + key[6] + 1).tolist()
+            kept = []
+            i = 0
+            while i < len(jump):
+                kept.append(i)
+                i = jump[i]
+            chosen = positions[kept]
+            
+            entry, tp, sl = levels[(row, key[7])][:, chosen]
+            bars, outcome, exit_bar = resolved[(row, key[7])][:, chosen]
+            signals = SignalTable.from_arrays(Signal, bars, entry, tp, sl, result=outcome,
+                                              exit_bar=exit_bar, filled=True)
+            
+            wins, losses, open_trades = signals.counts()
+            results[key] = BacktestResult(
+                total=len(signals),
+                wins=wins,
+                losses=losses,
+                open_trades=open_trades,
+                win_rate=(wins / (wins + losses) * 100) if (wins + losses) > 0 else 0,
+                signals=signals
+            )
+        
+        profile.lap('results', len(results))
+        profile.finish()
+        return results
 
 
 def optimize_parameters(df: pd.DataFrame, param_ranges: dict) -> dict:
@@ -348,9 +499,9 @@ def optimize_parameters(df: pd.DataFrame, param_ranges: dict) -> dict:
     }
 
 
-def load_tradingview_csv(path: str) -> pd.DataFrame:
+def load_tradingview_csv(path: str, mmap: bool = False) -> pd.DataFrame:
     """Load CSV exported from TradingView"""
-    df = pd.read_csv(path)
+    df = read_csv_cached(path, mmap=mmap)
     
     # TradingView format: time (unix), open, high, low, close, ...
     if 'time' in df.columns:
@@ -368,26 +519,31 @@ def load_tradingview_csv(path: str) -> pd.DataFrame:
     return df[cols]
 
 
-def load_yfinance_csv(path: str) -> pd.DataFrame:
+def load_yfinance_csv(path: str, mmap: bool = False) -> pd.DataFrame:
     """Load CSV from yfinance"""
-    df = pd.read_csv(path, skiprows=2, index_col=0, parse_dates=True)
+    df = read_csv_cached(path, mmap=mmap, skiprows=2, index_col=0, parse_dates=True)
     df.columns = ['close', 'high', 'low', 'open', 'volume']
     return df[['open', 'high', 'low', 'close', 'volume']]
 
 
-def load_data(path: str) -> pd.DataFrame:
-    """Auto-detect and load CSV format"""
+def load_data(path: str, mmap: bool = False) -> pd.DataFrame:
+    """
+    Auto-detect and load CSV format
+    Parsed files are cached in <data dir>/.cache/ (see datacache.py),
+    set BACKTEST_NO_CACHE=1 to always parse the CSV. mmap=True returns
+    read-only columns mapped from the cache (for read-only loaders)
+    """
     # Peek at first line
     with open(path, 'r') as f:
         header = f.readline().lower()
     
     if 'time,open' in header:
-        return load_tradingview_csv(path)
+        return load_tradingview_csv(path, mmap)
     elif 'price,close' in header:
-        return load_yfinance_csv(path)
+        return load_yfinance_csv(path, mmap)
     else:
         # Generic
-        df = pd.read_csv(path, index_col=0, parse_dates=True)
+        df = read_csv_cached(path, mmap=mmap, index_col=0, parse_dates=True)
         df.columns = [c.lower() for c in df.columns]
         return df
 
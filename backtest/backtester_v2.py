@@ -11,7 +11,13 @@ Key improvements:
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
+
+from bars import BarArrays, as_bars, engine_frame
+from pivots import cached_zigzag
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_in_place
 
 @dataclass
 class Signal:
@@ -31,11 +37,18 @@ class BacktestResult:
     open_trades: int
     win_rate: float
     signals: List[Signal]
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class ElliottICTBacktesterV2:
-    def __init__(self, df: pd.DataFrame, params: dict = None):
-        self.df = df.copy()
-        self.df.columns = [str(c).lower() for c in self.df.columns]
+    # Methods timed as nested stages when profiling is on
+    PROFILE_CALLS = {'check_fib_entry': 'signals.setup', 'check_wave_quality': 'signals.filters',
+                     'check_momentum_rising': 'signals.filters', 'check_atr_ok': 'signals.filters',
+                     'check_reversal_candle': 'signals.filters'}
+    
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], params: dict = None):
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
+        self.indicators = shared_cache(df, self.df)
         
         required = ['open', 'high', 'low', 'close', 'volume']
         for col in required:
@@ -68,87 +81,42 @@ class ElliottICTBacktesterV2:
         
         self.signals: List[Signal] = []
         self.zigzag_points = []
+        self._pivot_count = np.zeros(len(self.df), dtype=np.int64)
         self._rsi = None
         self._atr = None
         self._ema = None
         
     def calculate_rsi(self, period=14) -> pd.Series:
         if self._rsi is None:
-            delta = self.df['close'].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            self._rsi = 100 - (100 / (1 + rs))
+            self._rsi = self.indicators.series('rsi', period)
         return self._rsi
     
     def calculate_atr(self, period=14) -> pd.Series:
         if self._atr is None:
-            high = self.df['high']
-            low = self.df['low']
-            close = self.df['close']
-            tr1 = high - low
-            tr2 = abs(high - close.shift())
-            tr3 = abs(low - close.shift())
-            tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-            self._atr = tr.rolling(window=period).mean()
+            self._atr = self.indicators.series('atr', period)
         return self._atr
     
     def calculate_ema(self, period=200) -> pd.Series:
         if self._ema is None:
-            self._ema = self.df['close'].ewm(span=period, adjust=False).mean()
+            self._ema = self.indicators.series('ema', period, False)
         return self._ema
     
     def calculate_zigzag(self) -> List[Tuple[int, float, int]]:
-        depth = self.params['zz_depth']
-        dev = self.params['zz_dev']
-        
-        highs = self.df['high'].values
-        lows = self.df['low'].values
-        
-        points = []
-        direction = 0
-        last_price = 0.0
-        
-        for i in range(depth, len(self.df) - depth):
-            is_ph = True
-            for j in range(1, depth + 1):
-                if highs[i] <= highs[i - j] or highs[i] <= highs[i + j]:
-                    is_ph = False
-                    break
-            
-            is_pl = True
-            for j in range(1, depth + 1):
-                if lows[i] >= lows[i - j] or lows[i] >= lows[i + j]:
-                    is_pl = False
-                    break
-            
-            if is_ph and direction != 1:
-                if last_price == 0 or abs(highs[i] - last_price) / last_price * 100 >= dev:
-                    if direction == 1 and points and highs[i] > points[-1][1]:
-                        points[-1] = (i, highs[i], 1)
-                    else:
-                        points.append((i, highs[i], 1))
-                    direction = 1
-                    last_price = highs[i]
-            
-            if is_pl and direction != -1:
-                if last_price == 0 or abs(lows[i] - last_price) / last_price * 100 >= dev:
-                    if direction == -1 and points and lows[i] < points[-1][1]:
-                        points[-1] = (i, lows[i], -1)
-                    else:
-                        points.append((i, lows[i], -1))
-                    direction = -1
-                    last_price = lows[i]
-        
-        self.zigzag_points = points
-        return points
+        self.zigzag_points, self._pivot_count = cached_zigzag(
+            self.bars, self.params['zz_depth'], self.params['zz_dev'])
+        return self.zigzag_points
+    
+    def recent_pivots(self, bar: int, count: int = 3) -> List[Tuple[int, float, int]]:
+        """Last `count` ZigZag points confirmed at or before bar"""
+        n = self._pivot_count[bar]
+        return self.zigzag_points[max(0, n - count):n]
     
     def check_wave_quality(self, bar: int) -> float:
         """
         Score wave quality 0-1
         Good waves: clean movement, not too choppy
         """
-        points = [p for p in self.zigzag_points if p[0] <= bar]
+        points = self.recent_pivots(bar)
         if len(points) < 3:
             return 0.0
         
@@ -194,23 +162,18 @@ class ElliottICTBacktesterV2:
         if bar < 1:
             return False
         
-        o = self.df['open'].iloc[bar]
-        h = self.df['high'].iloc[bar]
-        l = self.df['low'].iloc[bar]
-        c = self.df['close'].iloc[bar]
-        
-        o_prev = self.df['open'].iloc[bar-1]
-        h_prev = self.df['high'].iloc[bar-1]
-        l_prev = self.df['low'].iloc[bar-1]
-        c_prev = self.df['close'].iloc[bar-1]
+        o = self.bars.open[bar]
+        c = self.bars.close[bar]
+        o_prev = self.bars.open[bar-1]
+        c_prev = self.bars.close[bar-1]
         
-        body = abs(c - o)
-        full_range = h - l
+        body = self.indicators.get('body')[bar]
+        full_range = self.indicators.get('candle_range')[bar]
         
         if full_range == 0:
             return False
         
-        body_ratio = body / full_range
+        body_ratio = self.indicators.get('body_ratio')[bar]
         
         # Current bar is bullish
         is_bullish = c > o
@@ -219,15 +182,15 @@ class ElliottICTBacktesterV2:
             return False
         
         # Hammer: small body at top, long lower wick
-        lower_wick = min(o, c) - l
-        upper_wick = h - max(o, c)
+        lower_wick = self.indicators.get('lower_wick')[bar]
+        upper_wick = self.indicators.get('upper_wick')[bar]
         
         is_hammer = (lower_wick > body * 2) and (upper_wick < body * 0.5) and body_ratio < 0.4
         
         # Bullish engulfing: current body engulfs previous body
         prev_is_bearish = c_prev < o_prev
         engulfs = c > o_prev and o < c_prev
-        is_engulfing = prev_is_bearish and engulfs and body > abs(c_prev - o_prev)
+        is_engulfing = prev_is_bearish and engulfs and body > self.indicators.get('body')[bar-1]
         
         # Strong bullish bar (large body, small wicks)
         is_strong = body_ratio > 0.6 and lower_wick < body * 0.3
@@ -267,7 +230,7 @@ class ElliottICTBacktesterV2:
     
     def check_fib_entry(self, bar: int) -> Tuple[bool, float, float, float]:
         """Check if price is at Fib retracement level for BULLISH setup"""
-        points = [p for p in self.zigzag_points if p[0] <= bar]
+        points = self.recent_pivots(bar)
         if len(points) < 2:
             return False, 0.0, 0.0, 0.0
         
@@ -310,7 +273,9 @@ class ElliottICTBacktesterV2:
     
     def run_backtest(self) -> BacktestResult:
         self.signals = []
+        profile = begin_profile(self)
         self.calculate_zigzag()
+        profile.lap('pivots', len(self.zigzag_points))
         
         last_signal_bar = -self.params['signal_gap'] - 1
         
@@ -357,7 +322,7 @@ class ElliottICTBacktesterV2:
             
             # Volume filter
             if self.params['use_volume_filter']:
-                avg_vol = self.df['volume'].rolling(20).mean().iloc[bar]
+                avg_vol = self.indicators.get('volume_sma', 20)[bar]
                 if not pd.isna(avg_vol) and self.df['volume'].iloc[bar] < avg_vol * 0.5:
                     continue
             
@@ -372,28 +337,21 @@ class ElliottICTBacktesterV2:
             self.signals.append(Signal(bar=bar, entry=entry, tp=tp, sl=sl))
             last_signal_bar = bar
         
+        profile.lap('signals', len(range(self.params['zz_depth'] + 1, len(self.df) - 1)))
+        
         # Process signals
         for signal in self.signals:
             signal.filled = True
             signal.filled_bar = signal.bar
-            
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                if low <= signal.sl:
-                    signal.result = -1
-                    break
-                
-                if high >= signal.tp:
-                    signal.result = 1
-                    break
+        resolve_in_place(self.signals, self.df['high'].values, self.df['low'].values)
+        profile.lap('resolve', len(self.signals))
         
         wins = sum(1 for s in self.signals if s.result == 1)
         losses = sum(1 for s in self.signals if s.result == -1)
         open_trades = sum(1 for s in self.signals if s.result == 0)
         total = wins + losses
         win_rate = (wins / total * 100) if total > 0 else 0.0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
@@ -401,7 +359,8 @@ class ElliottICTBacktesterV2:
             losses=losses,
             open_trades=open_trades,
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
 
 def load_data(filepath: str) -> pd.DataFrame:
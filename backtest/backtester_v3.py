@@ -9,7 +9,13 @@ Focus on:
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Union
+
+from bars import BarArrays, as_bars, engine_frame
+from pivots import cached_zigzag
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_signals
 
 @dataclass
 class Signal:
@@ -30,11 +36,16 @@ class BacktestResult:
     open_trades: int
     win_rate: float
     signals: List[Signal]
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class ElliottICTBacktesterV3:
-    def __init__(self, df: pd.DataFrame, params: dict = None):
-        self.df = df.copy()
-        self.df.columns = [str(c).lower() for c in self.df.columns]
+    # Methods timed as nested stages when profiling is on
+    PROFILE_CALLS = {'check_fib_entry': 'signals.setup'}
+    
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], params: dict = None):
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
+        self.indicators = shared_cache(df, self.df)
         
         self.params = {
             'zz_depth': 3,
@@ -57,53 +68,24 @@ class ElliottICTBacktesterV3:
         
         self.signals = []
         self.zigzag_points = []
+        self._pivot_count = np.zeros(len(self.df), dtype=np.int64)
         
     def calculate_rsi(self, period=14) -> pd.Series:
-        delta = self.df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-        rs = gain / loss
-        return 100 - (100 / (1 + rs))
+        return self.indicators.series('rsi', period)
     
     def calculate_zigzag(self) -> List[Tuple[int, float, int]]:
-        depth = self.params['zz_depth']
-        dev = self.params['zz_dev']
-        
-        highs = self.df['high'].values
-        lows = self.df['low'].values
-        
-        points = []
-        direction = 0
-        last_price = 0.0
-        
-        for i in range(depth, len(self.df) - depth):
-            is_ph = all(highs[i] > highs[i - j] and highs[i] > highs[i + j] for j in range(1, depth + 1))
-            is_pl = all(lows[i] < lows[i - j] and lows[i] < lows[i + j] for j in range(1, depth + 1))
-            
-            if is_ph and direction != 1:
-                if last_price == 0 or abs(highs[i] - last_price) / last_price * 100 >= dev:
-                    if direction == 1 and points and highs[i] > points[-1][1]:
-                        points[-1] = (i, highs[i], 1)
-                    else:
-                        points.append((i, highs[i], 1))
-                    direction = 1
-                    last_price = highs[i]
-            
-            if is_pl and direction != -1:
-                if last_price == 0 or abs(lows[i] - last_price) / last_price * 100 >= dev:
-                    if direction == -1 and points and lows[i] < points[-1][1]:
-                        points[-1] = (i, lows[i], -1)
-                    else:
-                        points.append((i, lows[i], -1))
-                    direction = -1
-                    last_price = lows[i]
-        
-        self.zigzag_points = points
-        return points
+        self.zigzag_points, self._pivot_count = cached_zigzag(
+            self.bars, self.params['zz_depth'], self.params['zz_dev'])
+        return self.zigzag_points
+    
+    def recent_pivots(self, bar: int, count: int = 3) -> List[Tuple[int, float, int]]:
+        """Last `count` ZigZag points confirmed at or before bar"""
+        n = self._pivot_count[bar]
+        return self.zigzag_points[max(0, n - count):n]
     
     def check_fib_entry(self, bar: int) -> Tuple[bool, float, float, float]:
         """Check if price is at ANY of the Fib levels"""
-        points = [p for p in self.zigzag_points if p[0] <= bar]
+        points = self.recent_pivots(bar)
         if len(points) < 2:
             return False, 0.0, 0.0, 0.0
         
@@ -148,11 +130,13 @@ class ElliottICTBacktesterV3:
     
     def run_backtest(self) -> BacktestResult:
         self.signals = []
+        profile = begin_profile(self)
         self.calculate_zigzag()
+        profile.lap('pivots', len(self.zigzag_points))
         
         rsi = self.calculate_rsi()
-        ema = self.df['close'].rolling(self.params['ema_period']).mean()
-        avg_vol = self.df['volume'].rolling(20).mean()
+        ema = self.indicators.series('sma', self.params['ema_period'])
+        avg_vol = self.indicators.series('volume_sma', 20)
         
         last_signal_bar = -self.params['signal_gap'] - 1
         
@@ -195,38 +179,56 @@ class ElliottICTBacktesterV3:
             self.signals.append(Signal(bar=bar, entry=entry, tp=tp, sl=sl, original_sl=sl))
             last_signal_bar = bar
         
+        profile.lap('signals', len(range(self.params['zz_depth'] + 1, len(self.df) - 1)))
+        
         # Process signals with trailing SL
         use_trailing = self.params.get('use_trailing_sl', True)
         trailing_trigger = self.params.get('trailing_trigger', 0.5)
         
+        highs = self.df['high'].values
+        lows = self.df['low'].values
+        bars = [s.bar for s in self.signals]
+        tps = [s.tp for s in self.signals]
+        sls = [s.sl for s in self.signals]
+        
         for signal in self.signals:
             signal.filled = True
             signal.filled_bar = signal.bar
+        
+        if not use_trailing:
+            results, _ = resolve_signals(highs, lows, bars, tps, sls)
+            for signal, result in zip(self.signals, results.tolist()):
+                signal.result = result
+        else:
+            # Stage 1: first bar that reaches the breakeven trigger, TP or the
+            # original SL. The trigger is applied before the SL check on a bar,
+            # so "high >= min(trigger, tp)" wins ties here
+            triggers = [s.entry + ((s.tp - s.entry) * trailing_trigger) for s in self.signals]
+            first_up = np.minimum(triggers, tps)
+            stage1, hit_bars = resolve_signals(highs, lows, bars, first_up, sls, sl_first=False)
             
-            current_sl = signal.sl
-            target_move = signal.tp - signal.entry
-            trigger_price = signal.entry + (target_move * trailing_trigger)
-            sl_moved = False
-            
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                # Move SL to breakeven if triggered
-                if use_trailing and not sl_moved and high >= trigger_price:
-                    current_sl = signal.entry  # Move SL to breakeven
-                    signal.sl = current_sl
-                    sl_moved = True
-                
-                # Check SL
-                if low <= current_sl:
-                    signal.result = -1 if not sl_moved else 0  # Breakeven counts as 0
-                    break
-                
-                # Check TP
-                if high >= signal.tp:
+            moved = []
+            for signal, trigger_price, result, bar in zip(self.signals, triggers, stage1.tolist(), hit_bars.tolist()):
+                if result != 1:
+                    signal.result = result
+                elif highs[bar] >= trigger_price:
+                    signal.sl = signal.entry  # Move SL to breakeven
+                    moved.append((signal, bar))
+                elif lows[bar] <= signal.sl:
+                    signal.result = -1
+                else:
                     signal.result = 1
-                    break
+            
+            # Stage 2: breakeven SL vs TP, starting on the trigger bar itself
+            if moved:
+                stage2, _ = resolve_signals(
+                    highs, lows,
+                    [bar - 1 for _, bar in moved],
+                    [s.tp for s, _ in moved],
+                    [s.sl for s, _ in moved])
+                for (signal, _), result in zip(moved, stage2.tolist()):
+                    signal.result = 1 if result == 1 else 0  # Breakeven counts as 0
+        profile.lap('resolve', len(self.signals))
         
         # Count results (breakeven = not counted as loss)
         wins = sum(1 for s in self.signals if s.result == 1)
@@ -235,6 +237,7 @@ class ElliottICTBacktesterV3:
         open_trades = sum(1 for s in self.signals if s.result == 0 and s.sl == s.original_sl)
         total = wins + losses
         win_rate = (wins / total * 100) if total > 0 else 0.0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
@@ -242,7 +245,8 @@ class ElliottICTBacktesterV3:
             losses=losses,
             open_trades=open_trades + breakeven,
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
 
 def load_data(filepath: str) -> pd.DataFrame:
@@ -10,7 +10,13 @@ Based on analysis of winning vs losing trades:
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import List, Tuple, Optional, Union
+
+from bars import BarArrays, as_bars, engine_frame
+from pivots import cached_zigzag
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_in_place
 
 @dataclass
 class Signal:
@@ -30,11 +36,18 @@ class BacktestResult:
     open_trades: int
     win_rate: float
     signals: List[Signal]
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class ElliottICTBacktesterV4:
-    def __init__(self, df: pd.DataFrame, params: dict = None):
-        self.df = df.copy()
-        self.df.columns = [str(c).lower() for c in self.df.columns]
+    # Methods timed as nested stages when profiling is on
+    PROFILE_CALLS = {'check_fib_entry': 'signals.setup', 'check_momentum': 'signals.filters',
+                     'check_price_position': 'signals.filters', 'check_ema_proximity': 'signals.filters',
+                     'check_body_ratio': 'signals.filters'}
+    
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], params: dict = None):
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
+        self.indicators = shared_cache(df, self.df)
         
         self.params = {
             'zz_depth': 3,
@@ -60,49 +73,26 @@ class ElliottICTBacktesterV4:
         
         self.signals = []
         self.zigzag_points = []
+        self._pivot_count = np.zeros(len(self.df), dtype=np.int64)
         self._ema = None
         
     def calculate_ema(self, period=50) -> pd.Series:
         if self._ema is None:
-            self._ema = self.df['close'].ewm(span=period).mean()
+            self._ema = self.indicators.series('ema', period)
         return self._ema
     
     def calculate_zigzag(self) -> List[Tuple[int, float, int]]:
-        depth = self.params['zz_depth']
-        dev = self.params['zz_dev']
-        highs = self.df['high'].values
-        lows = self.df['low'].values
-        points = []
-        direction = 0
-        last_price = 0.0
-        
-        for i in range(depth, len(self.df) - depth):
-            is_ph = all(highs[i] > highs[i - j] and highs[i] > highs[i + j] for j in range(1, depth + 1))
-            is_pl = all(lows[i] < lows[i - j] and lows[i] < lows[i + j] for j in range(1, depth + 1))
-            
-            if is_ph and direction != 1:
-                if last_price == 0 or abs(highs[i] - last_price) / last_price * 100 >= dev:
-                    if direction == 1 and points and highs[i] > points[-1][1]:
-                        points[-1] = (i, highs[i], 1)
-                    else:
-                        points.append((i, highs[i], 1))
-                    direction = 1
-                    last_price = highs[i]
-            
-            if is_pl and direction != -1:
-                if last_price == 0 or abs(lows[i] - last_price) / last_price * 100 >= dev:
-                    if direction == -1 and points and lows[i] < points[-1][1]:
-                        points[-1] = (i, lows[i], -1)
-                    else:
-                        points.append((i, lows[i], -1))
-                    direction = -1
-                    last_price = lows[i]
-        
-        self.zigzag_points = points
-        return points
+        self.zigzag_points, self._pivot_count = cached_zigzag(
+            self.bars, self.params['zz_depth'], self.params['zz_dev'])
+        return self.zigzag_points
+    
+    def recent_pivots(self, bar: int, count: int = 3) -> List[Tuple[int, float, int]]:
+        """Last `count` ZigZag points confirmed at or before bar"""
+        n = self._pivot_count[bar]
+        return self.zigzag_points[max(0, n - count):n]
     
     def check_fib_entry(self, bar: int) -> Tuple[bool, float, float, float]:
-        points = [p for p in self.zigzag_points if p[0] <= bar]
+        points = self.recent_pivots(bar)
         if len(points) < 2:
             return False, 0.0, 0.0, 0.0
         
@@ -153,8 +143,8 @@ class ElliottICTBacktesterV4:
         if bar < 20:
             return True
         
-        high_20 = self.df['high'].iloc[bar-20:bar+1].max()
-        low_20 = self.df['low'].iloc[bar-20:bar+1].min()
+        high_20 = max(self.bars.high[bar], self.indicators.get('swing_high', 20)[bar])
+        low_20 = min(self.bars.low[bar], self.indicators.get('swing_low', 20)[bar])
         range_20 = high_20 - low_20
         
         if range_20 == 0:
@@ -181,23 +171,18 @@ class ElliottICTBacktesterV4:
         if not self.params.get('use_body_filter', True):
             return True
         
-        o = self.df['open'].iloc[bar]
-        h = self.df['high'].iloc[bar]
-        l = self.df['low'].iloc[bar]
-        c = self.df['close'].iloc[bar]
-        
-        full_range = h - l
-        if full_range == 0:
+        if self.indicators.get('candle_range')[bar] == 0:
             return False
         
-        body = abs(c - o)
-        ratio = body / full_range
+        ratio = self.indicators.get('body_ratio')[bar]
         
-        return ratio >= self.params.get('min_body_ratio', 0.3) and c > o  # Must be bullish
+        return ratio >= self.params.get('min_body_ratio', 0.3) and self.bars.close[bar] > self.bars.open[bar]  # Must be bullish
     
     def run_backtest(self) -> BacktestResult:
         self.signals = []
+        profile = begin_profile(self)
         self.calculate_zigzag()
+        profile.lap('pivots', len(self.zigzag_points))
         
         last_signal_bar = -self.params['signal_gap'] - 1
         
@@ -233,27 +218,20 @@ class ElliottICTBacktesterV4:
             self.signals.append(Signal(bar=bar, entry=entry, tp=tp, sl=sl))
             last_signal_bar = bar
         
+        profile.lap('signals', len(range(max(20, self.params['zz_depth'] + 1), len(self.df) - 1)))
+        
         # Process signals
         for signal in self.signals:
             signal.filled = True
             signal.filled_bar = signal.bar
-            
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                if low <= signal.sl:
-                    signal.result = -1
-                    break
-                
-                if high >= signal.tp:
-                    signal.result = 1
-                    break
+        resolve_in_place(self.signals, self.df['high'].values, self.df['low'].values)
+        profile.lap('resolve', len(self.signals))
         
         wins = sum(1 for s in self.signals if s.result == 1)
         losses = sum(1 for s in self.signals if s.result == -1)
         total = wins + losses
         win_rate = (wins / total * 100) if total > 0 else 0.0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
@@ -261,7 +239,8 @@ class ElliottICTBacktesterV4:
             losses=losses,
             open_trades=sum(1 for s in self.signals if s.result == 0),
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
 
 def load_data(filepath: str) -> pd.DataFrame:
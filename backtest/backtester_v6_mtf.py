@@ -10,7 +10,13 @@ Key improvements:
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
+
+from bars import BarArrays, as_bars, engine_frame
+from pivots import cached_zigzag
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_in_place
 
 @dataclass
 class Signal:
@@ -29,20 +35,26 @@ class BacktestResult:
     losses: int
     win_rate: float
     signals: List[Signal]
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class ElliottICTBacktesterV6:
-    def __init__(self, df: pd.DataFrame, df_htf: pd.DataFrame = None, params: dict = None):
+    # Methods timed as nested stages when profiling is on
+    PROFILE_CALLS = {'check_fib_entry': 'signals.setup', 'calculate_confluence': 'signals.filters'}
+    
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], df_htf: Union[pd.DataFrame, BarArrays] = None, params: dict = None):
         """
         df: Current timeframe data
         df_htf: Higher timeframe data (4x current, e.g., 1H -> 4H)
         """
-        self.df = df.copy()
-        self.df.columns = [str(c).lower() for c in self.df.columns]
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
+        self.indicators = shared_cache(df, self.df)
         
         self.df_htf = None
+        self.htf_indicators = None
         if df_htf is not None:
-            self.df_htf = df_htf.copy()
-            self.df_htf.columns = [str(c).lower() for c in self.df_htf.columns]
+            self.df_htf = engine_frame(df_htf, as_bars(df_htf))
+            self.htf_indicators = shared_cache(df_htf, self.df_htf)
         
         self.params = {
             'zz_depth': 3,
@@ -69,6 +81,7 @@ class ElliottICTBacktesterV6:
         
         self.signals = []
         self.zigzag_points = []
+        self._pivot_count = np.zeros(len(self.df), dtype=np.int64)
         self.fvgs = []  # Fair Value Gaps
         self.order_blocks = []  # Order Blocks
         
@@ -89,9 +102,9 @@ class ElliottICTBacktesterV6:
             return 0
         
         # Calculate HTF EMA
-        ema = self.df_htf['close'].ewm(span=self.params['htf_ema_period']).mean()
+        ema = self.htf_indicators.get('ema', self.params['htf_ema_period'])
         price = self.df_htf['close'].iloc[htf_bar]
-        ema_val = ema.iloc[htf_bar]
+        ema_val = ema[htf_bar]
         
         if price > ema_val * 1.001:  # 0.1% above EMA
             return 1
@@ -152,41 +165,17 @@ class ElliottICTBacktesterV6:
         return None
     
     def calculate_zigzag(self) -> List[Tuple[int, float, int]]:
-        depth = self.params['zz_depth']
-        dev = self.params['zz_dev']
-        highs = self.df['high'].values
-        lows = self.df['low'].values
-        points = []
-        direction = 0
-        last_price = 0.0
-        
-        for i in range(depth, len(self.df) - depth):
-            is_ph = all(highs[i] > highs[i - j] and highs[i] > highs[i + j] for j in range(1, depth + 1))
-            is_pl = all(lows[i] < lows[i - j] and lows[i] < lows[i + j] for j in range(1, depth + 1))
-            
-            if is_ph and direction != 1:
-                if last_price == 0 or abs(highs[i] - last_price) / last_price * 100 >= dev:
-                    if direction == 1 and points and highs[i] > points[-1][1]:
-                        points[-1] = (i, highs[i], 1)
-                    else:
-                        points.append((i, highs[i], 1))
-                    direction = 1
-                    last_price = highs[i]
-            
-            if is_pl and direction != -1:
-                if last_price == 0 or abs(lows[i] - last_price) / last_price * 100 >= dev:
-                    if direction == -1 and points and lows[i] < points[-1][1]:
-                        points[-1] = (i, lows[i], -1)
-                    else:
-                        points.append((i, lows[i], -1))
-                    direction = -1
-                    last_price = lows[i]
-        
-        self.zigzag_points = points
-        return points
+        self.zigzag_points, self._pivot_count = cached_zigzag(
+            self.bars, self.params['zz_depth'], self.params['zz_dev'])
+        return self.zigzag_points
+    
+    def recent_pivots(self, bar: int, count: int = 3) -> List[Tuple[int, float, int]]:
+        """Last `count` ZigZag points confirmed at or before bar"""
+        n = self._pivot_count[bar]
+        return self.zigzag_points[max(0, n - count):n]
     
     def check_fib_entry(self, bar: int) -> Tuple[bool, float, float, float]:
-        points = [p for p in self.zigzag_points if p[0] <= bar]
+        points = self.recent_pivots(bar)
         if len(points) < 2:
             return False, 0.0, 0.0, 0.0
         
@@ -240,19 +229,17 @@ class ElliottICTBacktesterV6:
             score += 1
         
         # 5. RSI oversold (+1)
-        delta = self.df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
-        if bar < len(rsi) and not pd.isna(rsi.iloc[bar]) and rsi.iloc[bar] < 35:
+        rsi = self.indicators.get('rsi', 14)
+        if bar < len(rsi) and not pd.isna(rsi[bar]) and rsi[bar] < 35:
             score += 1
         
         return score
     
     def run_backtest(self) -> BacktestResult:
         self.signals = []
+        profile = begin_profile(self)
         self.calculate_zigzag()
+        profile.lap('pivots', len(self.zigzag_points))
         
         last_signal_bar = -self.params['signal_gap'] - 1
         min_confluence = self.params.get('min_confluence', 2)
@@ -287,33 +274,27 @@ class ElliottICTBacktesterV6:
             self.signals.append(Signal(bar=bar, entry=entry, tp=tp, sl=sl, confluence_score=confluence))
             last_signal_bar = bar
         
+        profile.lap('signals', len(range(max(20, self.params['zz_depth'] + 1), len(self.df) - 1)))
+        
         # Process signals
         for signal in self.signals:
             signal.filled = True
-            
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                if low <= signal.sl:
-                    signal.result = -1
-                    break
-                
-                if high >= signal.tp:
-                    signal.result = 1
-                    break
+        resolve_in_place(self.signals, self.df['high'].values, self.df['low'].values)
+        profile.lap('resolve', len(self.signals))
         
         wins = sum(1 for s in self.signals if s.result == 1)
         losses = sum(1 for s in self.signals if s.result == -1)
         total = wins + losses
         win_rate = (wins / total * 100) if total > 0 else 0.0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
             wins=wins,
             losses=losses,
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
 
 def load_data(filepath: str) -> pd.DataFrame:
@@ -9,7 +9,13 @@ Instead of Fib retracement, look for:
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List, Tuple, Optional
+from typing import List, Tuple, Optional, Union
+
+from bars import BarArrays, as_bars, engine_frame
+from pivots import find_pivots
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_in_place
 
 @dataclass
 class Signal:
@@ -26,11 +32,17 @@ class BacktestResult:
     losses: int
     win_rate: float
     signals: List[Signal]
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class BreakoutPullbackBacktester:
-    def __init__(self, df: pd.DataFrame, params: dict = None):
-        self.df = df.copy()
-        self.df.columns = [str(c).lower() for c in self.df.columns]
+    # Methods timed as nested stages when profiling is on
+    PROFILE_CALLS = {'check_breakout': 'signals.setup', 'check_volume_confirm': 'signals.filters',
+                     'check_ema_filter': 'signals.filters'}
+    
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], params: dict = None):
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
+        self.indicators = shared_cache(df, self.df)
         
         self.params = {
             'lookback': 20,  # Bars to look for swing high
@@ -51,18 +63,9 @@ class BreakoutPullbackBacktester:
     
     def find_swing_highs(self) -> List[Tuple[int, float]]:
         """Find all swing highs (local maximums)"""
-        lookback = self.params['lookback']
         highs = self.df['high'].values
-        swing_highs = []
-        
-        for i in range(lookback, len(self.df) - lookback):
-            is_high = True
-            for j in range(1, lookback + 1):
-                if highs[i] <= highs[i-j] or highs[i] <= highs[i+j]:
-                    is_high = False
-                    break
-            if is_high:
-                swing_highs.append((i, highs[i]))
+        is_high, _ = find_pivots(highs, self.df['low'].values, self.params['lookback'])
+        swing_highs = [(i, highs[i]) for i in np.flatnonzero(is_high).tolist()]
         
         self.swing_highs = swing_highs
         return swing_highs
@@ -128,12 +131,14 @@ class BreakoutPullbackBacktester:
         if not self.params.get('use_ema_filter', True):
             return True
         
-        ema = self.df['close'].ewm(span=self.params['ema_period']).mean()
-        return self.df['close'].iloc[bar] > ema.iloc[bar]
+        ema = self.indicators.get('ema', self.params['ema_period'])
+        return self.bars.close[bar] > ema[bar]
     
     def run_backtest(self) -> BacktestResult:
         self.signals = []
+        profile = begin_profile(self)
         self.find_swing_highs()
+        profile.lap('pivots', len(self.swing_highs))
         
         last_signal_bar = -self.params['signal_gap'] - 1
         
@@ -168,31 +173,25 @@ class BreakoutPullbackBacktester:
             self.signals.append(Signal(bar=bar, entry=entry, tp=tp, sl=sl))
             last_signal_bar = bar
         
+        profile.lap('signals', len(range(self.params['lookback'] + 5, len(self.df) - 1)))
+        
         # Process signals
-        for signal in self.signals:
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                if low <= signal.sl:
-                    signal.result = -1
-                    break
-                
-                if high >= signal.tp:
-                    signal.result = 1
-                    break
+        resolve_in_place(self.signals, self.df['high'].values, self.df['low'].values)
+        profile.lap('resolve', len(self.signals))
         
         wins = sum(1 for s in self.signals if s.result == 1)
         losses = sum(1 for s in self.signals if s.result == -1)
         total = wins + losses
         win_rate = (wins / total * 100) if total > 0 else 0.0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
             wins=wins,
             losses=losses,
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
 
 def load_data(filepath: str) -> pd.DataFrame:
@@ -12,7 +12,12 @@ This is a classic trend-following strategy that often has good win rates.
 import pandas as pd
 import numpy as np
 from dataclasses import dataclass
-from typing import List
+from typing import List, Optional, Union
+
+from bars import BarArrays, as_bars, engine_frame
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_in_place
 
 @dataclass
 class Signal:
@@ -29,11 +34,17 @@ class BacktestResult:
     losses: int
     win_rate: float
     signals: List[Signal]
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class EMAPullbackBacktester:
-    def __init__(self, df: pd.DataFrame, params: dict = None):
-        self.df = df.copy()
-        self.df.columns = [str(c).lower() for c in self.df.columns]
+    # Methods timed as nested stages when profiling is on
+    PROFILE_CALLS = {'check_ema_touch': 'signals.setup', 'is_uptrend': 'signals.filters',
+                     'check_bounce_confirmation': 'signals.filters', 'check_rsi': 'signals.filters'}
+    
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], params: dict = None):
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
+        self.indicators = shared_cache(df, self.df)
         
         self.params = {
             'ema_fast': 20,       # Fast EMA for pullback
@@ -57,15 +68,11 @@ class EMAPullbackBacktester:
     
     def calculate_indicators(self):
         # EMAs
-        self._ema_fast = self.df['close'].ewm(span=self.params['ema_fast']).mean()
-        self._ema_slow = self.df['close'].ewm(span=self.params['ema_slow']).mean()
+        self._ema_fast = self.indicators.series('ema', self.params['ema_fast'])
+        self._ema_slow = self.indicators.series('ema', self.params['ema_slow'])
         
         # RSI
-        delta = self.df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
-        rs = gain / loss
-        self._rsi = 100 - (100 / (1 + rs))
+        self._rsi = self.indicators.series('rsi', 14)
     
     def is_uptrend(self, bar: int) -> bool:
         """Check if we're in an uptrend"""
@@ -117,12 +124,13 @@ class EMAPullbackBacktester:
     def find_swing_low(self, bar: int) -> float:
         """Find recent swing low for SL placement"""
         lookback = self.params['swing_lookback']
-        start = max(0, bar - lookback)
-        return self.df['low'].iloc[start:bar+1].min()
+        return min(self.bars.low[bar], self.indicators.get('swing_low', lookback)[bar])
     
     def run_backtest(self) -> BacktestResult:
         self.signals = []
+        profile = begin_profile(self)
         self.calculate_indicators()
+        profile.lap('indicators', len(self.df))
         
         last_signal_bar = -self.params['signal_gap'] - 1
         
@@ -161,31 +169,25 @@ class EMAPullbackBacktester:
             self.signals.append(Signal(bar=bar, entry=entry, tp=tp, sl=sl))
             last_signal_bar = bar
         
+        profile.lap('signals', len(range(self.params['ema_slow'] + 5, len(self.df) - 1)))
+        
         # Process signals
-        for signal in self.signals:
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                if low <= signal.sl:
-                    signal.result = -1
-                    break
-                
-                if high >= signal.tp:
-                    signal.result = 1
-                    break
+        resolve_in_place(self.signals, self.df['high'].values, self.df['low'].values)
+        profile.lap('resolve', len(self.signals))
         
         wins = sum(1 for s in self.signals if s.result == 1)
         losses = sum(1 for s in self.signals if s.result == -1)
         total = wins + losses
         win_rate = (wins / total * 100) if total > 0 else 0.0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
             wins=wins,
             losses=losses,
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
 
 def load_data(filepath: str) -> pd.DataFrame:
@@ -0,0 +1,91 @@
+"""
+Read-only bar arrays shared by every backtester and strategy
+Build a BarArrays once per dataset and pass it instead of the DataFrame:
+constructors then use it as-is instead of copying the frame per instance.
+Each engine's self.df comes from engine_frame(): the same column arrays,
+but its own DataFrame, so columns an engine adds don't leak into others.
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close']
+
+
+def _readonly(values) -> np.ndarray:
+    arr = np.ascontiguousarray(values, dtype=float)
+    arr.flags.writeable = False
+    return arr
+
+
+class BarArrays:
+    """OHLCV + time as contiguous read-only NumPy arrays"""
+
+    def __init__(self, open, high, low, close, volume=None, time=None):
+        self.open = _readonly(open)
+        self.high = _readonly(high)
+        self.low = _readonly(low)
+        self.close = _readonly(close)
+        self.volume = _readonly(volume) if volume is not None else None
+        if time is None:
+            time = np.arange(len(self.close))
+        self.time = np.asarray(time)
+        self.time.flags.writeable = False
+        self._frame = None
+        self._fingerprint = None
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> 'BarArrays':
+        """Adapter for DataFrame input (any column case, index = time)"""
+        cols = {str(c).lower(): c for c in df.columns}
+        for col in PRICE_COLUMNS:
+            if col not in cols:
+                raise ValueError(f"Missing required column: {col}")
+        volume = df[cols['volume']].values if 'volume' in cols else None
+        return cls(*(df[cols[c]].values for c in PRICE_COLUMNS),
+                   volume=volume, time=df.index.values)
+
+    def __len__(self) -> int:
+        return len(self.close)
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the high/low series - the same bars give the same key in any process"""
+        if self._fingerprint is None:
+            digest = hashlib.sha1(self.high.tobytes())
+            digest.update(self.low.tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """DataFrame over the same arrays (no copy), built once and shared; engines use engine_frame()"""
+        if self._frame is None:
+            columns = {c: getattr(self, c) for c in PRICE_COLUMNS}
+            if self.volume is not None:
+                columns['volume'] = self.volume
+            self._frame = pd.DataFrame(columns, index=pd.Index(self.time), copy=False)
+        return self._frame
+
+
+def engine_frame(data, bars: BarArrays) -> pd.DataFrame:
+    """
+    An engine's own self.df: a shallow copy of bars.frame, so columns an
+    engine adds stay with that engine, plus any extra columns of a
+    DataFrame `data` (lower-cased, like the price columns)
+    """
+    frame = bars.frame.copy(deep=False)
+    if isinstance(data, pd.DataFrame):
+        for col in data.columns:
+            name = str(col).lower()
+            if name not in frame.columns:
+                frame[name] = data[col].values
+    return frame
+
+
+def as_bars(data) -> BarArrays:
+    """Return data unchanged if it already is a BarArrays, else convert the DataFrame"""
+    if isinstance(data, BarArrays):
+        return data
+    return BarArrays.from_df(data)
@@ -0,0 +1,244 @@
+"""
+Reproducible benchmark of every engine over the data/ corpus
+
+    python backtest/benchmark.py -o bench.json
+    python backtest/benchmark.py --engines v1,v2 --timeframes 1h,4h --limit 5
+    python backtest/benchmark.py --compare bench.json --threshold 0.10
+    python backtest/benchmark.py --compare bench.json --against new.json
+
+Each (engine, timeframe) pair runs in its own fresh process so peak RSS
+is that pair's alone: it loads the timeframe's CSVs the way the
+optimizers do (evaluator.timeframe_files / load_datasets) and runs the
+engine's fixed BENCH_CONFIGS on every dataset, through run_batch where
+the engine has one. Throughput (bars/s, backtests/s) is the best of
+--repeat passes with profiling off and pivot/indicator caches cleared
+between passes; the per-stage times come from one extra pass with
+profiling on (see profiling.py), skipped with --no-stages.
+
+The JSON report goes to stdout or -o PATH. --compare BASELINE runs the
+same engines/timeframes as the baseline (or reads --against) and flags
+any pair whose backtests/s dropped or peak RSS grew by more than
+--threshold, or whose trade counts changed; the exit status is 1 if
+anything was flagged.
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import platform
+import time
+from contextlib import redirect_stdout
+from multiprocessing import cpu_count, get_context
+from typing import List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import numpy as np
+import pandas as pd
+
+import profiling
+from checkpoint import atomic_write_json, data_fingerprint
+from evaluator import DATA_DIR, ENGINES, TIMEFRAMES, engine_class, timeframe_files, load_datasets, run_chunk
+from indicators import clear_shared
+from pivots import ZIGZAG_CACHE
+from search import grid
+
+FORMAT_VERSION = 1
+THRESHOLD = 0.10  # relative change flagged by --compare
+
+# Fixed parameter sets per engine; v1 gets a small grid so run_batch has
+# groups to share pivots and indicators across
+BENCH_CONFIGS = {
+    'v1': grid({'zz_depth': [2, 3, 4], 'fib_entry_level': [0.618, 0.786],
+                'use_trend_filter': [True, False]}, {'rr_ratio': 1.0}),
+    'v2': [{}, {'use_wave_quality': False, 'use_trend_filter': True}],
+    'v3': [{}, {'use_trailing_sl': False}],
+    'v4': [{}],
+    'v5': [{}, {'confirm_type': 'bullish_candle'}],
+    'v6': [{}],
+    'v7': [{}, {'lookback': 5}],
+    'v8': [{}],
+    'breakout': [{}, {'lookback': 10, 'signal_gap': 3}],
+    'dynamic_tp': [{}, {'atr_mult': 2.0, 'signal_gap': 3}],
+    'ict_pure': [{}],
+    'momentum': [{}, {'rsi_oversold': 45, 'ema_period': 20, 'lookback': 5, 'signal_gap': 3}],
+    'supply_demand': [{}],
+}
+
+
+def _rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far, in MB"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _run_pass(engine, data: dict, configs: List[dict]) -> List[dict]:
+    ZIGZAG_CACHE.clear()
+    clear_shared()
+    return [r for res in run_chunk(data, engine, configs, list(data)) for r in res.values()]
+
+
+def bench_pair(task) -> dict:
+    """Benchmark one engine on one timeframe (runs in a fresh process)"""
+    name, timeframe, data_dir, limit, repeat, stages = task
+    files = timeframe_files(timeframe, data_dir)
+    if limit:
+        files = dict(list(files.items())[:limit])
+    with redirect_stdout(sys.stderr):  # keep stdout for the JSON report
+        data = load_datasets(files)
+    engine = engine_class(name)
+    configs = BENCH_CONFIGS.get(name, [{}])
+    base_rss = _rss_mb()
+
+    best = None
+    summaries = []
+    with profiling.enabled(False):
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            summaries = _run_pass(engine, data, configs)
+            seconds = time.perf_counter() - start
+            best = seconds if best is None else min(best, seconds)
+
+    stage_times = None
+    if stages:
+        before = profiling.TOTALS.as_dict()
+        with profiling.enabled():
+            _run_pass(engine, data, configs)
+        stage_times = {k: {'seconds': round(v['seconds'], 6), 'calls': v['calls'], 'items': v['items']}
+                       for k, v in profiling.TOTALS.since(before).items()}
+
+    bars = sum(len(b) for b in data.values())
+    backtests = len(data) * len(configs)
+    return {
+        'engine': name, 'timeframe': timeframe,
+        'datasets': len(data), 'bars': bars, 'configs': len(configs), 'backtests': backtests,
+        'data': data_fingerprint(data),
+        'trades': sum(r['total'] for r in summaries), 'wins': sum(r['wins'] for r in summaries),
+        'seconds': round(best, 6),
+        'bars_per_s': round(bars * len(configs) / best, 1) if best else None,
+        'backtests_per_s': round(backtests / best, 2) if best else None,
+        'base_rss_mb': base_rss, 'peak_rss_mb': _rss_mb(),
+        'stages': stage_times,
+    }
+
+
+def run(engines: List[str], timeframes: List[str], data_dir=DATA_DIR, limit: int = 0,
+        repeat: int = 1, stages: bool = True) -> dict:
+    """Benchmark every (engine, timeframe) pair, one fresh process each"""
+    for name in engines:
+        engine_class(name)
+    tasks = [(name, tf, str(data_dir), limit, repeat, stages) for name in engines for tf in timeframes]
+    results = []
+    started = time.time()
+    # spawn + one task per child: every pair starts from an empty heap
+    with get_context('spawn').Pool(1, maxtasksperchild=1) as pool:
+        for record in pool.imap(bench_pair, tasks):
+            results.append(record)
+            print(f"  {record['engine']:>13} {record['timeframe']:>4}: {record['backtests']:>5} backtests "
+                  f"{record['seconds']:8.2f}s {record['backtests_per_s'] or 0:9.1f}/s "
+                  f"{record['bars_per_s'] or 0:12.0f} bars/s  peak {record['peak_rss_mb']} MB",
+                  file=sys.stderr, flush=True)
+    return {
+        'format': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(started)),
+        'elapsed': round(time.time() - started, 3),
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                    'platform': platform.platform(), 'cpus': cpu_count()},
+        'settings': {'limit': limit, 'repeat': repeat, 'stages': stages},
+        'results': results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = THRESHOLD) -> List[str]:
+    """Regressions of current against baseline, one line each (empty: none)"""
+    old = {(r['engine'], r['timeframe']): r for r in baseline['results']}
+    flagged = []
+    for r in current['results']:
+        key = (r['engine'], r['timeframe'])
+        base = old.get(key)
+        if base is None:
+            continue
+        label = f"{key[0]} {key[1]}"
+        if base['data'] != r['data']:
+            print(f"  {label}: different data than the baseline, not compared", file=sys.stderr)
+            continue
+        if base['backtests_per_s'] and r['backtests_per_s'] is not None:
+            change = r['backtests_per_s'] / base['backtests_per_s'] - 1
+            print(f"  {label:>18}: {base['backtests_per_s']:9.1f} -> {r['backtests_per_s']:9.1f} backtests/s "
+                  f"({change * 100:+.1f}%)", file=sys.stderr)
+            if change < -threshold:
+                flagged.append(f"{label}: backtests/s {change * 100:+.1f}%")
+        if base['peak_rss_mb'] and r['peak_rss_mb'] is not None:
+            growth = r['peak_rss_mb'] / base['peak_rss_mb'] - 1
+            if growth > threshold:
+                flagged.append(f"{label}: peak RSS {base['peak_rss_mb']} -> {r['peak_rss_mb']} MB "
+                               f"({growth * 100:+.1f}%)")
+        if (base['trades'], base['wins']) != (r['trades'], r['wins']):
+            flagged.append(f"{label}: trades/wins changed {base['trades']}/{base['wins']} "
+                           f"-> {r['trades']}/{r['wins']}")
+    return flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--engines', help=f"comma-separated engine names (default: all of {', '.join(ENGINES)})")
+    parser.add_argument('--timeframes', help=f"comma-separated timeframes (default: {', '.join(TIMEFRAMES)})")
+    parser.add_argument('--data-dir', default=DATA_DIR, help='CSV directory (default: data/)')
+    parser.add_argument('--limit', type=int, default=0, help='datasets per timeframe (default: all)')
+    parser.add_argument('--repeat', type=int, default=1, help='timed passes per pair, best one kept')
+    parser.add_argument('--no-stages', action='store_true', help='skip the profiled pass')
+    parser.add_argument('-o', '--output', metavar='PATH', help='write the JSON report here instead of stdout')
+    parser.add_argument('--compare', metavar='BASELINE', help='flag regressions against a stored report')
+    parser.add_argument('--against', metavar='REPORT', help='with --compare: a stored report instead of a new run')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'relative change flagged by --compare (default: {THRESHOLD})')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    if args.against:
+        with open(args.against) as f:
+            current = json.load(f)
+    else:
+        if args.engines:
+            engines = args.engines.split(',')
+        elif baseline is not None:
+            engines = list(dict.fromkeys(r['engine'] for r in baseline['results']))
+        else:
+            engines = list(ENGINES)
+        if args.timeframes:
+            timeframes = args.timeframes.split(',')
+        elif baseline is not None:
+            timeframes = list(dict.fromkeys(r['timeframe'] for r in baseline['results']))
+        else:
+            timeframes = list(TIMEFRAMES)
+        settings = (baseline or {}).get('settings', {})
+        limit = args.limit or settings.get('limit', 0)
+        current = run(engines, timeframes, args.data_dir, limit, args.repeat, not args.no_stages)
+        if args.output:
+            atomic_write_json(args.output, current, indent=1)
+        else:
+            print(json.dumps(current, indent=1))
+
+    if baseline is not None:
+        flagged = compare(baseline, current, args.threshold)
+        for line in flagged:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if not flagged:
+            print(f"No regressions above {args.threshold * 100:.0f}%", file=sys.stderr)
+        sys.exit(1 if flagged else 0)
+
+
+if __name__ == '__main__':
+    main()
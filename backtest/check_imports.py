@@ -0,0 +1,159 @@
+"""
+Import-time budget for the backtest modules
+
+    python backtest/check_imports.py              # every module in BUDGETS
+    python backtest/check_imports.py backtester evaluator -v
+
+Each module is imported in a fresh `python -X importtime` process
+(median of --runs, after one unmeasured import that brings the .pyc
+files up to date); what the interpreter loads before running anything
+(site, encodings, ...) is left out. Everything a module pulls in at
+import counts against its budget in milliseconds: our own modules, the
+stdlib, other packages. A module may also be barred from loading some
+packages eagerly (NEVER_EAGER), e.g. an engine must not start
+multiprocessing or an HTTP server just by being imported. The exit
+status is 1 when anything is over budget.
+
+What this does not cover: NumPy and pandas are reported but not
+charged. Every engine imports both at the top (the engines work on
+DataFrames and Series throughout), and together they are most of the
+start-up time, typically 350-600 ms of a single-asset run. The budgets
+keep everything else from growing on top of that.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Optional
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FREE = ('numpy', 'pandas')  # reported, not charged
+
+# module -> milliseconds of warm import time besides numpy/pandas: about
+# twice the median measured when the budget was set (the import times of
+# a 1-CPU box under load swing by +-50%). signal_table and profiling pay
+# for dataclasses / typing themselves; in an engine those are already loaded
+BUDGETS = {
+    'bars': 12,
+    'pivots': 10,
+    'resolver': 10,
+    'signal_table': 70,
+    'indicators': 15,
+    'profiling': 45,
+    'backtester': 15,
+    'backtester_v2': 15,
+    'backtester_v8_ema': 15,
+    'strategies.momentum': 15,
+    'evaluator': 95,
+    'benchmark': 120,
+    'optimize': 115,
+    # single-asset / single-config entry points
+    'test_single_asset': 20,
+    'verify_params': 20,
+}
+
+# packages a module must not import at import time
+ENGINE_NEVER = ('multiprocessing', 'http', 'sqlite3', 'socket', 'yfinance')
+NEVER_EAGER = {
+    **{name: ENGINE_NEVER for name in ('bars', 'pivots', 'resolver', 'signal_table', 'indicators',
+                                       'profiling', 'backtester', 'backtester_v2', 'backtester_v8_ema',
+                                       'strategies.momentum', 'test_single_asset', 'verify_params')},
+    'evaluator': ('multiprocessing', 'http', 'sqlite3', 'yfinance'),
+    'optimize': ('multiprocessing.managers', 'http', 'sqlite3', 'yfinance'),
+    'benchmark': ('multiprocessing.pool', 'http', 'sqlite3', 'yfinance'),
+}
+
+
+def import_times(module: Optional[str]) -> list:
+    """(depth, name, self us, cumulative us) per module loaded by a fresh import of module (None: startup only)"""
+    code = f'import {module}' if module else 'pass'
+    # measure warm starts: let the interpreter write bytecode even if the shell says not to
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          cwd=HERE, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(own), int(cumulative)))
+    return entries
+
+
+def _is_free(name: str) -> bool:
+    return any(name == f or name.startswith(f + '.') for f in FREE)
+
+
+def measure(module: str, runs: int = 5) -> dict:
+    """Median import cost of module over runs, split into charged and free (numpy/pandas) ms"""
+    startup = {name for _, name, _, _ in import_times(None)}
+    import_times(module)  # compiles whatever is stale
+    records = []
+    for _ in range(runs):
+        entries = [e for e in import_times(module) if e[1] not in startup]
+        # importtime lists children before their parent, so walking it
+        # backwards meets every ancestor before its subtree
+        charged, free = {}, 0
+        ancestors = []  # (depth, inside numpy/pandas)
+        for depth, name, own, _ in reversed(entries):
+            while ancestors and ancestors[-1][0] >= depth:
+                ancestors.pop()
+            inside = _is_free(name) or bool(ancestors and ancestors[-1][1])
+            ancestors.append((depth, inside))
+            if inside:
+                free += own
+            else:
+                charged[name] = own
+        records.append({'charged_ms': sum(charged.values()) / 1000, 'free_ms': free / 1000,
+                        'charged': charged, 'loaded': {name for _, name, _, _ in entries}})
+    records.sort(key=lambda r: r['charged_ms'])
+    record = records[(len(records) - 1) // 2]  # a real run's breakdown, for -v
+    record['charged_ms'] = statistics.median(r['charged_ms'] for r in records)
+    record['free_ms'] = statistics.median(r['free_ms'] for r in records)
+    return record
+
+
+def check(modules, runs: int = 5, verbose: bool = False) -> list:
+    """Over-budget messages for modules (empty: all within budget)"""
+    problems = []
+    for module in modules:
+        record = measure(module, runs)
+        budget = BUDGETS.get(module)
+        eager = sorted({bad for bad in NEVER_EAGER.get(module, ())
+                        for name in record['loaded'] if name == bad or name.startswith(bad + '.')})
+        status = 'ok'
+        if budget is not None and record['charged_ms'] > budget:
+            status = 'OVER'
+            problems.append(f"{module}: {record['charged_ms']:.1f} ms > {budget} ms budget")
+        if eager:
+            status = 'OVER'
+            problems.append(f"{module}: imports {', '.join(eager)} eagerly")
+        print(f"  {module:<22} {record['charged_ms']:7.1f} ms (budget {budget if budget is not None else '-'}) "
+              f"+ numpy/pandas {record['free_ms']:6.1f} ms  {status}", flush=True)
+        if verbose:
+            slowest = sorted(((own, name) for name, own in record['charged'].items()), reverse=True)
+            for own, name in slowest[:10]:
+                print(f"      {own / 1000:7.1f} ms  {name}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('modules', nargs='*', help='modules to check (default: all of BUDGETS)')
+    parser.add_argument('--runs', type=int, default=5, help='fresh imports per module, median kept')
+    parser.add_argument('-v', '--verbose', action='store_true', help='show the slowest charged imports')
+    args = parser.parse_args(argv)
+
+    problems = check(args.modules or list(BUDGETS), args.runs, args.verbose)
+    for line in problems:
+        print(f"OVER BUDGET {line}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == '__main__':
+    main()
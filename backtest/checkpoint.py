@@ -0,0 +1,123 @@
+"""
+Append-only checkpoint of completed combos for long optimization runs
+Each completed combo (params + per-asset results) is one JSON line. Lines
+are appended in a single write per batch and fsync'ed, so a crash can at
+most leave a torn last line, which load() ignores. Restarting the same run
+reads the file back and skips everything already evaluated.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Optional
+
+FORMAT_VERSION = 1
+
+
+def param_hash(params: dict) -> str:
+    """Stable id of a param dict (key order doesn't matter)"""
+    return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def data_fingerprint(datasets: Dict[str, object]) -> str:
+    """Id of a set of BarArrays - a run over different data must not reuse results"""
+    digest = hashlib.sha1()
+    for asset in sorted(datasets):
+        digest.update(f"{asset}:{datasets[asset].fingerprint};".encode())
+    return digest.hexdigest()[:16]
+
+
+def atomic_write_json(path, obj, **dump_kwargs):
+    """Replace path with obj as JSON; readers never see a half-written file"""
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, 'w') as f:
+        json.dump(obj, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class Checkpoint:
+    """
+    Completed combos of one run, keyed by param_hash.
+    run_key identifies the run (e.g. data fingerprint + grid name); a file
+    written for a different run_key is moved aside to <path>.old and a
+    fresh one is started.
+    """
+
+    def __init__(self, path, run_key: str, flush_every: int = 100):
+        self.path = str(path)
+        self.run_key = run_key
+        self.flush_every = flush_every
+        self.done = {}
+        self.pending = []
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            self._write_lines([{'version': FORMAT_VERSION, 'run': self.run_key}])
+            return
+
+        with open(self.path) as f:
+            lines = f.read().split('\n')
+        records = []
+        for line in lines:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # torn tail from a crash, or blank
+        header = records[0] if records else {}
+        if header.get('version') != FORMAT_VERSION or header.get('run') != self.run_key:
+            os.replace(self.path, self.path + '.old')
+            self._write_lines([{'version': FORMAT_VERSION, 'run': self.run_key}])
+            return
+        for rec in records[1:]:
+            if 'key' in rec:
+                self.done[rec['key']] = rec
+        if lines and lines[-1]:
+            # Start the next append on a fresh line after a torn tail
+            self._write_raw('\n')
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.done
+
+    def __len__(self) -> int:
+        return len(self.done)
+
+    def records(self) -> Iterable[dict]:
+        return self.done.values()
+
+    def add(self, params: dict, results: Optional[dict], **extra):
+        """Record a finished combo (results=None for a pruned one)"""
+        rec = {'key': param_hash(params), 'params': params, 'results': results, **extra}
+        self.done[rec['key']] = rec
+        self.pending.append(rec)
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self._write_lines(self.pending)
+            self.pending = []
+
+    def _write_lines(self, records):
+        self._write_raw(''.join(json.dumps(r, default=str) + '\n' for r in records))
+
+    def _write_raw(self, text: str):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            data = text.encode()
+            while data:
+                data = data[os.write(fd, data):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
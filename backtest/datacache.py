@@ -0,0 +1,129 @@
+"""
+On-disk binary cache for parsed CSV files
+Every column of a parsed CSV (OHLCV plus the exported TradingView
+indicator columns) is stored as a .npy file under <csv dir>/.cache/, so
+repeated runs and pool workers skip pd.read_csv. Cached frames are
+ordinary writable frames; with mmap=True the columns are read-only views
+of the mapped files instead (for loaders that only read, e.g. BarArrays).
+Entries are keyed by path + read_csv arguments and invalidated when the
+CSV's size or mtime changes.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME = '.cache'
+FORMAT_VERSION = 1
+
+
+def cache_enabled() -> bool:
+    return os.environ.get('BACKTEST_NO_CACHE', '') in ('', '0')
+
+
+def _entry_dir(path: str, read_kwargs: dict) -> str:
+    key = json.dumps([os.path.abspath(path), sorted(read_kwargs.items())], default=str)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME,
+                        f"{os.path.basename(path)}.{digest}")
+
+
+def _stamp(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}_{st.st_mtime_ns}"
+
+
+def _cacheable(arr: np.ndarray) -> bool:
+    # Numbers, bools and naive datetimes only - strings/objects can't be mmapped
+    return arr.dtype.kind in 'biufmM'
+
+
+def _atomic_write(path: str, write, mode: str = 'wb'):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, mode) as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+def _load(entry: str, stamp: str, mmap: bool = False):
+    try:
+        with open(os.path.join(entry, 'meta.json')) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != FORMAT_VERSION or meta.get('stamp') != stamp:
+        return None
+
+    def mapped(fname):
+        if not mmap:
+            return np.load(os.path.join(entry, fname))
+        # Plain ndarray view over the mapping, so no np.memmap leaks into pandas
+        return np.load(os.path.join(entry, fname), mmap_mode='r').view(np.ndarray)
+
+    try:
+        columns = {name: mapped(fname) for name, fname in meta['columns']}
+        index = pd.Index(mapped(meta['index']), name=meta['index_name'])
+    except (OSError, ValueError):
+        return None
+    return pd.DataFrame(columns, index=index, copy=False)
+
+
+def _store(entry: str, stamp: str, df: pd.DataFrame):
+    index = np.asarray(df.index)
+    arrays = [np.asarray(df[c]) for c in df.columns]
+    if not _cacheable(index) or not all(_cacheable(a) for a in arrays):
+        return
+    if df.columns.has_duplicates:
+        return
+
+    os.makedirs(entry, exist_ok=True)
+    # File names carry the stamp so a rewrite never touches files that
+    # another process may still have mapped
+    columns = []
+    for i, (name, arr) in enumerate(zip(df.columns, arrays)):
+        fname = f"{stamp}_c{i}.npy"
+        _atomic_write(os.path.join(entry, fname), lambda f, a=arr: np.save(f, a))
+        columns.append((name, fname))
+    index_file = f"{stamp}_index.npy"
+    _atomic_write(os.path.join(entry, index_file), lambda f: np.save(f, index))
+
+    meta = {
+        'version': FORMAT_VERSION,
+        'stamp': stamp,
+        'columns': columns,
+        'index': index_file,
+        'index_name': df.index.name,
+    }
+    _atomic_write(os.path.join(entry, 'meta.json'),
+                  lambda f: json.dump(meta, f), mode='w')
+
+    for fname in os.listdir(entry):
+        if fname.endswith('.npy') and not fname.startswith(stamp + '_'):
+            try:
+                os.remove(os.path.join(entry, fname))
+            except OSError:
+                pass
+
+
+def read_csv_cached(path: str, mmap: bool = False, **read_kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv(path, **read_kwargs), served from the binary cache when it is fresh.
+    mmap=True maps the cached columns read-only instead of reading them
+    """
+    if not cache_enabled():
+        return pd.read_csv(path, **read_kwargs)
+
+    entry = _entry_dir(path, read_kwargs)
+    stamp = _stamp(path)
+    df = _load(entry, stamp, mmap)
+    if df is not None:
+        return df
+
+    df = pd.read_csv(path, **read_kwargs)
+    try:
+        _store(entry, stamp, df)
+    except OSError:
+        pass  # read-only data dir etc. - caching is best effort
+    return df
@@ -0,0 +1,305 @@
+"""
+Coordinator/worker mode: spread an Evaluator's chunks over several hosts
+The coordinator serves param chunks from a TCP work queue
+(multiprocessing.managers, HMAC-authenticated with an authkey). Worker
+hosts connect, fetch the datasets once, publish them to shared memory for
+their local processes and pull chunks until the coordinator closes. Each
+worker process sends heartbeats; chunks leased to a worker that goes quiet
+for `lease_timeout` seconds are handed to another worker (up to
+`max_attempts` tries per chunk).
+
+    python optimize.py specs/1h_grid.yaml --serve 0.0.0.0:50000 --authkey SECRET
+    python distributed.py coordinator-host:50000 --authkey SECRET --processes 8
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import secrets
+import socket
+import threading
+import time
+import traceback
+from collections import deque
+from multiprocessing import Process, cpu_count
+from multiprocessing.managers import BaseManager
+from typing import Dict, List, Optional, Tuple
+from bars import BarArrays
+from backtester import ElliottICTBacktester
+from evaluator import CHUNK, Evaluator, _DATA, _init_worker, run_timed
+from shared_data import publish
+
+DEFAULT_PORT = 50000
+HEARTBEAT = 2.0       # seconds between worker heartbeats
+LEASE_TIMEOUT = 30.0  # a worker silent this long is considered lost
+MAX_ATTEMPTS = 3      # leases per chunk before the run fails
+STOP = 'stop'
+
+
+def parse_address(text: str) -> Tuple[str, int]:
+    """'host:port', 'host' or ':port' -> (host, port)"""
+    host, _, port = text.rpartition(':') if ':' in text else (text, '', '')
+    return host or '127.0.0.1', int(port) if port else DEFAULT_PORT
+
+
+class WorkQueue:
+    """
+    Coordinator-side state, called from the manager's connection threads.
+    Chunks are leased to a worker; a lease ends with put()/fail() or when
+    the worker stops calling in.
+    """
+
+    def __init__(self, engine, datasets: Dict[str, BarArrays], lease_timeout: float = LEASE_TIMEOUT,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.engine = engine
+        self.datasets = datasets
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._pending = deque()
+        self._tasks = {}     # id -> task
+        self._attempts = {}  # id -> leases so far
+        self._errors = {}    # id -> last worker traceback
+        self._leases = {}    # id -> worker
+        self._results = {}
+        self._seen = {}      # worker -> last call (monotonic)
+        self._closed = False
+
+    # Worker calls
+
+    def job(self) -> dict:
+        """Engine and datasets, fetched once per worker host"""
+        return {'engine': self.engine, 'datasets': self.datasets}
+
+    def heartbeat(self, worker: str):
+        with self._cond:
+            self._touch(worker)
+
+    def _touch(self, worker: str):
+        if worker not in self._seen:
+            print(f"  Worker joined: {worker}", flush=True)
+        self._seen[worker] = time.monotonic()
+
+    def get(self, worker: str, wait: float = 1.0):
+        """(task id, task), None if nothing is queued within wait, or STOP"""
+        with self._cond:
+            self._touch(worker)
+            deadline = time.monotonic() + wait
+            while not self._pending and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            if self._closed:
+                return STOP
+            task_id = self._pending.popleft()
+            self._leases[task_id] = worker
+            self._attempts[task_id] += 1
+            return task_id, self._tasks[task_id]
+
+    def put(self, worker: str, task_id: int, result):
+        with self._cond:
+            self._touch(worker)
+            if task_id in self._tasks and task_id not in self._results:
+                self._results[task_id] = result  # first answer wins, a late duplicate is dropped
+                self._leases.pop(task_id, None)
+                self._cond.notify_all()
+
+    def fail(self, worker: str, task_id: int, error: str):
+        with self._cond:
+            self._touch(worker)
+            if self._leases.get(task_id) == worker:
+                del self._leases[task_id]
+                self._errors[task_id] = error
+                self._pending.append(task_id)
+                self._cond.notify_all()
+
+    # Coordinator calls
+
+    def submit(self, tasks: list) -> List[int]:
+        with self._cond:
+            ids = list(range(self._next_id, self._next_id + len(tasks)))
+            self._next_id += len(tasks)
+            for task_id, task in zip(ids, tasks):
+                self._tasks[task_id] = task
+                self._attempts[task_id] = 0
+                self._pending.append(task_id)
+            self._cond.notify_all()
+        return ids
+
+    def collect(self, ids: List[int]):
+        """Results in the order of ids, each as soon as it is in; requeues chunks of lost workers"""
+        for task_id in ids:
+            with self._cond:
+                while task_id not in self._results:
+                    self._requeue_lost()
+                    for pending in self._pending:
+                        if self._attempts[pending] >= self.max_attempts:
+                            error = self._errors.get(pending, 'worker lost')
+                            raise RuntimeError(f"Chunk {pending} failed {self.max_attempts} times:\n{error}")
+                    self._cond.wait(1.0)
+                result = self._results.pop(task_id)
+                del self._tasks[task_id], self._attempts[task_id]
+                self._errors.pop(task_id, None)
+            yield result
+
+    def _requeue_lost(self):
+        now = time.monotonic()
+        lost = {w for w, seen in self._seen.items() if now - seen > self.lease_timeout}
+        for worker in lost:
+            tasks = [i for i, w in self._leases.items() if w == worker]
+            for task_id in tasks:
+                del self._leases[task_id]
+                self._pending.appendleft(task_id)
+            del self._seen[worker]
+            print(f"  Worker lost: {worker} ({len(tasks)} chunks requeued)", flush=True)
+        if lost:
+            self._cond.notify_all()
+
+    def workers(self) -> int:
+        with self._cond:
+            return len(self._seen)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class _CoordinatorManager(BaseManager):
+    pass
+
+
+def _coordinator_manager(queue: WorkQueue):
+    """A manager class serving this queue; register() on a fresh subclass
+    leaves other coordinators in the same process alone"""
+    class Manager(_CoordinatorManager):
+        pass
+
+    Manager.register('work_queue', callable=lambda: queue)
+    return Manager
+
+
+class _WorkerManager(BaseManager):
+    pass
+
+
+_WorkerManager.register('work_queue')
+
+
+class DistributedEvaluator(Evaluator):
+    """
+    Evaluator whose chunks run on remote worker processes.
+    processes is only the expected worker count (it sizes TPE batches);
+    chunks are spread over however many workers connect.
+    """
+
+    def __init__(self, datasets: Dict[str, BarArrays], engine=ElliottICTBacktester,
+                 address=('127.0.0.1', DEFAULT_PORT), authkey: Optional[bytes] = None,
+                 processes: Optional[int] = None, chunk: int = CHUNK, run=None, telemetry=None,
+                 lease_timeout: float = LEASE_TIMEOUT, max_attempts: int = MAX_ATTEMPTS,
+                 profile: bool = False):
+        super().__init__(datasets, engine, processes, chunk, run, telemetry, profile)
+        self.authkey = authkey or secrets.token_hex(16).encode()
+        self.queue = WorkQueue(engine, self.data, lease_timeout, max_attempts)
+        manager = _coordinator_manager(self.queue)
+        self._server = manager(address=address, authkey=self.authkey).get_server()
+        self.address = self._server.address
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def _inline(self, configs: List[dict]) -> bool:
+        return False
+
+    def _map(self, tasks: list):
+        ids = self.queue.submit([task[1:] for task in tasks])
+        return self.queue.collect(ids)
+
+    def close(self):
+        super().close()
+        self.queue.close()
+
+
+def _connect(address, authkey: bytes, retry_for: float = 60.0):
+    """Connected worker-side manager, retrying while the coordinator starts up"""
+    deadline = time.monotonic() + retry_for
+    delay = 0.5
+    while True:
+        manager = _WorkerManager(address=address, authkey=authkey)
+        try:
+            manager.connect()
+            return manager
+        except (ConnectionError, OSError):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(delay)
+            delay = min(delay * 2, 5.0)
+
+
+def _heartbeat(queue, worker: str, stop: threading.Event):
+    while not stop.wait(HEARTBEAT):
+        try:
+            queue.heartbeat(worker)
+        except (ConnectionError, EOFError, OSError):
+            return
+
+
+def _work(address, authkey: bytes, handle: dict, engine):
+    """One worker process: pull chunks until the coordinator stops or goes away"""
+    _init_worker(handle)
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    queue = _connect(address, authkey).work_queue()
+    stop = threading.Event()
+    threading.Thread(target=_heartbeat, args=(queue, worker, stop), daemon=True).start()
+    try:
+        while True:
+            task = queue.get(worker)
+            if task == STOP:
+                break
+            if task is None:
+                continue
+            task_id, (configs, assets, fraction, profile) = task
+            try:
+                result = run_timed(_DATA, engine, configs, assets, fraction, profile)
+            except Exception:
+                queue.fail(worker, task_id, traceback.format_exc())
+                continue
+            queue.put(worker, task_id, result)
+    except (ConnectionError, EOFError, OSError):
+        pass  # coordinator finished and shut down
+    finally:
+        stop.set()
+
+
+def run_workers(address, authkey: bytes, processes: Optional[int] = None, retry_for: float = 60.0):
+    """Serve one coordinator from this host with `processes` worker processes"""
+    processes = processes or cpu_count()
+    manager = _connect(address, authkey, retry_for)
+    job = manager.work_queue().job()
+    print(f"Connected to {address[0]}:{address[1]}: {len(job['datasets'])} assets, "
+          f"{processes} processes", flush=True)
+
+    with publish(job['datasets']) as shared:
+        workers = [Process(target=_work, args=(address, authkey, shared.handle, job['engine']))
+                   for _ in range(processes)]
+        for p in workers:
+            p.start()
+        for p in workers:
+            p.join()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Worker host for a distributed optimizer run')
+    parser.add_argument('address', help='coordinator host:port')
+    parser.add_argument('--authkey', default=os.environ.get('BACKTEST_AUTHKEY'),
+                        help='shared secret printed by the coordinator (or BACKTEST_AUTHKEY)')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--retry-for', type=float, default=60.0,
+                        help='seconds to keep retrying the connection')
+    args = parser.parse_args()
+    if not args.authkey:
+        parser.error('--authkey (or BACKTEST_AUTHKEY) is required')
+    run_workers(parse_address(args.address), args.authkey.encode(), args.processes, args.retry_for)
@@ -0,0 +1,276 @@
+"""
+Parallel evaluation core for the parameter searches
+An Evaluator owns the loaded datasets, publishes them once to a Pool
+through shared memory and runs lists of parameter dicts on any subset of
+assets (optionally only the most recent part of each history). Engines
+with run_batch() get whole chunks of configs per asset; chunks are cut
+longest-first by schedule.py's cost estimate.
+"""
+
+import importlib
+import math
+import os
+import time
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional
+from bars import BarArrays
+from backtester import ElliottICTBacktester, load_data
+from indicators import MAX_DATASETS
+from schedule import plan_configs
+from telemetry import counters, chunk_stats
+import profiling
+
+CHUNK = 120  # max configs per task
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+# timeframe -> (TradingView export suffix, MNQ file suffix)
+TIMEFRAMES = {
+    '1m': ('1', '1m'),
+    '5m': ('5', '5m'),
+    '15m': ('15', '15m'),
+    '30m': ('30', '30m'),
+    '1h': ('60', '1H'),
+    '4h': ('240', '4H'),
+    '1d': ('1D', '1D'),
+}
+
+# Engine name -> "module:attribute"; anything else of that form is imported as-is
+ENGINES = {
+    'v1': 'backtester:ElliottICTBacktester',
+    'v2': 'backtester_v2:ElliottICTBacktesterV2',
+    'v3': 'backtester_v3:ElliottICTBacktesterV3',
+    'v4': 'backtester_v4:ElliottICTBacktesterV4',
+    'v5': 'backtester_v5:ElliottICTBacktesterV5',
+    'v6': 'evaluator:single_timeframe_v6',
+    'v7': 'backtester_v7_breakout:BreakoutPullbackBacktester',
+    'v8': 'backtester_v8_ema:EMAPullbackBacktester',
+    'breakout': 'strategies.breakout:BreakoutStrategy',
+    'dynamic_tp': 'strategies.dynamic_tp:DynamicTPStrategy',
+    'ict_pure': 'strategies.ict_pure:ICTPureStrategy',
+    'momentum': 'strategies.momentum:MomentumStrategy',
+    'supply_demand': 'strategies.supply_demand:SupplyDemandStrategy',
+}
+
+# Worker side datasets, filled by _init_worker
+_DATA = {}
+
+# (id(bars), fraction) -> (weakref to bars, its recent() view)
+_RECENT = OrderedDict()
+
+
+def single_timeframe_v6(df, params: dict = None):
+    """V6 without a higher-timeframe frame, callable like the other engines"""
+    from backtester_v6_mtf import ElliottICTBacktesterV6
+    return ElliottICTBacktesterV6(df, None, params)
+
+
+def engine_class(name: str):
+    """Resolve an ENGINES name (or 'module:attribute') to an engine(df, params) callable"""
+    target = ENGINES.get(name, name)
+    if ':' not in target:
+        raise ValueError(f"Unknown engine: {name} (known: {', '.join(ENGINES)})")
+    module, attr = target.split(':', 1)
+    return getattr(importlib.import_module(module), attr)
+
+
+def timeframe_files(timeframe: str, data_dir=DATA_DIR) -> Dict[str, Path]:
+    """
+    {asset: csv path} for one timeframe, e.g. 'BATS_AMD, 15_c4561.csv' -> AMD
+    and 'MNQ_15m.csv' -> MNQ for '15m'. First file wins if an asset repeats.
+    """
+    export, mnq = TIMEFRAMES[timeframe.lower()]
+    files = {}
+    for path in sorted(Path(data_dir).glob('*.csv')):
+        stem = path.stem
+        if ', ' in stem:
+            name, rest = stem.split(', ', 1)
+            if rest.split('_')[0] != export:
+                continue
+            asset = name.split('_', 1)[-1]
+        else:
+            asset, _, tf = stem.rpartition('_')
+            if not asset or tf.lower() != mnq.lower():
+                continue
+        files.setdefault(asset, path)
+    return files
+
+
+def load_datasets(files: Dict[str, Path]) -> Dict[str, BarArrays]:
+    """Load every file once; unreadable files are skipped like in the old scripts"""
+    data = {}
+    for asset, path in files.items():
+        try:
+            data[asset] = BarArrays.from_df(load_data(str(path), mmap=True))  # read-only anyway
+        except Exception as e:
+            print(f"  Error loading {asset}: {e}", flush=True)
+    return data
+
+
+def summarize(result) -> dict:
+    """The per-asset record test_parallel.py keeps: closed trades, wins, win rate"""
+    total = result.wins + result.losses
+    return {'total': total, 'wins': result.wins, 'wr': result.win_rate if total > 0 else 0}
+
+
+def passes(r: dict, min_trades: int = 2, min_wr: float = 80) -> bool:
+    return r['total'] >= min_trades and r['wr'] >= min_wr
+
+
+def recent(bars: BarArrays, fraction: float) -> BarArrays:
+    """
+    The last `fraction` of a history as views (fraction=1 returns bars itself).
+    The same (bars, fraction) always gets the same BarArrays back, so every
+    chunk of a rung shares its indicator cache and pivot fingerprint.
+    """
+    if fraction >= 1:
+        return bars
+    key = (id(bars), fraction)
+    entry = _RECENT.get(key)
+    if entry is not None and entry[0]() is bars:
+        _RECENT.move_to_end(key)
+        return entry[1]
+
+    start = len(bars) - max(1, int(math.ceil(len(bars) * fraction)))
+    volume = bars.volume[start:] if bars.volume is not None else None
+    view = BarArrays(bars.open[start:], bars.high[start:], bars.low[start:], bars.close[start:],
+                     volume=volume, time=bars.time[start:])
+    _RECENT[key] = (weakref.ref(bars), view)
+    weakref.finalize(bars, _RECENT.pop, key, None)
+    while len(_RECENT) > MAX_DATASETS:
+        _RECENT.popitem(last=False)
+    return view
+
+
+def _run_asset(engine, bars: BarArrays, configs: List[dict]) -> List[dict]:
+    if hasattr(engine, 'run_batch'):
+        return [summarize(r) for r in engine(bars).run_batch(configs)]
+    return [summarize(engine(bars, p).run_backtest()) for p in configs]
+
+
+def run_chunk(data: Dict[str, BarArrays], engine, configs: List[dict],
+              assets: List[str], fraction: float = 1.0) -> List[Dict[str, dict]]:
+    """Evaluate configs on assets; an asset that raises is left out, like the old scripts"""
+    results = [{} for _ in configs]
+    for asset in assets:
+        try:
+            per_asset = _run_asset(engine, recent(data[asset], fraction), configs)
+        except Exception:
+            continue
+        for res, r in zip(results, per_asset):
+            res[asset] = r
+    return results
+
+
+def run_timed(data: Dict[str, BarArrays], engine, configs: List[dict],
+              assets: List[str], fraction: float = 1.0, profile: bool = False):
+    """run_chunk plus the telemetry.chunk_stats record for it (profile: with profiling on)"""
+    before = counters()
+    start = time.perf_counter()
+    with profiling.enabled(profile or profiling.ENABLED):
+        results = run_chunk(data, engine, configs, assets, fraction)
+    stats = chunk_stats(before, len(configs), len(configs) * len(assets), time.perf_counter() - start)
+    return results, stats
+
+
+def _init_worker(handle):
+    from shared_data import attach
+    _DATA.update(attach(handle))
+
+
+def _run_task(task):
+    engine, configs, assets, fraction, profile = task
+    return run_timed(_DATA, engine, configs, assets, fraction, profile)
+
+
+class Evaluator:
+    """
+    Evaluate parameter dicts on the loaded datasets.
+    processes=1 runs inline; otherwise a Pool is started on first use and
+    shut down by close() (or the with-block). Full-history results are
+    also written to `run` (a results_db.Run) when one is given, and every
+    chunk's stats go to `telemetry` (a telemetry.Telemetry). With
+    profile=True the engines run with profiling on; either way the chunks'
+    stage timings add up in self.profile.
+    """
+
+    def __init__(self, datasets: Dict[str, BarArrays], engine=ElliottICTBacktester,
+                 processes: Optional[int] = None, chunk: int = CHUNK, run=None, telemetry=None,
+                 profile: bool = False):
+        self.data = dict(datasets)
+        self.assets = list(self.data)
+        self.engine = engine
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk = chunk
+        self.run = run
+        self.telemetry = telemetry
+        self.profiling = profile
+        self.profile = profiling.Profile()  # stage timings of every chunk so far
+        self.backtests = 0  # (config, asset) pairs evaluated so far
+        self._shared = None
+        self._pool = None
+
+    def evaluate(self, configs: List[dict], assets: Optional[List[str]] = None,
+                 fraction: float = 1.0) -> List[Dict[str, dict]]:
+        """Per config: {asset: {'total', 'wins', 'wr'}}, in the order of configs"""
+        assets = self.assets if assets is None else list(assets)
+        configs = list(configs)
+        self.backtests += len(configs) * len(assets)
+        if self._inline(configs):
+            results, stats = run_timed(self.data, self.engine, configs, assets, fraction, self.profiling)
+            self._report(stats, 0)
+        else:
+            bars = int(sum(len(self.data[a]) for a in assets) * fraction)
+            chunks = plan_configs(configs, bars, self.processes, self.chunk)
+            tasks = [(self.engine, [configs[i] for i in chunk], assets, fraction, self.profiling)
+                     for chunk in chunks]
+            results = [None] * len(configs)
+            for n, (chunk, (part, stats)) in enumerate(zip(chunks, self._map(tasks)), 1):
+                for i, res in zip(chunk, part):
+                    results[i] = res
+                self._report(stats, len(chunks) - n)
+
+        if self.run is not None and fraction >= 1:
+            for params, res in zip(configs, results):
+                self.run.add(params, res)
+        return results
+
+    def _inline(self, configs: List[dict]) -> bool:
+        return self.processes <= 1 or len(configs) <= self.chunk
+
+    def _map(self, tasks: list):
+        """Per-chunk (results, stats) for (engine, configs, assets, fraction, profile) tasks, in order"""
+        return self.pool.imap(_run_task, tasks)
+
+    def _report(self, stats: dict, queue_depth: int):
+        self.profile.merge(stats['stages'])
+        if self.telemetry is not None:
+            self.telemetry.chunk(stats, queue_depth)
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            from multiprocessing import Pool
+            from shared_data import publish
+            self._shared = publish(self.data)
+            self._pool = Pool(processes=self.processes, initializer=_init_worker,
+                              initargs=(self._shared.handle,))
+        return self._pool
+
+    def close(self):
+        if self.run is not None:
+            self.run.flush()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -7,6 +7,7 @@ import sys
 sys.path.append(os.path.dirname(__file__))
 
 from backtester import ElliottICTBacktester, load_data
+from bars import BarArrays
 from itertools import product
 import glob
 
@@ -36,7 +37,7 @@ def load_all_data(tf):
     for asset in ASSETS:
         f = find_file(asset, tf)
         if f:
-            data[asset] = load_data(f)
+            data[asset] = BarArrays.from_df(load_data(f))
     return data
 
 def test_params(data, params):
@@ -0,0 +1,279 @@
+"""
+Indicator columns shared across backtesters, strategies and scripts
+Every indicator is computed for the whole dataset at once as a NumPy
+array and read by bar index. IndicatorCache memoizes them per dataset
+and shared_cache() hands the same cache to every backtester built from
+the same object, so a grid search never recomputes EMA-200 or RSI-14.
+
+Some scripts used their own loop formulations (windowed sums, recursive
+EMA/ATR); those have their own functions here that reproduce the loops'
+floating-point results exactly, so switching a script over doesn't move
+any trade.
+"""
+
+import weakref
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from bars import BarArrays
+
+
+def sma(df: pd.DataFrame, period: int) -> pd.Series:
+    """Simple moving average of close (the backtester's 'ema_period' trend line)"""
+    return df['close'].rolling(period).mean()
+
+
+def rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    """RSI on simple rolling means of gains/losses"""
+    delta = df['close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def wilder_rsi(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    """RSI on Wilder-smoothed gains/losses (alpha = 1/period)"""
+    delta = df['close'].diff()
+    gain = delta.where(delta > 0, 0).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    loss = (-delta.where(delta < 0, 0)).ewm(alpha=1 / period, adjust=False, min_periods=period).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def _window_sum(values: np.ndarray, period: int) -> np.ndarray:
+    """
+    out[i] = values[i-period+1] + ... + values[i], added left to right like
+    a Python loop would (a rolling sum adds and subtracts, which rounds
+    differently); NaN for the first period-1 bars
+    """
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        acc = values[:len(values) - period + 1].copy()
+        for k in range(1, period):
+            acc += values[k:len(values) - period + 1 + k]
+        out[period - 1:] = acc
+    return out
+
+
+def window_rsi(df: pd.DataFrame, period: int = 14) -> np.ndarray:
+    """
+    RSI from plain sums of the last `period` close changes up to each bar
+    (advanced_optimizer / MomentumStrategy formulation): 100 without losses,
+    NaN before bar `period`
+    """
+    close = df['close'].to_numpy(dtype=float)
+    change = np.diff(close, prepend=np.nan)
+    gains = _window_sum(np.where(change > 0, change, 0.0), period)
+    losses = _window_sum(np.where(change > 0, 0.0, -change), period)
+    avg_gain = gains / period
+    avg_loss = losses / period
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+    out[:period] = np.nan
+    return out
+
+
+def ema(df: pd.DataFrame, period: int, adjust: bool = True) -> pd.Series:
+    """pandas EMA of close, ewm(span=period, adjust=adjust)"""
+    return df['close'].ewm(span=period, adjust=adjust).mean()
+
+
+def recursive_ema(df: pd.DataFrame, period: int) -> np.ndarray:
+    """
+    ema[i] = close[i] * k + ema[i-1] * (1 - k), seeded with close[0].
+    Same recursion as ema(adjust=False) but pandas rounds the update
+    differently; this one matches advanced_optimizer's loop bit for bit.
+    """
+    close = df['close'].to_numpy(dtype=float).tolist()
+    out = np.empty(len(close))
+    if close:
+        mult = 2 / (period + 1)
+        value = close[0]
+        out[0] = value
+        for i in range(1, len(close)):
+            value = (close[i] * mult) + (value * (1 - mult))
+            out[i] = value
+    return out
+
+
+def window_ema(df: pd.DataFrame, period: int) -> np.ndarray:
+    """
+    EMA restarted on every bar from close[bar - period] and stepped over the
+    next `period` closes (MomentumStrategy formulation); NaN before bar `period`
+    """
+    close = df['close'].to_numpy(dtype=float)
+    n = len(close)
+    out = np.full(n, np.nan)
+    if n > period:
+        mult = 2 / (period + 1)
+        value = close[:n - period].copy()
+        for k in range(1, period + 1):
+            value = (close[k:n - period + k] - value) * mult + value
+        out[period:] = value
+    return out
+
+
+def true_range(df: pd.DataFrame) -> np.ndarray:
+    """max(high - low, |high - prev close|, |low - prev close|); high - low on the first bar"""
+    high = df['high'].to_numpy(dtype=float)
+    low = df['low'].to_numpy(dtype=float)
+    close = df['close'].to_numpy(dtype=float)
+    tr = high - low
+    if len(tr) > 1:
+        prev = close[:-1]
+        tr[1:] = np.maximum(np.maximum(tr[1:], np.abs(high[1:] - prev)), np.abs(low[1:] - prev))
+    return tr
+
+
+def atr(df: pd.DataFrame, period: int = 14) -> pd.Series:
+    """Rolling mean of the true range"""
+    return pd.Series(true_range(df), index=df.index).rolling(period).mean()
+
+
+def wilder_atr(df: pd.DataFrame, period: int = 14) -> np.ndarray:
+    """
+    Wilder-smoothed ATR as advanced_optimizer computes it: 0 on the first
+    bar, the raw true range up to bar period-1, then
+    (atr[i-1] * (period - 1) + tr) / period
+    """
+    tr = true_range(df).tolist()
+    out = np.zeros(len(tr))
+    value = 0.0
+    for i in range(1, len(tr)):
+        value = tr[i] if i < period else (value * (period - 1) + tr[i]) / period
+        out[i] = value
+    return out
+
+
+def window_atr(df: pd.DataFrame, period: int = 14) -> np.ndarray:
+    """Mean true range of the `period` bars before each bar (DynamicTPStrategy); NaN before bar `period`"""
+    out = np.full(len(df), np.nan)
+    out[period:] = (_window_sum(true_range(df), period) / period)[period - 1:-1]
+    return out
+
+
+def volume_sma(df: pd.DataFrame, period: int = 20) -> pd.Series:
+    return df['volume'].rolling(period).mean()
+
+
+def swing_low(df: pd.DataFrame, lookback: int) -> pd.Series:
+    """Lowest low of the `lookback` bars before each bar (fewer at the start)"""
+    return df['low'].rolling(lookback, min_periods=1).min().shift(1)
+
+
+def swing_high(df: pd.DataFrame, lookback: int) -> pd.Series:
+    """Highest high of the `lookback` bars before each bar (fewer at the start)"""
+    return df['high'].rolling(lookback, min_periods=1).max().shift(1)
+
+
+def body(df: pd.DataFrame) -> np.ndarray:
+    return np.abs(df['close'].to_numpy(dtype=float) - df['open'].to_numpy(dtype=float))
+
+
+def candle_range(df: pd.DataFrame) -> np.ndarray:
+    return df['high'].to_numpy(dtype=float) - df['low'].to_numpy(dtype=float)
+
+
+def body_ratio(df: pd.DataFrame) -> np.ndarray:
+    """body / range, NaN for zero-range bars"""
+    full = candle_range(df)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(full == 0, np.nan, body(df) / full)
+
+
+def upper_wick(df: pd.DataFrame) -> np.ndarray:
+    return df['high'].to_numpy(dtype=float) - np.maximum(df['open'].to_numpy(dtype=float),
+                                                         df['close'].to_numpy(dtype=float))
+
+
+def lower_wick(df: pd.DataFrame) -> np.ndarray:
+    return np.minimum(df['open'].to_numpy(dtype=float), df['close'].to_numpy(dtype=float)) - df['low'].to_numpy(dtype=float)
+
+
+INDICATORS = {
+    'sma': sma,
+    'rsi': rsi,
+    'wilder_rsi': wilder_rsi,
+    'window_rsi': window_rsi,
+    'ema': ema,
+    'recursive_ema': recursive_ema,
+    'window_ema': window_ema,
+    'true_range': true_range,
+    'atr': atr,
+    'wilder_atr': wilder_atr,
+    'window_atr': window_atr,
+    'volume_sma': volume_sma,
+    'swing_low': swing_low,
+    'swing_high': swing_high,
+    'body': body,
+    'candle_range': candle_range,
+    'body_ratio': body_ratio,
+    'upper_wick': upper_wick,
+    'lower_wick': lower_wick,
+}
+
+
+class IndicatorCache:
+    """Indicator columns for one dataset, keyed by (name, *args)"""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.columns = {}
+
+    def get(self, name: str, *args) -> np.ndarray:
+        """Read-only float column of INDICATORS[name](df, *args)"""
+        key = (name,) + args
+        col = self.columns.get(key)
+        if col is None:
+            col = np.asarray(INDICATORS[name](self.df, *args), dtype=float)
+            col.flags.writeable = False
+            self.columns[key] = col
+            STATS['misses'] += 1
+        else:
+            STATS['hits'] += 1
+        return col
+
+    def series(self, name: str, *args) -> pd.Series:
+        """get() as a Series on the dataset's index, for code written against .iloc"""
+        return pd.Series(self.get(name, *args), index=self.df.index, copy=False)
+
+
+# Lookups over every IndicatorCache in this process (read by telemetry.py)
+STATS = {'hits': 0, 'misses': 0}
+
+
+MAX_DATASETS = 128  # caches kept by shared_cache(), least recently used dropped first
+
+# id(source) -> (weakref to source, cache), least recently used first;
+# entries are dropped when the source object is garbage collected so ids
+# can't be reused by mistake
+_SHARED = OrderedDict()
+
+
+def shared_cache(source, df: pd.DataFrame = None) -> IndicatorCache:
+    """
+    Cache shared by every backtester built from the same `source` object.
+    df is the normalized frame the columns are computed from (default: the
+    source itself, or its frame for a BarArrays); it is only used the first
+    time a cache is created for source.
+    """
+    key = id(source)
+    entry = _SHARED.get(key)
+    if entry is not None and entry[0]() is source:
+        _SHARED.move_to_end(key)
+        return entry[1]
+
+    if df is None:
+        df = source.frame if isinstance(source, BarArrays) else source
+    cache = IndicatorCache(df)
+    _SHARED[key] = (weakref.ref(source), cache)
+    weakref.finalize(source, _SHARED.pop, key, None)
+    while len(_SHARED) > MAX_DATASETS:
+        _SHARED.popitem(last=False)
+    return cache
+
+
+def clear_shared():
+    """Drop every shared cache (benchmarks start each pass cold)"""
+    _SHARED.clear()
@@ -3,6 +3,10 @@ import os
 import sys
 sys.path.append(os.path.dirname(__file__))
 from backtester import load_data
+from indicators import shared_cache
+from pivots import find_pivots
+from resolver import resolve_signals
+import numpy as np
 import glob
 
 DATA_DIR = r'C:\Users\danie\projects\elliott-wave-indicator\data'
@@ -25,37 +29,19 @@ for f in list(set(files)):
     except:
         pass
 
-def calculate_rsi(df, period=14):
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
-def calculate_ema(df, period):
-    return df['close'].ewm(span=period, adjust=False).mean()
-
-def calculate_atr(df, period=14):
-    high_low = df['high'] - df['low']
-    high_close = abs(df['high'] - df['close'].shift())
-    low_close = abs(df['low'] - df['close'].shift())
-    tr = high_low.combine(high_close, max).combine(low_close, max)
-    return tr.rolling(period).mean()
-
 def calculate_zigzag(df, depth):
     highs = df['high'].values
     lows = df['low'].values
     pivots = []
     last_pivot_type = None
     
-    for i in range(depth, len(df) - depth):
-        is_high = all(highs[i] >= highs[i-j] and highs[i] >= highs[i+j] for j in range(1, depth+1))
-        is_low = all(lows[i] <= lows[i-j] and lows[i] <= lows[i+j] for j in range(1, depth+1))
-        
-        if is_high and last_pivot_type != 'high':
+    is_ph, is_pl = find_pivots(highs, lows, depth, strict=False, ignore_nan=False)
+    
+    for i in np.flatnonzero(is_ph | is_pl).tolist():
+        if is_ph[i] and last_pivot_type != 'high':
             pivots.append({'idx': i, 'type': 'high', 'val': highs[i]})
             last_pivot_type = 'high'
-        elif is_low and last_pivot_type != 'low':
+        elif is_pl[i] and last_pivot_type != 'low':
             pivots.append({'idx': i, 'type': 'low', 'val': lows[i]})
             last_pivot_type = 'low'
     return pivots
@@ -70,8 +56,8 @@ def backtest(df, params):
     min_wave_pct = params.get('min_wave_pct', 0)
     fib_tolerance = params.get('fib_tolerance', 0.05)
     
-    rsi = calculate_rsi(df)
-    ema = calculate_ema(df, ema_period) if use_ema else None
+    rsi = shared_cache(df).get('rsi', 14)
+    ema = shared_cache(df).get('ema', ema_period, False) if use_ema else None
     pivots = calculate_zigzag(df, zz)
     
     signals = []
@@ -92,11 +78,11 @@ def backtest(df, params):
                 bar = p2['idx']
                 
                 # RSI filter
-                if rsi.iloc[bar] > rsi_max or rsi.iloc[bar] < rsi_min:
+                if rsi[bar] > rsi_max or rsi[bar] < rsi_min:
                     continue
                 
                 # EMA filter
-                if use_ema and df['close'].iloc[bar] < ema.iloc[bar]:
+                if use_ema and df['close'].iloc[bar] < ema[bar]:
                     continue
                 
                 # Bullish candle filter
@@ -108,15 +94,11 @@ def backtest(df, params):
                 tp = entry + (entry - sl) * 1.5
                 signals.append({'bar': bar, 'sl': sl, 'tp': tp})
     
-    wins, losses = 0, 0
-    for sig in signals:
-        for bar in range(sig['bar'] + 1, len(df)):
-            if df['low'].iloc[bar] <= sig['sl']:
-                losses += 1
-                break
-            if df['high'].iloc[bar] >= sig['tp']:
-                wins += 1
-                break
+    results, _ = resolve_signals(
+        df['high'].values, df['low'].values,
+        [s['bar'] for s in signals], [s['tp'] for s in signals], [s['sl'] for s in signals])
+    wins = int((results == 1).sum())
+    losses = int((results == -1).sum())
     return wins, losses
 
 print("="*60)
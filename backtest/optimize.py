@@ -0,0 +1,264 @@
+"""
+Config-driven optimizer: one entry point instead of a copied script per experiment
+
+    python -m backtest.optimize backtest/specs/1h_grid.yaml
+    python backtest/optimize.py backtest/specs/15m_tpe.json --processes 4
+
+The spec (YAML, JSON or TOML) names the timeframe, assets, engine, grid,
+search strategy and pass rule; every run goes through the same Evaluator
+(shared-memory datasets, process pool, run_batch), records into the
+results database and prints test_parallel.py's report.
+
+    name: 1h-grid
+    timeframe: 1h                # 1m 5m 15m 30m 1h 4h 1d
+    assets: all                  # or a list of asset names
+    engine: v1                   # v1-v8, a strategy name, or module:Class
+    grid:                        # name -> list of values
+      zz_depth: [2, 3, 4, 5]
+      fib_entry_level: [0.5, 0.618, 0.7, 0.786, 0.85]
+    fixed: {rr_ratio: 1.0}       # added to every config
+    exclude:                     # never evaluate configs matching all keys of an entry
+      - {use_trend_filter: false, use_volume_filter: false, use_rsi_filter: false}
+    search:
+      strategy: grid             # grid | halving | hyperband | tpe
+      seed: 0
+      eta: 3                     # halving / hyperband
+      evaluations: 400           # tpe
+    scoring:
+      rule: passing              # passing | coverage
+      min_trades: 2
+      min_wr: 80
+    checkpoint: true             # grid only: resume from <name>.checkpoint.jsonl
+
+--telemetry PATH appends NDJSON events (per-worker throughput, queue
+depth, cache hit rates, stage times, best-so-far) and --telemetry-port
+serves the live snapshot on localhost (see telemetry.py). --profile runs
+the engines with per-stage profiling on and prints the stage table at the
+end (see profiling.py).
+
+With --serve HOST:PORT the chunks go to remote workers instead of a local
+Pool (see distributed.py):
+
+    python -m backtest.optimize backtest/specs/1h_grid.yaml --serve 0.0.0.0:50000
+    python backtest/distributed.py coordinator-host:50000 --authkey <printed key>
+"""
+
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Optional
+from evaluator import Evaluator, DATA_DIR, engine_class, timeframe_files, load_datasets
+from search import RULES, SearchResult, grid, successive_halving, hyperband, report
+from checkpoint import Checkpoint, data_fingerprint, param_hash
+from telemetry import Telemetry
+import profiling
+
+STRATEGIES = ('grid', 'halving', 'hyperband', 'tpe')
+BLOCK = 2000  # grid configs per progress line / checkpoint flush
+
+
+def load_spec(path) -> dict:
+    """Read a .yaml/.yml, .json or .toml spec"""
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.json':
+        with open(path) as f:
+            return json.load(f)
+    if suffix == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    if suffix in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise SystemExit("YAML specs need PyYAML (pip install pyyaml); JSON/TOML work without it")
+        with open(path) as f:
+            return yaml.safe_load(f)
+    raise ValueError(f"Unsupported spec format: {path.name} (use .yaml, .json or .toml)")
+
+
+def validate(spec: dict) -> dict:
+    """Fill defaults and reject typos early, before any data is loaded"""
+    for key in ('timeframe', 'grid'):
+        if key not in spec:
+            raise ValueError(f"Spec is missing '{key}'")
+    if not isinstance(spec['grid'], dict) or not all(isinstance(v, list) for v in spec['grid'].values()):
+        raise ValueError("'grid' must map parameter names to lists of values")
+
+    spec = dict(spec)
+    spec.setdefault('name', f"{spec['timeframe']}-{spec.get('engine', 'v1')}")
+    spec.setdefault('engine', 'v1')
+    spec.setdefault('assets', 'all')
+    spec.setdefault('fixed', {})
+    spec.setdefault('exclude', [])
+    spec['search'] = {'strategy': 'grid', 'seed': 0, **(spec.get('search') or {})}
+    spec['scoring'] = {'rule': 'passing', 'min_trades': 2, 'min_wr': 80, **(spec.get('scoring') or {})}
+
+    if spec['search']['strategy'] not in STRATEGIES:
+        raise ValueError(f"Unknown search strategy: {spec['search']['strategy']} (use {', '.join(STRATEGIES)})")
+    if spec['scoring']['rule'] not in RULES:
+        raise ValueError(f"Unknown scoring rule: {spec['scoring']['rule']} (use {', '.join(RULES)})")
+    engine_class(spec['engine'])
+    return spec
+
+
+def select_files(spec: dict) -> dict:
+    files = timeframe_files(spec['timeframe'], spec.get('data_dir', DATA_DIR))
+    if spec['assets'] != 'all':
+        missing = [a for a in spec['assets'] if a not in files]
+        if missing:
+            print(f"  Missing {spec['timeframe']} data for: {', '.join(missing)}", flush=True)
+        files = {a: files[a] for a in spec['assets'] if a in files}
+    return files
+
+
+def excluder(spec: dict):
+    """Predicate for the spec's exclude rules: True when a config matches all keys of one"""
+    def excluded(config):
+        return any(all(config.get(k) == v for k, v in rule.items()) for rule in spec['exclude'])
+    return excluded
+
+
+def configs_of(spec: dict) -> list:
+    excluded = excluder(spec)
+    return [c for c in grid(spec['grid'], spec['fixed']) if not excluded(c)]
+
+
+def run_grid(spec: dict, evaluator: Evaluator, best: SearchResult, configs: list) -> SearchResult:
+    """Exhaustive evaluation, resumable through a checkpoint file"""
+    checkpoint = None
+    if spec.get('checkpoint'):
+        path = spec['checkpoint'] if isinstance(spec['checkpoint'], str) else f"{spec['name']}.checkpoint.jsonl"
+        checkpoint = Checkpoint(path, run_key=f"{spec['engine']}:{data_fingerprint(evaluator.data)}")
+
+    todo = []
+    for params in configs:
+        rec = checkpoint.done.get(param_hash(params)) if checkpoint is not None else None
+        if rec is None:
+            todo.append(params)
+        else:
+            best.offer(params, rec['results'], evaluator.backtests)
+    if len(todo) < len(configs):
+        print(f"Resuming: {len(configs) - len(todo)} combos already done", flush=True)
+
+    start = time.time()
+    for i in range(0, len(todo), BLOCK):
+        block = todo[i:i + BLOCK]
+        for params, res in zip(block, evaluator.evaluate(block)):
+            best.offer(params, res, evaluator.backtests)
+            if checkpoint is not None:
+                checkpoint.add(params, res)
+        if checkpoint is not None:
+            checkpoint.flush()
+        done = i + len(block)
+        if evaluator.telemetry is not None:
+            evaluator.telemetry.progress(len(configs) - len(todo) + done, len(configs))
+        rate = done / max(time.time() - start, 1e-9)
+        eta = (len(todo) - done) / rate / 60
+        print(f"  {done}/{len(todo)} ({rate:.0f}/sec, ETA: {eta:.1f}min)...", flush=True)
+    best.backtests = evaluator.backtests
+    return best
+
+
+def run(spec: dict, processes=None, record: bool = True, serve: Optional[str] = None,
+        authkey: Optional[str] = None, telemetry: Optional[str] = None,
+        telemetry_port: Optional[int] = None, profile: bool = False) -> SearchResult:
+    spec = validate(spec)
+    files = select_files(spec)
+    print(f"Loading {spec['timeframe']} data...", flush=True)
+    data = load_datasets(files)
+    print(f"Loaded {len(data)} assets", flush=True)
+
+    search = spec['search']
+    scoring = spec['scoring']
+    monitor = None
+    if telemetry or telemetry_port is not None:
+        monitor = Telemetry(telemetry, telemetry_port)
+        if monitor.port is not None:
+            print(f"Telemetry on http://127.0.0.1:{monitor.port}/status", flush=True)
+    best = SearchResult(list(data), scoring['min_trades'], scoring['min_wr'], scoring['rule'],
+                        telemetry=monitor)
+    db_run = None
+    if record:
+        from results_db import ResultsDB
+        db_run = ResultsDB().start_run(
+            spec['name'], spec['timeframe'], engine=spec['engine'],
+            min_trades=scoring['min_trades'], min_wr=scoring['min_wr'],
+            meta={'search': search, 'scoring': scoring})
+
+    engine = engine_class(spec['engine'])
+    if serve:
+        from distributed import DistributedEvaluator, parse_address
+        evaluator = DistributedEvaluator(data, engine=engine, address=parse_address(serve),
+                                         authkey=authkey.encode() if authkey else None,
+                                         processes=processes, run=db_run, telemetry=monitor,
+                                         profile=profile)
+        host, port = evaluator.address
+        print(f"Serving chunks on {host}:{port}; start workers with:\n"
+              f"  python backtest/distributed.py <this host>:{port} --authkey {evaluator.authkey.decode()}",
+              flush=True)
+    else:
+        evaluator = Evaluator(data, engine=engine, processes=processes, run=db_run, telemetry=monitor,
+                              profile=profile)
+
+    start = time.time()
+    with evaluator:
+        strategy = search['strategy']
+        if strategy == 'tpe':
+            import tpe
+            evaluator.chunk = 1
+            print(f"TPE: {search.get('evaluations', 400)} evaluations, seed={search['seed']}", flush=True)
+            tpe.optimize(evaluator, spec['grid'], spec['fixed'], evaluations=search.get('evaluations', 400),
+                         seed=search['seed'], best=best, excluded=excluder(spec))
+        elif strategy == 'hyperband':
+            hyperband(evaluator, spec['grid'], spec['fixed'], eta=search.get('eta', 3),
+                      max_rungs=search.get('max_rungs', 3), scale=search.get('scale', 1),
+                      resource=search.get('resource', 'assets'), seed=search['seed'], best=best,
+                      excluded=excluder(spec))
+        else:
+            configs = configs_of(spec)
+            print(f"Testing {len(configs)} combinations ({strategy}) with {evaluator.processes} CPU cores...", flush=True)
+            if strategy == 'halving':
+                successive_halving(evaluator, configs, eta=search.get('eta', 3),
+                                   min_budget=search.get('min_budget'),
+                                   resource=search.get('resource', 'assets'), seed=search['seed'], best=best)
+            else:
+                run_grid(spec, evaluator, best, configs)
+        best.backtests = evaluator.backtests
+    if db_run is not None:
+        db_run.close()
+    if monitor is not None:
+        monitor.close()
+
+    report(best, list(files), time.time() - start)
+    if profile:
+        print(profiling.report(evaluator.profile, f"Stage profile ({spec['engine']})"), flush=True)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('spec', help='YAML, JSON or TOML experiment spec')
+    parser.add_argument('--processes', type=int, default=None, help='worker processes (default: all cores)')
+    parser.add_argument('--no-record', action='store_true', help="don't write to the results database")
+    parser.add_argument('--serve', metavar='HOST:PORT', help='coordinate remote workers instead of a local pool')
+    parser.add_argument('--authkey', default=os.environ.get('BACKTEST_AUTHKEY'),
+                        help='worker secret for --serve (default: BACKTEST_AUTHKEY or a random key)')
+    parser.add_argument('--telemetry', metavar='PATH', help='append NDJSON telemetry events to PATH')
+    parser.add_argument('--telemetry-port', type=int, metavar='PORT',
+                        help='serve the live telemetry snapshot on 127.0.0.1:PORT')
+    parser.add_argument('--profile', action='store_true', help='time the engine stages and print a table')
+    args = parser.parse_args(argv)
+    run(load_spec(args.spec), processes=args.processes, record=not args.no_record,
+        serve=args.serve, authkey=args.authkey, telemetry=args.telemetry,
+        telemetry_port=args.telemetry_port, profile=args.profile)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,33 @@
 """
 30m optimization with monitoring support
-Writes progress to status.json for external monitoring
+Writes progress to status.json for external monitoring, and a telemetry
+stream (per-worker throughput, stage times, cache hit rates, best-so-far)
+to optimization_30m.telemetry.ndjson
 """
 import sys
 import json
+import time
 from datetime import datetime
 sys.path.insert(0, r'C:\Users\danie\projects\elliott-wave-indicator\backtest')
 
 from backtester import ElliottICTBacktester, load_data
+from bars import BarArrays
+from shared_data import publish, attach
+from pruning import shared_best, raise_best, can_still_win, AssetOrder
+from results_db import ResultsDB
+from schedule import plan_configs
+from telemetry import Telemetry, counters, chunk_stats
+from checkpoint import Checkpoint, param_hash, data_fingerprint, atomic_write_json
 from pathlib import Path
 from itertools import product
 from multiprocessing import Pool, cpu_count
 
 DATA_DIR = Path(r'C:\Users\danie\projects\elliott-wave-indicator\data')
 STATUS_FILE = Path(r'C:\Users\danie\projects\elliott-wave-indicator\optimization_status.json')
+# Completed combos; rerunning with the same data resumes from here
+CHECKPOINT_FILE = STATUS_FILE.with_name('optimization_30m.checkpoint.jsonl')
+TELEMETRY_FILE = STATUS_FILE.with_name('optimization_30m.telemetry.ndjson')
+TELEMETRY_PORT = None  # e.g. 8765 to serve the live snapshot on localhost
 
 # 30m files - CORRECTED
 FILES_30M = {
@@ -42,22 +56,35 @@ FILES_30M = {
 def write_status(status_dict):
     """Write status to JSON file for monitoring"""
     status_dict['updated'] = datetime.now().isoformat()
-    with open(STATUS_FILE, 'w') as f:
-        json.dump(status_dict, f, indent=2)
+    atomic_write_json(STATUS_FILE, status_dict, indent=2)
 
-print("Loading 30m data...", flush=True)
+# Loaded once in the parent, workers attach to it through shared memory
 DATA = {}
-for asset, file in FILES_30M.items():
-    path = DATA_DIR / file
-    if path.exists():
-        try:
-            DATA[asset] = load_data(str(path))
-            print(f"  Loaded {asset}", flush=True)
-        except Exception as e:
-            print(f"  Error loading {asset}: {e}", flush=True)
-    else:
-        print(f"  Missing: {file}", flush=True)
-print(f"Loaded {len(DATA)} assets", flush=True)
+
+def load_all():
+    print("Loading 30m data...", flush=True)
+    for asset, file in FILES_30M.items():
+        path = DATA_DIR / file
+        if path.exists():
+            try:
+                DATA[asset] = BarArrays.from_df(load_data(str(path)))
+                print(f"  Loaded {asset}", flush=True)
+            except Exception as e:
+                print(f"  Error loading {asset}: {e}", flush=True)
+        else:
+            print(f"  Missing: {file}", flush=True)
+    print(f"Loaded {len(DATA)} assets", flush=True)
+
+# Branch-and-bound: skip the rest of a combo's assets once it can't reach the best
+PRUNE = True
+BEST = None
+ORDER = None
+
+def init_worker(handle, best):
+    global BEST, ORDER
+    DATA.update(attach(handle))
+    BEST = best
+    ORDER = AssetOrder(DATA)
 
 # Parameter grid
 ZZ = [2, 3, 4, 5]
@@ -69,33 +96,80 @@ DEV = [0.1, 0.2, 0.3]
 TREND = [True, False]
 VOL = [True, False]
 
-def test_combo(args):
+CHUNK = 120  # max combos per task; each task runs one run_batch per asset
+
+def combo_params(args):
     zz, fib, tol, gap, rsi, dev, trend, vol = args
-    params = {
+    return {
         'zz_depth': zz, 'fib_entry_level': fib, 'fib_tolerance': tol,
         'signal_gap': gap, 'rr_ratio': 1.0, 'zz_dev': dev,
         'use_rsi_filter': True, 'rsi_max': rsi,
         'use_trend_filter': trend, 'use_volume': vol,
     }
+
+def summarize(result):
+    total = result.wins + result.losses
+    return {
+        'total': total,
+        'wins': result.wins,
+        'wr': result.win_rate if total > 0 else 0
+    }
+
+def test_combo(args):
+    params = combo_params(args)
     
     results = {}
     for asset, df in DATA.items():
         try:
             bt = ElliottICTBacktester(df, params)
-            result = bt.run_backtest()
-            total = result.wins + result.losses
-            results[asset] = {
-                'total': total,
-                'wins': result.wins,
-                'wr': result.win_rate if total > 0 else 0
-            }
+            results[asset] = summarize(bt.run_backtest(batch=True))
         except:
             results[asset] = {'total': 0, 'wins': 0, 'wr': 0}
     
     passing = sum(1 for r in results.values() if r['total'] >= 2 and r['wr'] >= 80)
     return (passing, args, results)
 
+def test_combo_chunk(chunk):
+    """
+    Test a chunk of combos with one run_batch call per asset.
+    With PRUNE, combos that can no longer reach BEST are dropped between
+    assets and come back with results=None.
+    Returns (rows, telemetry stats).
+    """
+    before = counters()
+    start = time.perf_counter()
+    backtests = 0
+    param_list = [combo_params(args) for args in chunk]
+    results = [{} for _ in chunk]
+    passing = [0] * len(chunk)
+    live = list(range(len(chunk)))
+    
+    assets = ORDER.order() if PRUNE else list(DATA)
+    for k, asset in enumerate(assets):
+        if PRUNE:
+            live = [i for i in live if can_still_win(passing[i], len(assets) - k, BEST)]
+            if not live:
+                break
+        backtests += len(live)
+        try:
+            per_asset = [summarize(r) for r in ElliottICTBacktester(DATA[asset]).run_batch([param_list[i] for i in live])]
+        except:
+            per_asset = [{'total': 0, 'wins': 0, 'wr': 0}] * len(live)
+        for i, r in zip(live, per_asset):
+            ok = r['total'] >= 2 and r['wr'] >= 80
+            results[i][asset] = r
+            passing[i] += ok
+            ORDER.record(asset, ok)
+        if PRUNE and live:
+            # Partial counts are lower bounds, so they can already tighten BEST
+            raise_best(BEST, max(passing[i] for i in live))
+    
+    done = set(live)
+    rows = [(passing[i], args, results[i] if i in done else None) for i, args in enumerate(chunk)]
+    return rows, chunk_stats(before, len(chunk), backtests, time.perf_counter() - start)
+
 if __name__ == '__main__':
+    load_all()
     combos = list(product(ZZ, FIB, TOL, GAP, RSI, DEV, TREND, VOL))
     total_combos = len(combos)
     
@@ -114,21 +188,56 @@ if __name__ == '__main__':
     })
     
     best = {'passing': 0}
+    telemetry = Telemetry(TELEMETRY_FILE, TELEMETRY_PORT)
+    
+    def consider(passing, args, results):
+        global best
+        if results is not None and passing > best['passing']:
+            zz, fib, tol, gap, rsi, dev, trend, vol = args
+            best = {
+                'passing': passing, 'results': results,
+                'zz': zz, 'fib': fib, 'tol': tol, 'gap': gap,
+                'rsi': rsi, 'dev': dev, 'trend': trend, 'vol': vol
+            }
+            print(f"  NEW BEST: {passing}/{len(DATA)} - ZZ={zz}, Fib={fib}, Tol={tol}, RSI<{rsi}, Trend={trend}, Vol={vol}", flush=True)
+            telemetry.record_best(passing, passing, combo_params(args))
+    
+    # Replay combos finished by an earlier (interrupted) run, in grid order
+    checkpoint = Checkpoint(CHECKPOINT_FILE, run_key=f"30m:{data_fingerprint(DATA)}")
+    todo = []
+    for args in combos:
+        rec = checkpoint.done.get(param_hash(combo_params(args)))
+        if rec is None:
+            todo.append(args)
+        else:
+            consider(rec['passing'], args, rec['results'])
+    if len(todo) < total_combos:
+        print(f"Resuming: {total_combos - len(todo)} combos already done", flush=True)
     
-    with Pool(processes=cpu_count()) as pool:
-        for i, (passing, args, results) in enumerate(pool.imap_unordered(test_combo, combos, chunksize=50)):
-            if passing > best['passing']:
-                zz, fib, tol, gap, rsi, dev, trend, vol = args
-                best = {
-                    'passing': passing, 'results': results,
-                    'zz': zz, 'fib': fib, 'tol': tol, 'gap': gap,
-                    'rsi': rsi, 'dev': dev, 'trend': trend, 'vol': vol
-                }
-                print(f"  NEW BEST: {passing}/{len(DATA)} - ZZ={zz}, Fib={fib}, Tol={tol}, RSI<{rsi}, Trend={trend}, Vol={vol}", flush=True)
+    shared = publish(DATA)
+    run = ResultsDB().start_run(Path(__file__).stem, '30m')
+    with shared, checkpoint, run, telemetry, Pool(processes=cpu_count(), initializer=init_worker, initargs=(shared.handle, shared_best(best['passing']))) as pool:
+        # Longest-first by estimated cost, shrinking towards the tail
+        bars = sum(len(b) for b in DATA.values())
+        plan = plan_configs([combo_params(args) for args in todo], bars, cpu_count(), CHUNK)
+        chunks = [[todo[i] for i in chunk] for chunk in plan]
+        
+        def reported(chunk_results):
+            for n, (rows, stats) in enumerate(chunk_results, 1):
+                telemetry.chunk(stats, queue_depth=len(chunks) - n)
+                yield from rows
+        
+        done = reported(pool.imap_unordered(test_combo_chunk, chunks))
+        for i, (passing, args, results) in enumerate(done, start=total_combos - len(todo)):
+            checkpoint.add(combo_params(args), results, passing=passing)
+            if results is not None:
+                run.add(combo_params(args), results)
+            consider(passing, args, results)
             
             # Update status every 100 iterations
             if (i+1) % 100 == 0:
                 pct = (i+1)/total_combos*100
+                telemetry.progress(i+1, total_combos)
                 write_status({
                     'timeframe': '30m',
                     'status': 'running',
@@ -3,6 +3,7 @@ import os
 import sys
 sys.path.append(os.path.dirname(__file__))
 from backtester import load_data
+from indicators import shared_cache
 import glob
 import numpy as np
 
@@ -26,13 +27,6 @@ for f in list(set(files)):
     except:
         pass
 
-def calculate_rsi(df, period=14):
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
 def calculate_zigzag(df, depth=5):
     highs = df['high'].values
     lows = df['low'].values
@@ -59,7 +53,7 @@ def backtest_filtered(df, params):
     min_wave_pct = params.get('min_wave_pct', 0)
     rsi_max = params.get('rsi_max', 100)
     
-    rsi = calculate_rsi(df)
+    rsi = shared_cache(df).get('rsi', 14)
     pivots = calculate_zigzag(df, zz_depth)
     
     signals = []
@@ -82,7 +76,7 @@ def backtest_filtered(df, params):
             if abs(wave2_low - fib_price) <= tolerance:
                 bar = p2['idx']
                 
-                if rsi.iloc[bar] > rsi_max:
+                if rsi[bar] > rsi_max:
                     continue
                 
                 entry = df['close'].iloc[bar]
@@ -0,0 +1,229 @@
+"""
+Shared pivot engine for the ZigZag based backtesters
+Pivot highs/lows are found for the whole series at once with sliding
+window max/min, only the deviation/alternation pass runs bar by bar.
+"""
+
+import os
+from collections import OrderedDict
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import List, Tuple, Optional
+
+
+def find_pivots(highs, lows, depth: int, strict: bool = True,
+                ignore_nan: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (is_ph, is_pl) boolean arrays.
+    Bar i is a pivot high when its high is above the `depth` highs on each
+    side (>= instead of > when strict=False), pivot lows likewise.
+    Bars closer than `depth` to either end are never pivots.
+    ignore_nan: like the engines' loops, a bar is a pivot unless some
+    neighbour beats it, so NaN neighbours (and a NaN bar) don't block it;
+    False gives the all(high > neighbour) form, where any NaN does.
+    """
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    n = len(highs)
+
+    is_ph = np.zeros(n, dtype=bool)
+    is_pl = np.zeros(n, dtype=bool)
+    if depth < 1:
+        is_ph[:] = True
+        is_pl[:] = True
+        return is_ph, is_pl
+    if n < 2 * depth + 1:
+        return is_ph, is_pl
+
+    # Window k spans bars k..k+depth-1: left neighbours of bar i are
+    # window i-depth, right neighbours are window i+1
+    if ignore_nan:
+        # NaN only where the whole window is NaN, and comparing with NaN never disqualifies
+        win_high = np.fmax.reduce(sliding_window_view(highs, depth), axis=1)
+        win_low = np.fmin.reduce(sliding_window_view(lows, depth), axis=1)
+    else:
+        win_high = sliding_window_view(highs, depth).max(axis=1)
+        win_low = sliding_window_view(lows, depth).min(axis=1)
+
+    center = slice(depth, n - depth)
+    left = slice(0, n - 2 * depth)
+    right = slice(depth + 1, n - depth + 1)
+
+    h = highs[center]
+    l = lows[center]
+    if ignore_nan and strict:
+        is_ph[center] = ~((h <= win_high[left]) | (h <= win_high[right]))
+        is_pl[center] = ~((l >= win_low[left]) | (l >= win_low[right]))
+    elif ignore_nan:
+        is_ph[center] = ~((h < win_high[left]) | (h < win_high[right]))
+        is_pl[center] = ~((l > win_low[left]) | (l > win_low[right]))
+    elif strict:
+        is_ph[center] = (h > win_high[left]) & (h > win_high[right])
+        is_pl[center] = (l < win_low[left]) & (l < win_low[right])
+    else:
+        is_ph[center] = (h >= win_high[left]) & (h >= win_high[right])
+        is_pl[center] = (l <= win_low[left]) & (l <= win_low[right])
+
+    return is_ph, is_pl
+
+
+def zigzag_points(highs, lows, depth: int, dev: float) -> List[Tuple[int, float, int]]:
+    """
+    ZigZag used by ElliottICTBacktester and the v2-v6 engines.
+    Returns list of (bar_index, price, direction) where direction: 1=high, -1=low
+    """
+    is_ph, is_pl = find_pivots(highs, lows, depth)
+
+    points = []
+    direction = 0
+    last_price = 0.0
+
+    for i in np.flatnonzero(is_ph | is_pl).tolist():
+        if is_ph[i] and direction != 1:
+            if last_price == 0 or abs(highs[i] - last_price) / last_price * 100 >= dev:
+                points.append((i, highs[i], 1))
+                direction = 1
+                last_price = highs[i]
+
+        if is_pl[i] and direction != -1:
+            if last_price == 0 or abs(lows[i] - last_price) / last_price * 100 >= dev:
+                points.append((i, lows[i], -1))
+                direction = -1
+                last_price = lows[i]
+
+    return points
+
+
+def pivot_counts(points: List[Tuple[int, float, int]], n_bars: int) -> np.ndarray:
+    """
+    counts[bar] = number of points with bar_index <= bar, so the pivots
+    known at a bar are points[:counts[bar]] without rescanning the list
+    """
+    bars = np.fromiter((p[0] for p in points), dtype=np.int64, count=len(points))
+    return np.searchsorted(bars, np.arange(n_bars), side='right')
+
+
+def bullish_swings(points: List[Tuple[int, float, int]], counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-bar (swing_high, swing_low) of the bullish leg check_fib_entry uses:
+    Low -> High (Wave 1 up) or Low -> High -> Low (Wave 2 in progress).
+    NaN where the last pivots don't form either pattern.
+    """
+    n = len(counts)
+    swing_high = np.full(n, np.nan)
+    swing_low = np.full(n, np.nan)
+    if len(points) < 2:
+        return swing_high, swing_low
+
+    prices = np.array([p[1] for p in points], dtype=float)
+    dirs = np.array([p[2] for p in points], dtype=np.int64)
+
+    def last(k):
+        """Price/direction of the k-th most recent pivot at each bar (dir 0 if none)"""
+        idx = counts - k
+        ok = idx >= 0
+        idx = np.where(ok, idx, 0)
+        return prices[idx], np.where(ok, dirs[idx], 0)
+
+    price0, dir0 = last(1)
+    price1, dir1 = last(2)
+    price2, dir2 = last(3)
+
+    wave1 = (dir1 == -1) & (dir0 == 1)
+    wave2 = ~wave1 & (dir2 == -1) & (dir1 == 1) & (dir0 == -1)
+
+    swing_low[wave1] = price1[wave1]
+    swing_high[wave1] = price0[wave1]
+    swing_low[wave2] = price2[wave2]
+    swing_high[wave2] = price1[wave2]
+    return swing_high, swing_low
+
+
+FORMAT_VERSION = 2  # on-disk entries; bump when zigzag_points() results change
+
+
+class ZigzagCache:
+    """
+    Bounded LRU of (zigzag_points, pivot_counts) keyed by
+    (dataset fingerprint, depth, dev). A grid search varies fib level,
+    RSI, gap and filters far more than depth/dev, so most combos reuse
+    the pivots of an earlier one. With `directory` set, entries are also
+    kept on disk and shared between runs and worker processes.
+    """
+
+    def __init__(self, maxsize: int = 128, directory: Optional[str] = None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, bars, depth: int, dev: float) -> Tuple[List[Tuple[int, float, int]], np.ndarray]:
+        """Pivots of a BarArrays for (depth, dev); treat the returned list/array as read-only"""
+        # Plain int/float, so 0.5 and np.float64(0.5) share one entry (and file name)
+        key = (bars.fingerprint, int(depth), float(dev))
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        points = self._load(key)
+        if points is None:
+            points = zigzag_points(bars.high, bars.low, depth, dev)
+            self._store(key, points)
+        counts = pivot_counts(points, len(bars))
+        counts.flags.writeable = False
+
+        entry = (points, counts)
+        self.entries[key] = entry
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key) -> str:
+        fingerprint, depth, dev = key
+        return os.path.join(self.directory, f"v{FORMAT_VERSION}_{fingerprint}_{depth}_{dev!r}.npz")
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        try:
+            with np.load(self._path(key)) as f:
+                bars, prices, dirs = f['bars'], f['prices'], f['dirs']
+        except (OSError, ValueError, KeyError):
+            return None
+        # Same element types as zigzag_points: (int, np.float64, int)
+        return list(zip(bars.tolist(), prices, dirs.tolist()))
+
+    def _store(self, key, points):
+        if not self.directory:
+            return
+        path = self._path(key)
+        tmp = f"{path}.tmp{os.getpid()}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, 'wb') as f:
+                np.savez(f,
+                         bars=np.array([p[0] for p in points], dtype=np.int64),
+                         prices=np.array([p[1] for p in points], dtype=float),
+                         dirs=np.array([p[2] for p in points], dtype=np.int8))
+            os.replace(tmp, path)
+        except OSError:
+            pass  # caching is best effort
+
+
+# Process-wide cache used by calculate_zigzag; BACKTEST_PIVOT_CACHE=<dir>
+# adds the on-disk layer
+ZIGZAG_CACHE = ZigzagCache(directory=os.environ.get('BACKTEST_PIVOT_CACHE') or None)
+
+
+def cached_zigzag(bars, depth: int, dev: float) -> Tuple[List[Tuple[int, float, int]], np.ndarray]:
+    """(zigzag_points, pivot_counts) for a BarArrays, through ZIGZAG_CACHE"""
+    return ZIGZAG_CACHE.get(bars, depth, dev)
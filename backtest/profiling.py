@@ -0,0 +1,169 @@
+"""
+Opt-in per-stage profiling for the backtest engines
+With profiling on, run_backtest() times its stages and the result carries
+a Profile: wall time, calls and items per stage. Stages are 'pivots'
+(items: zigzag points), 'signals' (the bar loop, items: bars scanned),
+'resolve' (the TP/SL walk, items: signals) and 'results'. Dotted stages
+are nested in their parent: 'signals.setup' times the engine's entry check
+(items: calls that found a setup) and 'signals.filters' its filter
+methods (items: calls that passed), per the engine's PROFILE_CALLS.
+
+    with profiling.enabled():
+        result = ElliottICTBacktesterV2(df, params).run_backtest()
+    print(profiling.report(result.profile))
+
+Every finished Profile is also added to TOTALS, this process's running
+total (run_batch's per-group stages always are), which telemetry.py diffs
+per chunk so a pool run aggregates across workers. Off by default; off,
+run_backtest makes one begin_profile() call and gets back the no-op OFF.
+BACKTEST_PROFILE=1 turns it on for a whole process and its pool workers.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+ENABLED = os.environ.get('BACKTEST_PROFILE', '') not in ('', '0')
+
+
+class Profile:
+    """Wall time, calls and items per stage"""
+
+    def __init__(self):
+        self.stages = {}  # stage -> [seconds, calls, items]
+        self._mark = time.perf_counter()
+
+    def add(self, stage: str, seconds: float, calls: int = 1, items: int = 0):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [seconds, calls, items]
+        else:
+            entry[0] += seconds
+            entry[1] += calls
+            entry[2] += items
+
+    def lap(self, stage: str, items: int = 0):
+        """Charge the time since the previous lap (or start) to stage"""
+        now = time.perf_counter()
+        self.add(stage, now - self._mark, 1, items)
+        self._mark = now
+
+    def wrap(self, stage: str, method):
+        """method, timed into stage; a truthy result (first item of a tuple) counts as an item"""
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = method(*args, **kwargs)
+            hit = result[0] if isinstance(result, tuple) else result
+            self.add(stage, time.perf_counter() - start, 1, 1 if hit else 0)
+            return result
+        return timed
+
+    def finish(self) -> 'Profile':
+        """Add this run to TOTALS; returns self for BacktestResult.profile"""
+        TOTALS.merge(self)
+        return self
+
+    def merge(self, other):
+        """Add another Profile or an as_dict() record"""
+        if isinstance(other, Profile):
+            other = other.as_dict()
+        for stage, entry in other.items():
+            self.add(stage, entry['seconds'], entry['calls'], entry['items'])
+        return self
+
+    def as_dict(self) -> dict:
+        return {stage: {'seconds': s, 'calls': c, 'items': i} for stage, (s, c, i) in self.stages.items()}
+
+    def since(self, before: dict) -> dict:
+        """as_dict() minus an earlier as_dict() of the same profile (stages that moved)"""
+        diff = {}
+        for stage, (s, c, i) in self.stages.items():
+            old = before.get(stage, {'seconds': 0.0, 'calls': 0, 'items': 0})
+            if c != old['calls']:
+                diff[stage] = {'seconds': s - old['seconds'], 'calls': c - old['calls'],
+                               'items': i - old['items']}
+        return diff
+
+    def seconds(self, stage: str) -> float:
+        entry = self.stages.get(stage)
+        return entry[0] if entry else 0.0
+
+    def __repr__(self):
+        inner = ', '.join(f"{k}={s:.4f}s/{c}" for k, (s, c, _) in self.stages.items())
+        return f"Profile({inner})"
+
+
+class _Off(Profile):
+    """What begin_profile() returns with profiling off: records nothing"""
+
+    def add(self, stage, seconds, calls=1, items=0):
+        pass
+
+    def lap(self, stage, items=0):
+        pass
+
+    def finish(self):
+        return None
+
+    def __bool__(self):
+        return False
+
+
+OFF = _Off()
+TOTALS = Profile()
+
+
+def begin_profile(engine) -> Profile:
+    """
+    A started Profile for one run_backtest() of engine, with the methods in
+    engine.PROFILE_CALLS (name -> stage) timed on the instance; OFF when
+    profiling is disabled.
+    """
+    calls = getattr(engine, 'PROFILE_CALLS', None)
+    if not ENABLED:
+        if calls and '_profiled' in engine.__dict__:
+            for name in calls:
+                engine.__dict__.pop(name, None)
+            del engine._profiled
+        return OFF
+    profile = Profile()
+    if calls:
+        for name, stage in calls.items():
+            setattr(engine, name, profile.wrap(stage, getattr(type(engine), name).__get__(engine)))
+        engine._profiled = True
+    return profile
+
+
+def enable(on: bool = True):
+    global ENABLED
+    ENABLED = on
+
+
+@contextmanager
+def enabled(on: bool = True):
+    """Profiling on (or off) inside the with-block"""
+    global ENABLED
+    previous = ENABLED
+    ENABLED = on
+    try:
+        yield
+    finally:
+        ENABLED = previous
+
+
+def report(profile: Optional[Profile], title: str = 'Stage profile') -> str:
+    """Plain-text table of a Profile, top-level stages' share of their total"""
+    if not profile:
+        return f"{title}: profiling was off"
+    total = sum(s for stage, (s, _, _) in profile.stages.items() if '.' not in stage)
+    lines = [f"{title}:", f"  {'stage':<18}{'seconds':>10}{'share':>8}{'calls':>10}{'items':>12}"]
+    # each top-level stage followed by its nested ones
+    order = {}
+    for stage in profile.stages:
+        order.setdefault(stage.split('.')[0], []).append(stage)
+    for stage in (k for group in order.values() for k in sorted(group, key=lambda k: ('.' in k, k))):
+        s, c, i = profile.stages[stage]
+        share = f"{s / total * 100:6.1f}%" if total else '     -'
+        lines.append(f"  {stage:<18}{s:>10.3f}{share:>8}{c:>10}{i:>12}")
+    return '\n'.join(lines)
@@ -0,0 +1,48 @@
+"""
+Branch-and-bound for "most passing assets" grid searches
+Workers share the best passing count seen so far; a combo is dropped as
+soon as passing + remaining_assets can no longer reach it. Assets that
+fail most often are tested first, so hopeless combos are dropped early.
+Combos that could still tie the best are never dropped, so the winner
+doesn't change.
+"""
+
+from multiprocessing import Value
+
+
+def shared_best(initial: int = 0):
+    """Running best passing count, pass to every worker (e.g. via Pool initargs)"""
+    return Value('i', initial)
+
+
+def raise_best(best, passing: int):
+    """Lift the shared best to passing; safe to call with a combo's partial count"""
+    if passing > best.value:
+        with best.get_lock():
+            if passing > best.value:
+                best.value = passing
+
+
+def can_still_win(passing: int, remaining: int, best) -> bool:
+    return passing + remaining >= best.value
+
+
+class AssetOrder:
+    """Per-process pass/fail counts; order() puts the most-often-failing assets first"""
+
+    def __init__(self, assets):
+        self.assets = list(assets)
+        self.tested = {a: 0 for a in self.assets}
+        self.failed = {a: 0 for a in self.assets}
+
+    def record(self, asset, passed: bool):
+        self.tested[asset] += 1
+        if not passed:
+            self.failed[asset] += 1
+
+    def failure_rate(self, asset) -> float:
+        # Laplace smoothing: unseen assets start at 0.5
+        return (self.failed[asset] + 1) / (self.tested[asset] + 2)
+
+    def order(self) -> list:
+        return sorted(self.assets, key=self.failure_rate, reverse=True)
@@ -0,0 +1,114 @@
+"""
+First-touch TP/SL resolution for batches of signals
+Replaces the per-signal forward walk (`for bar in range(signal.bar + 1, ...)`)
+with block-wise NumPy scans over all open signals at once.
+"""
+
+import numpy as np
+from typing import Tuple
+
+MAX_BLOCK = 1024
+
+
+def resolve_signals(highs, lows, bars, tps, sls, directions=None,
+                    sl_first: bool = True, block: int = 32) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For each signal find the first bar after `bar` where SL or TP is touched.
+    Longs: SL hit when low <= sl, TP hit when high >= tp
+    Shorts (direction -1): SL hit when high >= sl, TP hit when low <= tp
+    If both are hit on the same bar it counts as a loss (sl_first=True)
+    or as a win (sl_first=False).
+    Returns (results, exit_bars): results 1=win, -1=loss, 0=open,
+    exit_bars is -1 for trades still open at the end of the data.
+    """
+    highs = np.asarray(highs, dtype=float)
+    lows = np.asarray(lows, dtype=float)
+    bars = np.asarray(bars, dtype=np.int64)
+    tps = np.asarray(tps, dtype=float)
+    sls = np.asarray(sls, dtype=float)
+    m = len(bars)
+    if directions is None:
+        long_side = np.ones(m, dtype=bool)
+    else:
+        long_side = np.asarray(directions) == 1
+
+    results = np.zeros(m, dtype=np.int8)
+    exit_bars = np.full(m, -1, dtype=np.int64)
+    n = len(highs)
+
+    pos = bars + 1
+    pending = np.flatnonzero(pos < n)
+    size = block
+
+    while len(pending):
+        # Next `size` bars for every pending signal; bars past the end never hit
+        idx = pos[pending, None] + np.arange(size)
+        in_range = idx < n
+        np.minimum(idx, n - 1, out=idx)
+        h = highs[idx]
+        l = lows[idx]
+
+        is_long = long_side[pending, None]
+        sl = sls[pending, None]
+        tp = tps[pending, None]
+        sl_hit = np.where(is_long, l <= sl, h >= sl) & in_range
+        tp_hit = np.where(is_long, h >= tp, l <= tp) & in_range
+
+        first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), size)
+        first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), size)
+
+        if sl_first:
+            loss = (first_sl < size) & (first_sl <= first_tp)
+        else:
+            loss = (first_sl < size) & (first_sl < first_tp)
+        win = (first_tp < size) & ~loss
+
+        done = pending[loss]
+        results[done] = -1
+        exit_bars[done] = pos[done] + first_sl[loss]
+        done = pending[win]
+        results[done] = 1
+        exit_bars[done] = pos[done] + first_tp[win]
+
+        pos[pending] += size
+        pending = pending[~(loss | win)]
+        pending = pending[pos[pending] < n]
+        size = min(size * 2, MAX_BLOCK)
+
+    return results, exit_bars
+
+
+def resolve_in_place(signals, highs, lows, sl_first: bool = True):
+    """
+    Resolve a list of Signal objects and write .result (and .exit_bar,
+    for Signal classes that have one) back onto them
+    """
+    if not signals:
+        return signals
+
+    results, exit_bars = resolve_signals(
+        highs, lows,
+        [s.bar for s in signals],
+        [s.tp for s in signals],
+        [s.sl for s in signals],
+        [getattr(s, 'direction', 1) for s in signals],
+        sl_first=sl_first)
+
+    for signal, result, exit_bar in zip(signals, results.tolist(), exit_bars.tolist()):
+        signal.result = result
+        if hasattr(signal, 'exit_bar'):
+            signal.exit_bar = exit_bar
+    return signals
+
+
+def resolve_table(table, highs, lows, sl_first: bool = True):
+    """Resolve a signal_table.SignalTable, writing its result and exit_bar columns in place"""
+    if not len(table):
+        return table
+
+    results, exit_bars = resolve_signals(
+        highs, lows, table.bar, table.tp, table.sl, table.direction, sl_first=sl_first)
+    table.result[:] = results
+    table.exit_bar[:] = exit_bars
+    table.reset_view()
+    return table
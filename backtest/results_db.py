@@ -0,0 +1,181 @@
+"""
+SQLite store for optimization results
+One row per (run, timeframe, asset, param hash) with trades, wins and win
+rate, indexed on timeframe, asset and win rate, so questions like "best
+params where >= 15 assets pass on 4H" are a query instead of a new grid.
+Optimizers buffer rows and bulk-insert them in batches.
+
+    python results_db.py best 4h 15        # params with >= 15 passing assets
+    python results_db.py runs
+    python results_db.py import 30m optimization_30m.checkpoint.jsonl
+"""
+
+import json
+import sqlite3
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from checkpoint import param_hash
+
+DB_PATH = Path(__file__).resolve().parent.parent / 'results.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    started TEXT NOT NULL,
+    min_trades INTEGER NOT NULL,
+    min_wr REAL NOT NULL,
+    meta TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    param_hash TEXT PRIMARY KEY,
+    params TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs(run_id),
+    timeframe TEXT NOT NULL,
+    asset TEXT NOT NULL,
+    param_hash TEXT NOT NULL REFERENCES params(param_hash),
+    total INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    win_rate REAL NOT NULL,
+    passed INTEGER NOT NULL,
+    PRIMARY KEY (run_id, timeframe, asset, param_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_results_timeframe ON results(timeframe, param_hash, passed);
+CREATE INDEX IF NOT EXISTS idx_results_asset ON results(asset, timeframe);
+CREATE INDEX IF NOT EXISTS idx_results_win_rate ON results(win_rate);
+"""
+
+
+class ResultsDB:
+    def __init__(self, path=DB_PATH):
+        self.path = str(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+
+    def start_run(self, name: str, timeframe: str, engine: str = 'v1', min_trades: int = 2,
+                  min_wr: float = 80, meta: Optional[dict] = None, batch: int = 5000) -> 'Run':
+        with self.conn:
+            cur = self.conn.execute(
+                'INSERT INTO runs (name, timeframe, engine, started, min_trades, min_wr, meta)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (name, timeframe.lower(), engine, datetime.now().isoformat(), min_trades, min_wr,
+                 json.dumps(meta) if meta is not None else None))
+        return Run(self, cur.lastrowid, timeframe.lower(), min_trades, min_wr, batch)
+
+    def best_params(self, timeframe: str, min_passing: int = 0, limit: int = 10) -> List[dict]:
+        """Param sets ranked by passing assets on timeframe (best run per param set)"""
+        rows = self.conn.execute(
+            'SELECT p.params, r.run_id, SUM(r.passed) AS passing, COUNT(*) AS assets,'
+            ' AVG(r.win_rate) AS mean_wr'
+            ' FROM results r JOIN params p USING (param_hash)'
+            ' WHERE r.timeframe = ?'
+            ' GROUP BY r.run_id, r.param_hash'
+            ' HAVING passing >= ?'
+            ' ORDER BY passing DESC, mean_wr DESC LIMIT ?',
+            (timeframe.lower(), min_passing, limit)).fetchall()
+        return [{'params': json.loads(p), 'run_id': run_id, 'passing': passing,
+                 'assets': assets, 'mean_wr': mean_wr}
+                for p, run_id, passing, assets, mean_wr in rows]
+
+    def asset_results(self, timeframe: str, params: dict) -> Dict[str, dict]:
+        rows = self.conn.execute(
+            'SELECT asset, total, wins, win_rate FROM results'
+            ' WHERE timeframe = ? AND param_hash = ? ORDER BY run_id DESC',
+            (timeframe.lower(), param_hash(params))).fetchall()
+        out = {}
+        for asset, total, wins, wr in rows:
+            out.setdefault(asset, {'total': total, 'wins': wins, 'wr': wr})
+        return out
+
+    def runs(self) -> List[tuple]:
+        return self.conn.execute(
+            'SELECT run_id, name, timeframe, engine, started,'
+            ' (SELECT COUNT(*) FROM results r WHERE r.run_id = runs.run_id)'
+            ' FROM runs ORDER BY run_id').fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+class Run:
+    """Buffered writer for one run; rows go to SQLite `batch` at a time"""
+
+    def __init__(self, db: ResultsDB, run_id: int, timeframe: str, min_trades: int,
+                 min_wr: float, batch: int):
+        self.db = db
+        self.run_id = run_id
+        self.timeframe = timeframe
+        self.min_trades = min_trades
+        self.min_wr = min_wr
+        self.batch = batch
+        self.params = {}
+        self.rows = []
+
+    def add(self, params: dict, results: Dict[str, dict]):
+        """results: {asset: {'total', 'wins', 'wr'}} as kept by the optimizers"""
+        key = param_hash(params)
+        self.params[key] = json.dumps(params, sort_keys=True, default=str)
+        for asset, r in results.items():
+            passed = r['total'] >= self.min_trades and r['wr'] >= self.min_wr
+            self.rows.append((self.run_id, self.timeframe, asset, key,
+                              int(r['total']), int(r['wins']), float(r['wr']), int(passed)))
+        if len(self.rows) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        with self.db.conn:
+            self.db.conn.executemany('INSERT OR IGNORE INTO params VALUES (?, ?)', self.params.items())
+            self.db.conn.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                     self.rows)
+        self.params = {}
+        self.rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def import_checkpoint(db: ResultsDB, timeframe: str, path) -> int:
+    """Load a checkpoint.py JSONL file into a new run; returns combos imported"""
+    count = 0
+    with db.start_run(f"import:{Path(path).name}", timeframe) as run, open(path) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if rec.get('results') and 'params' in rec:
+                run.add(rec['params'], rec['results'])
+                count += 1
+    return count
+
+
+if __name__ == '__main__':
+    db = ResultsDB()
+    cmd = sys.argv[1] if len(sys.argv) > 1 else 'runs'
+    if cmd == 'best':
+        timeframe = sys.argv[2]
+        min_passing = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+        for row in db.best_params(timeframe, min_passing):
+            print(f"{row['passing']}/{row['assets']} (mean WR {row['mean_wr']:.0f}%, run {row['run_id']}): {row['params']}")
+    elif cmd == 'import':
+        print(f"Imported {import_checkpoint(db, sys.argv[2], sys.argv[3])} combos")
+    else:
+        for run in db.runs():
+            print(*run)
+    db.close()
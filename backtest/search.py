@@ -0,0 +1,235 @@
+"""
+Successive-halving / Hyperband search over ElliottICTBacktester params
+Instead of evaluating every point of an itertools.product grid on every
+asset, all configs first run on a small budget (a few assets, or only the
+most recent bars), the best 1/eta are promoted to eta times the budget,
+and so on until the survivors run on all assets with the full history.
+Runs are reproducible for a given seed.
+
+    python search.py            # test_parallel.py's 1H grid, successive halving
+    python search.py hyperband
+"""
+
+import math
+import random
+import sys
+import time
+from itertools import product
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from evaluator import Evaluator, passes
+
+# Printed the way test_parallel.py labels them
+LABELS = [
+    ('zz_depth', 'ZZ'), ('zz_dev', 'Dev'), ('fib_entry_level', 'Fib'), ('fib_tolerance', 'Tol'),
+    ('rsi_threshold', 'RSI<'), ('signal_gap', 'Gap'), ('use_trend_filter', 'Trend'),
+    ('ema_period', 'EMA'), ('use_volume_filter', 'Vol'), ('use_rsi_filter', 'RSI_F'),
+]
+
+
+def grid(space: Dict[str, list], fixed: Optional[dict] = None) -> List[dict]:
+    """All combinations of space (name -> values) as param dicts, fixed params added"""
+    names = list(space)
+    return [{**(fixed or {}), **dict(zip(names, values))} for values in product(*space.values())]
+
+
+RULES = ('passing', 'coverage')
+
+
+def score(results: Dict[str, dict], min_trades: int = 2, min_wr: float = 80,
+          rule: str = 'passing') -> tuple:
+    """
+    Rank key: passing assets (rule='passing') or passing / assets with at
+    least min_trades in % (rule='coverage', as test_4h_grid.py), then the
+    mean win rate of the assets with trades
+    """
+    passing = sum(1 for r in results.values() if passes(r, min_trades, min_wr))
+    rates = [r['wr'] for r in results.values() if r['total'] > 0]
+    mean_wr = sum(rates) / len(rates) if rates else 0.0
+    if rule == 'coverage':
+        traded = sum(1 for r in results.values() if r['total'] >= min_trades)
+        return (passing / traded * 100 if traded else 0.0, mean_wr)
+    return (passing, mean_wr)
+
+
+def format_params(params: dict) -> str:
+    parts = []
+    for key, label in LABELS:
+        if key in params:
+            sep = '' if label.endswith('<') else '='
+            parts.append(f"{label}{sep}{params[key]}")
+    return ', '.join(parts)
+
+
+class SearchResult:
+    """
+    Best config found, its full-budget per-asset results and the search
+    cost, under one scoring rule and pass threshold. Improvements are also
+    sent to `telemetry` (a telemetry.Telemetry) when one is given.
+    """
+
+    def __init__(self, assets: List[str], min_trades: int = 2, min_wr: float = 80,
+                 rule: str = 'passing', telemetry=None):
+        self.assets = assets
+        self.min_trades = min_trades
+        self.min_wr = min_wr
+        self.rule = rule
+        self.telemetry = telemetry
+        self.value = 0  # score()[0] of the best config
+        self.passing = 0
+        self.params = None
+        self.results = {}
+        self.backtests = 0
+        self.history = []  # (backtests spent, best passing so far)
+
+    def score(self, results: Dict[str, dict]) -> tuple:
+        return score(results, self.min_trades, self.min_wr, self.rule)
+
+    def offer(self, params: dict, results: Dict[str, dict], backtests: int,
+              verbose: bool = True) -> bool:
+        value = self.score(results)[0]
+        if value > self.value or self.params is None:
+            self.value = value
+            self.passing = sum(1 for r in results.values() if passes(r, self.min_trades, self.min_wr))
+            self.params = params
+            self.results = results
+            if verbose:
+                extra = f" ({value:.0f}% coverage)" if self.rule == 'coverage' else ''
+                print(f"  NEW BEST: {self.passing}/{len(self.assets)}{extra} - {format_params(params)}", flush=True)
+            if self.telemetry is not None:
+                self.telemetry.record_best(value, self.passing, params, backtests)
+            improved = True
+        else:
+            improved = False
+        self.history.append((backtests, self.passing))
+        return improved
+
+
+def successive_halving(evaluator: Evaluator, configs: List[dict], eta: int = 3,
+                       min_budget: Optional[float] = None, resource: str = 'assets',
+                       seed: int = 0, best: Optional[SearchResult] = None,
+                       verbose: bool = True) -> SearchResult:
+    """
+    One successive-halving bracket.
+    Budget b in (0, 1] means the first ceil(b * n_assets) assets of a seeded
+    shuffle (resource='assets') or the last b of every history
+    (resource='bars'). Starts at min_budget (default 1/eta^2), keeps the top
+    1/eta after each rung and ends with a full-budget rung. Scoring rule and
+    pass threshold come from `best` (default: passing count, 2 trades, 80%).
+    """
+    rng = random.Random(seed)
+    assets = list(evaluator.assets)
+    rng.shuffle(assets)
+    if best is None:
+        best = SearchResult(evaluator.assets)
+    if min_budget is None:
+        min_budget = 1 / eta ** 2
+    rungs = max(0, int(round(math.log(1 / min_budget, eta))))
+
+    survivors = list(range(len(configs)))
+    for rung in range(rungs + 1):
+        budget = min(1.0, min_budget * eta ** rung)
+        if resource == 'assets':
+            subset = assets[:max(1, int(math.ceil(budget * len(assets))))]
+            fraction = 1.0
+        else:
+            subset = assets
+            fraction = budget
+
+        results = evaluator.evaluate([configs[i] for i in survivors], subset, fraction)
+        if verbose:
+            print(f"  Rung {rung}: {len(survivors)} configs on {len(subset)} assets"
+                  f" x {fraction:.0%} of bars", flush=True)
+
+        if rung == rungs:
+            for i, res in zip(survivors, results):
+                best.offer(configs[i], res, evaluator.backtests, verbose)
+            break
+
+        # Stable ranking: ties keep the original config order
+        ranked = sorted(zip(survivors, results), key=lambda x: best.score(x[1]), reverse=True)
+        keep = max(1, len(survivors) // eta)
+        survivors = sorted(i for i, _ in ranked[:keep])
+
+    best.backtests = evaluator.backtests
+    return best
+
+
+def hyperband(evaluator: Evaluator, space: Dict[str, list], fixed: Optional[dict] = None,
+              eta: int = 3, max_rungs: int = 3, scale: int = 1, resource: str = 'assets',
+              seed: int = 0, best: Optional[SearchResult] = None, verbose: bool = True,
+              excluded: Optional[Callable[[dict], bool]] = None) -> SearchResult:
+    """
+    Hyperband: successive-halving brackets from aggressive (many configs,
+    tiny first budget) to conservative (few configs, full budget), each on
+    a seeded sample of the grid (minus configs matching `excluded`).
+    scale multiplies every bracket's size.
+    """
+    rng = random.Random(seed)
+    configs = [c for c in grid(space, fixed) if excluded is None or not excluded(c)]
+    if best is None:
+        best = SearchResult(evaluator.assets)
+
+    for s in range(max_rungs - 1, -1, -1):
+        n = int(math.ceil(scale * max_rungs / (s + 1) * eta ** s))
+        n = min(n, len(configs))
+        sample = rng.sample(configs, n)
+        if verbose:
+            print(f"Bracket s={s}: {n} configs, first budget 1/{eta ** s}", flush=True)
+        successive_halving(evaluator, sample, eta=eta, min_budget=1 / eta ** s,
+                           resource=resource, seed=rng.randrange(2 ** 32), best=best,
+                           verbose=verbose)
+    return best
+
+
+def report(best: SearchResult, asset_names: List[str], elapsed: float):
+    """Final summary in test_parallel.py's format"""
+    min_trades, min_wr = best.min_trades, best.min_wr
+    print(f"\nCompleted in {elapsed:.1f} seconds ({best.backtests} backtests)", flush=True)
+    print(f"\n{'='*60}", flush=True)
+    print(f"BEST: {best.passing}/{len(best.assets)}", flush=True)
+    print(format_params(best.params or {}), flush=True)
+    print(f"{'='*60}", flush=True)
+
+    for asset in sorted(asset_names):
+        r = best.results.get(asset, {'total': 0, 'wins': 0, 'wr': 0})
+        if r['total'] >= min_trades:
+            status = "PASS" if r['wr'] >= min_wr else "FAIL"
+            print(f"  {asset}: {r['wins']}/{r['total']} = {r['wr']:.0f}% [{status}]", flush=True)
+        else:
+            print(f"  {asset}: {r['total']} trades [NO SIGNAL]", flush=True)
+
+
+if __name__ == '__main__':
+    from backtester import load_data
+    from bars import BarArrays
+    from results_db import ResultsDB
+    import test_parallel as tp
+
+    data_dir = Path(__file__).resolve().parent.parent / 'data'
+    DATA = {}
+    for asset, file in tp.FILES_1H.items():
+        path = data_dir / file
+        if path.exists():
+            DATA[asset] = BarArrays.from_df(load_data(str(path)))
+    print(f"Loaded {len(DATA)} assets", flush=True)
+
+    space = {
+        'zz_depth': tp.ZZ, 'fib_entry_level': tp.FIB, 'fib_tolerance': tp.TOL,
+        'rsi_threshold': tp.RSI, 'signal_gap': tp.GAP, 'use_trend_filter': tp.TREND,
+        'use_volume_filter': tp.VOL, 'use_rsi_filter': tp.RSI_F,
+    }
+    fixed = {'rr_ratio': 1.0, 'zz_dev': 0.2, 'ema_period': 200}
+
+    method = sys.argv[1] if len(sys.argv) > 1 else 'halving'
+    db = ResultsDB()
+    start = time.time()
+    with Evaluator(DATA, run=db.start_run(f"search:{method}", '1h')) as evaluator:
+        if method == 'hyperband':
+            best = hyperband(evaluator, space, fixed, scale=30)
+        else:
+            configs = [c for c in grid(space, fixed)
+                       if c['use_trend_filter'] or c['use_volume_filter'] or c['use_rsi_filter']]
+            print(f"Testing {len(configs)} combinations (successive halving)...", flush=True)
+            best = successive_halving(evaluator, configs)
+    report(best, list(tp.FILES_1H), time.time() - start)
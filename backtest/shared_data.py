@@ -0,0 +1,95 @@
+"""
+Publish loaded datasets to Pool workers through shared memory
+The parent loads every asset once and copies its bar arrays into a single
+multiprocessing.shared_memory block; workers attach read-only NumPy views
+by name instead of re-importing the script and re-parsing every CSV.
+
+    shared = publish(DATA)
+    with Pool(initializer=init_worker, initargs=(shared.handle,)) as pool:
+        ...
+    shared.close()
+
+where init_worker does DATA.update(attach(handle)).
+"""
+
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Dict
+from bars import BarArrays, as_bars
+
+FIELDS = ['open', 'high', 'low', 'close', 'volume', 'time']
+ALIGN = 64
+
+# Blocks attached in this process; the views are only valid while these stay open
+_ATTACHED = {}
+
+
+def _shareable(arr: np.ndarray) -> bool:
+    # Numbers, bools and naive datetimes only - object arrays can't live in a buffer
+    return arr.dtype.kind in 'biufmM'
+
+
+class SharedDatasets:
+    """Parent-side owner of the shared block; close() releases and unlinks it"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, handle: dict):
+        self.shm = shm
+        self.handle = handle
+
+    def close(self):
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def publish(datasets: Dict[str, object]) -> SharedDatasets:
+    """
+    Copy {name: BarArrays or DataFrame} into one shared-memory block.
+    The returned object's .handle is small and picklable - pass it to the
+    workers (e.g. as Pool initargs) and call attach() there.
+    """
+    layout = {}
+    arrays = []
+    size = 0
+    for name, data in datasets.items():
+        bars = as_bars(data)
+        fields = {}
+        for field in FIELDS:
+            arr = getattr(bars, field)
+            if arr is None or not _shareable(arr):
+                continue
+            fields[field] = (size, arr.dtype.str)
+            arrays.append((size, arr))
+            size += -(-arr.nbytes // ALIGN) * ALIGN
+        layout[name] = {'length': len(bars), 'fields': fields}
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for offset, arr in arrays:
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf, offset=offset)
+        view[:] = arr
+    return SharedDatasets(shm, {'name': shm.name, 'datasets': layout})
+
+
+def attach(handle: dict) -> Dict[str, BarArrays]:
+    """Worker side: BarArrays over the parent's shared block (no copies)"""
+    shm = _ATTACHED.get(handle['name'])
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=handle['name'])
+        _ATTACHED[handle['name']] = shm
+
+    datasets = {}
+    for name, info in handle['datasets'].items():
+        n = info['length']
+        views = {}
+        for field, (offset, dtype) in info['fields'].items():
+            views[field] = np.ndarray((n,), dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)
+        datasets[name] = BarArrays(views['open'], views['high'], views['low'], views['close'],
+                                   volume=views.get('volume'), time=views.get('time'))
+    return datasets
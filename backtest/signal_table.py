@@ -0,0 +1,175 @@
+"""
+Struct-of-arrays storage for backtest signals
+A SignalTable keeps one NumPy column per field (bar, entry, tp, sl,
+direction, result, exit_bar) instead of a list of Signal objects.
+Engines append rows while they scan, resolver.resolve_table() writes
+result/exit_bar in place and counts() is three array reductions.
+
+Indexing or iterating a table builds the engine's Signal dataclass
+objects (once, on first use), so code that reads result.signals as a
+list keeps working. Those objects are a read-only view: changing one
+doesn't change the table.
+"""
+
+import dataclasses
+import numpy as np
+from typing import Tuple
+
+COLUMNS = (
+    ('bar', np.int64),
+    ('entry', np.float64),
+    ('tp', np.float64),
+    ('sl', np.float64),
+    ('direction', np.int8),   # 1=long, -1=short
+    ('result', np.int8),      # 0=open, 1=win, -1=loss
+    ('exit_bar', np.int64),   # bar where TP/SL was hit, -1 while open
+)
+DEFAULTS = {'direction': 1, 'result': 0, 'exit_bar': -1}
+
+# Signal dataclass -> its field names, for building objects
+_FIELDS = {}
+
+
+class SignalTable:
+    """
+    Signals as parallel NumPy columns.
+    signal_type: the engine's Signal dataclass, built by the lazy object view
+    filled: entries are market fills at their signal bar (sets Signal.filled
+    and filled_bar on signal types that have them)
+    """
+
+    def __init__(self, signal_type, capacity: int = 16, filled: bool = False):
+        self.signal_type = signal_type
+        self.filled = filled
+        self._n = 0
+        self._columns = {name: np.empty(capacity, dtype) for name, dtype in COLUMNS}
+        self._objects = None
+
+    @classmethod
+    def from_arrays(cls, signal_type, bar, entry, tp, sl, direction=None, result=None,
+                    exit_bar=None, filled: bool = False) -> 'SignalTable':
+        """Table over whole columns at once (omitted columns get their defaults)"""
+        given = {'bar': bar, 'entry': entry, 'tp': tp, 'sl': sl,
+                 'direction': direction, 'result': result, 'exit_bar': exit_bar}
+        n = len(bar)
+        table = cls.__new__(cls)
+        table.signal_type = signal_type
+        table.filled = filled
+        table._n = n
+        table._columns = {name: (np.full(n, DEFAULTS[name], dtype) if given[name] is None
+                                 else np.asarray(given[name], dtype=dtype))
+                          for name, dtype in COLUMNS}
+        table._objects = None
+        return table
+
+    @classmethod
+    def from_signals(cls, signal_type, signals) -> 'SignalTable':
+        """Table of a list of Signal-like objects"""
+        signals = list(signals)
+        return cls.from_arrays(signal_type, *(
+            [getattr(s, name, DEFAULTS.get(name)) for s in signals] for name, _ in COLUMNS))
+
+    def append(self, bar: int, entry: float, tp: float, sl: float,
+               direction: int = 1, result: int = 0, exit_bar: int = -1):
+        if self._n == len(self._columns['bar']):
+            self._grow()
+        i = self._n
+        columns = self._columns
+        columns['bar'][i] = bar
+        columns['entry'][i] = entry
+        columns['tp'][i] = tp
+        columns['sl'][i] = sl
+        columns['direction'][i] = direction
+        columns['result'][i] = result
+        columns['exit_bar'][i] = exit_bar
+        self._n = i + 1
+        self._objects = None
+
+    def _grow(self):
+        size = max(16, 2 * self._n)
+        for name, column in self._columns.items():
+            grown = np.empty(size, column.dtype)
+            grown[:self._n] = column[:self._n]
+            self._columns[name] = grown
+
+    def column(self, name: str) -> np.ndarray:
+        """Writable view of one column's filled rows"""
+        return self._columns[name][:self._n]
+
+    @property
+    def bar(self) -> np.ndarray:
+        return self.column('bar')
+
+    @property
+    def entry(self) -> np.ndarray:
+        return self.column('entry')
+
+    @property
+    def tp(self) -> np.ndarray:
+        return self.column('tp')
+
+    @property
+    def sl(self) -> np.ndarray:
+        return self.column('sl')
+
+    @property
+    def direction(self) -> np.ndarray:
+        return self.column('direction')
+
+    @property
+    def result(self) -> np.ndarray:
+        return self.column('result')
+
+    @property
+    def exit_bar(self) -> np.ndarray:
+        return self.column('exit_bar')
+
+    def counts(self) -> Tuple[int, int, int]:
+        """(wins, losses, open trades)"""
+        losses, open_trades, wins = np.bincount(self.result + 1, minlength=3).tolist()
+        return wins, losses, open_trades
+
+    def reset_view(self):
+        """Drop the cached Signal objects after writing to the columns directly"""
+        self._objects = None
+
+    def objects(self) -> list:
+        """The rows as signal_type objects (built on first use)"""
+        if self._objects is None:
+            fields = _FIELDS.get(self.signal_type)
+            if fields is None:
+                fields = _FIELDS[self.signal_type] = {f.name for f in dataclasses.fields(self.signal_type)}
+            optional = [name for name in ('direction', 'result', 'exit_bar') if name in fields]
+            fill = self.filled and 'filled' in fields
+            rows = zip(*(self.column(name).tolist() for name, _ in COLUMNS))
+            objects = []
+            for bar, entry, tp, sl, direction, result, exit_bar in rows:
+                values = {'direction': direction, 'result': result, 'exit_bar': exit_bar}
+                extra = {name: values[name] for name in optional}
+                if fill:
+                    extra['filled'] = True
+                    extra['filled_bar'] = bar
+                objects.append(self.signal_type(bar=bar, entry=entry, tp=tp, sl=sl, **extra))
+            self._objects = objects
+        return self._objects
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __getitem__(self, index):
+        return self.objects()[index]
+
+    def __iter__(self):
+        return iter(self.objects())
+
+    def __eq__(self, other):
+        if isinstance(other, SignalTable):
+            return (self._n == other._n and
+                    all(np.array_equal(self.column(name), other.column(name)) for name, _ in COLUMNS))
+        if isinstance(other, list):
+            return self.objects() == other
+        return NotImplemented
+
+    def __repr__(self):
+        wins, losses, open_trades = self.counts()
+        return f"SignalTable({self._n} signals: {wins} wins, {losses} losses, {open_trades} open)"
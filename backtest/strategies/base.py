@@ -3,7 +3,13 @@ Base strategy class for backtesting
 """
 import pandas as pd
 from dataclasses import dataclass
-from typing import List, Tuple
+from typing import Optional, Tuple, Union
+
+from bars import BarArrays, as_bars, engine_frame
+from indicators import shared_cache
+from profiling import Profile, begin_profile
+from resolver import resolve_table
+from signal_table import SignalTable
 
 @dataclass
 class Signal:
@@ -13,6 +19,7 @@ class Signal:
     sl: float
     direction: int = 1  # 1=long, -1=short
     result: int = 0  # 0=open, 1=win, -1=loss
+    exit_bar: int = -1  # bar where TP/SL was hit, -1 while open
 
 @dataclass
 class BacktestResult:
@@ -21,53 +28,44 @@ class BacktestResult:
     losses: int
     open_trades: int
     win_rate: float
-    signals: List[Signal]
+    signals: SignalTable  # indexing/iterating gives Signal objects
+    profile: Optional[Profile] = None  # per-stage timings when profiling is on
 
 class BaseStrategy:
-    """Base class for all strategies"""
+    """
+    Base class for all strategies.
+    self.df is this instance's own frame over the shared bar arrays (see
+    bars.engine_frame): extra DataFrame columns are kept, added ones stay local
+    """
     
-    def __init__(self, df: pd.DataFrame, params: dict):
-        self.df = df
+    def __init__(self, df: Union[pd.DataFrame, BarArrays], params: dict):
+        self.bars = as_bars(df)
+        self.df = engine_frame(df, self.bars)
+        self.indicators = shared_cache(df, self.df)
         self.params = params
-        self.signals = []
+        self.signals = SignalTable(Signal)
     
-    def generate_signals(self) -> List[Signal]:
-        """Override in subclass"""
+    def generate_signals(self) -> SignalTable:
+        """Override in subclass: a SignalTable(Signal) (a list of Signal also works)"""
         raise NotImplementedError
     
     def run_backtest(self) -> BacktestResult:
         """Run backtest with generated signals"""
-        self.signals = self.generate_signals()
+        profile = begin_profile(self)
+        signals = self.generate_signals()
+        if not isinstance(signals, SignalTable):
+            signals = SignalTable.from_signals(Signal, signals)
+        self.signals = signals
+        profile.lap('signals', len(self.df))
         
-        # Process signals
-        for signal in self.signals:
-            signal.result = 0  # Reset
-            
-            # Check TP/SL from next bar
-            for bar in range(signal.bar + 1, len(self.df)):
-                low = self.df['low'].iloc[bar]
-                high = self.df['high'].iloc[bar]
-                
-                if signal.direction == 1:  # Long
-                    if low <= signal.sl:
-                        signal.result = -1
-                        break
-                    if high >= signal.tp:
-                        signal.result = 1
-                        break
-                else:  # Short
-                    if high >= signal.sl:
-                        signal.result = -1
-                        break
-                    if low <= signal.tp:
-                        signal.result = 1
-                        break
+        # Process signals - TP/SL from next bar, SL first, longs and shorts
+        resolve_table(self.signals, self.df['high'].values, self.df['low'].values)
+        profile.lap('resolve', len(self.signals))
         
-        wins = sum(1 for s in self.signals if s.result == 1)
-        losses = sum(1 for s in self.signals if s.result == -1)
-        open_trades = sum(1 for s in self.signals if s.result == 0)
+        wins, losses, open_trades = self.signals.counts()
         total = len(self.signals)
         win_rate = (wins / (wins + losses) * 100) if (wins + losses) > 0 else 0
+        profile.lap('results', total)
         
         return BacktestResult(
             total=total,
@@ -75,5 +73,6 @@ class BaseStrategy:
             losses=losses,
             open_trades=open_trades,
             win_rate=win_rate,
-            signals=self.signals
+            signals=self.signals,
+            profile=profile.finish()
         )
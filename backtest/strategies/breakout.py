@@ -3,7 +3,7 @@ Strategy 2: Breakout - Entry on high/low break
 """
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy, Signal
+from .base import BaseStrategy, Signal, SignalTable
 
 class BreakoutStrategy(BaseStrategy):
     """
@@ -15,13 +15,12 @@ class BreakoutStrategy(BaseStrategy):
     
     def find_range(self, bar: int, lookback: int = 20):
         """Find recent high and low"""
-        start = max(0, bar - lookback)
-        high = self.df['high'].iloc[start:bar].max()
-        low = self.df['low'].iloc[start:bar].min()
+        high = self.indicators.get('swing_high', lookback)[bar]
+        low = self.indicators.get('swing_low', lookback)[bar]
         return high, low
     
     def generate_signals(self):
-        signals = []
+        signals = SignalTable(Signal)
         last_signal_bar = -100
         
         rr_ratio = self.params.get('rr_ratio', 2.0)
@@ -48,13 +47,13 @@ class BreakoutStrategy(BaseStrategy):
                     risk = entry - sl
                     tp = entry + (risk * rr_ratio)
                     
-                    signals.append(Signal(
+                    signals.append(
                         bar=bar,
                         entry=entry,
                         tp=tp,
                         sl=sl,
                         direction=1
-                    ))
+                    )
                     last_signal_bar = bar
         
         return signals
@@ -3,7 +3,7 @@ Strategy 4: Dynamic TP based on ATR
 """
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy, Signal
+from .base import BaseStrategy, Signal, SignalTable
 
 class DynamicTPStrategy(BaseStrategy):
     """
@@ -14,20 +14,11 @@ class DynamicTPStrategy(BaseStrategy):
     """
     
     def calculate_atr(self, bar: int, period: int = 14):
-        """Calculate ATR"""
+        """Mean true range of the `period` bars before bar"""
         if bar < period:
             return None
         
-        tr_list = []
-        for i in range(bar - period, bar):
-            high = self.df['high'].iloc[i]
-            low = self.df['low'].iloc[i]
-            prev_close = self.df['close'].iloc[i-1] if i > 0 else self.df['close'].iloc[i]
-            
-            tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-            tr_list.append(tr)
-        
-        return sum(tr_list) / len(tr_list)
+        return self.indicators.get('window_atr', period)[bar]
     
     def find_swing_points(self, bar: int, depth: int = 5):
         """Find swing high and low"""
@@ -66,7 +57,7 @@ class DynamicTPStrategy(BaseStrategy):
         return swing_high, swing_low
     
     def generate_signals(self):
-        signals = []
+        signals = SignalTable(Signal)
         last_signal_bar = -100
         
         signal_gap = self.params.get('signal_gap', 10)
@@ -104,13 +95,13 @@ class DynamicTPStrategy(BaseStrategy):
                     # Dynamic TP based on ATR
                     tp = entry + (atr * atr_mult)
                     
-                    signals.append(Signal(
+                    signals.append(
                         bar=bar,
                         entry=entry,
                         tp=tp,
                         sl=sl,
                         direction=1
-                    ))
+                    )
                     last_signal_bar = bar
         
         return signals
@@ -3,7 +3,7 @@ Strategy 1: ICT Pure - FVG + SMT without Elliott Waves
 """
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy, Signal
+from .base import BaseStrategy, Signal, SignalTable
 
 class ICTPureStrategy(BaseStrategy):
     """
@@ -55,10 +55,10 @@ class ICTPureStrategy(BaseStrategy):
             if is_low:
                 return self.df['low'].iloc[i], i
         
-        return self.df['low'].iloc[bar - lookback:bar].min(), bar - 5
+        return self.indicators.get('swing_low', lookback)[bar], bar - 5
     
     def generate_signals(self):
-        signals = []
+        signals = SignalTable(Signal)
         last_signal_bar = -100
         
         rr_ratio = self.params.get('rr_ratio', 2.0)
@@ -94,13 +94,13 @@ class ICTPureStrategy(BaseStrategy):
                             risk = entry - sl
                             tp = entry + (risk * rr_ratio)
                             
-                            signals.append(Signal(
+                            signals.append(
                                 bar=bar,
                                 entry=entry,
                                 tp=tp,
                                 sl=sl,
                                 direction=1
-                            ))
+                            )
                             last_signal_bar = bar
                             break
         
@@ -3,7 +3,7 @@ Strategy 5: Momentum - RSI + EMA trend
 """
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy, Signal
+from .base import BaseStrategy, Signal, SignalTable
 
 class MomentumStrategy(BaseStrategy):
     """
@@ -14,48 +14,21 @@ class MomentumStrategy(BaseStrategy):
     """
     
     def calculate_rsi(self, bar: int, period: int = 14):
-        """Calculate RSI"""
-        if bar < period:
+        """RSI of the `period` close changes before bar"""
+        if bar <= period:
             return 50
         
-        gains = []
-        losses = []
-        
-        for i in range(bar - period, bar):
-            change = self.df['close'].iloc[i] - self.df['close'].iloc[i-1]
-            if change > 0:
-                gains.append(change)
-                losses.append(0)
-            else:
-                gains.append(0)
-                losses.append(abs(change))
-        
-        avg_gain = sum(gains) / period
-        avg_loss = sum(losses) / period
-        
-        if avg_loss == 0:
-            return 100
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return self.indicators.get('window_rsi', period)[bar - 1]
     
     def calculate_ema(self, bar: int, period: int = 50):
-        """Calculate EMA"""
+        """EMA over the last `period` closes, started from close[bar - period]"""
         if bar < period:
             return self.df['close'].iloc[bar]
         
-        mult = 2 / (period + 1)
-        ema = self.df['close'].iloc[bar - period]
-        
-        for i in range(bar - period + 1, bar + 1):
-            ema = (self.df['close'].iloc[i] - ema) * mult + ema
-        
-        return ema
+        return self.indicators.get('window_ema', period)[bar]
     
     def generate_signals(self):
-        signals = []
+        signals = SignalTable(Signal)
         last_signal_bar = -100
         
         rr_ratio = self.params.get('rr_ratio', 2.0)
@@ -94,19 +67,19 @@ class MomentumStrategy(BaseStrategy):
                 entry = current_close
                 
                 # SL below recent low
-                recent_low = self.df['low'].iloc[bar - lookback:bar].min()
+                recent_low = self.indicators.get('swing_low', lookback)[bar]
                 sl = recent_low * 0.998
                 
                 risk = entry - sl
                 tp = entry + (risk * rr_ratio)
                 
-                signals.append(Signal(
+                signals.append(
                     bar=bar,
                     entry=entry,
                     tp=tp,
                     sl=sl,
                     direction=1
-                ))
+                )
                 last_signal_bar = bar
         
         return signals
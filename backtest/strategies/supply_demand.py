@@ -3,7 +3,7 @@ Strategy 3: Supply/Demand Zones
 """
 import pandas as pd
 import numpy as np
-from .base import BaseStrategy, Signal
+from .base import BaseStrategy, Signal, SignalTable
 
 class SupplyDemandStrategy(BaseStrategy):
     """
@@ -54,7 +54,7 @@ class SupplyDemandStrategy(BaseStrategy):
         return demand_zones, supply_zones
     
     def generate_signals(self):
-        signals = []
+        signals = SignalTable(Signal)
         last_signal_bar = -100
         
         rr_ratio = self.params.get('rr_ratio', 2.0)
@@ -83,13 +83,13 @@ class SupplyDemandStrategy(BaseStrategy):
                         risk = entry - sl
                         tp = entry + (risk * rr_ratio)
                         
-                        signals.append(Signal(
+                        signals.append(
                             bar=bar,
                             entry=entry,
                             tp=tp,
                             sl=sl,
                             direction=1
-                        ))
+                        )
                         last_signal_bar = bar
                         break
         
@@ -0,0 +1,186 @@
+"""
+Live telemetry for running optimizations
+Every chunk a worker returns carries a small stats record (busy time,
+per-stage profile from profiling.TOTALS, pivot/indicator cache lookups). The parent
+aggregates them per worker and appends newline-delimited JSON events
+(chunk, progress, best, summary) to a file; with a port it also serves
+the current snapshot on localhost.
+
+    tail -f 1h-grid.telemetry.ndjson
+    curl http://127.0.0.1:8765/status
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+from indicators import STATS as INDICATOR_STATS
+from pivots import ZIGZAG_CACHE
+from profiling import TOTALS, Profile
+
+CACHES = ('pivot', 'indicator')
+SUMMARY_EVERY = 10.0  # seconds between summary events
+
+
+def counters() -> dict:
+    """This process's cumulative stage profile and cache lookups"""
+    return {
+        'stages': TOTALS.as_dict(),
+        'pivot_hits': ZIGZAG_CACHE.hits, 'pivot_misses': ZIGZAG_CACHE.misses,
+        'indicator_hits': INDICATOR_STATS['hits'], 'indicator_misses': INDICATOR_STATS['misses'],
+    }
+
+
+def chunk_stats(before: dict, configs: int, backtests: int, seconds: float) -> dict:
+    """What a worker reports with a chunk: counters() now minus `before`"""
+    import socket  # only for the worker label
+    after = counters()
+    stats = {
+        'worker': f"{socket.gethostname()}:{os.getpid()}",
+        'configs': configs, 'backtests': backtests, 'seconds': round(seconds, 6),
+        'stages': TOTALS.since(before['stages']),
+    }
+    for cache in CACHES:
+        for kind in ('hits', 'misses'):
+            key = f'{cache}_{kind}'
+            stats[key] = after[key] - before[key]
+    return stats
+
+
+class Telemetry:
+    """
+    Parent-side aggregate of chunk stats, progress and best-so-far.
+    path: NDJSON file to append to (None = keep in memory only)
+    port: serve snapshot() as JSON on 127.0.0.1:port (0 = any free port)
+    """
+
+    def __init__(self, path=None, port: Optional[int] = None, summary_every: float = SUMMARY_EVERY):
+        self.path = path
+        self.summary_every = summary_every
+        self.started = time.time()
+        self.workers = {}  # worker -> {'configs', 'backtests', 'busy', 'chunks'}
+        self.stages = Profile()
+        self.caches = {f'{c}_{k}': 0 for c in CACHES for k in ('hits', 'misses')}
+        self.queue_depth = 0
+        self.done = 0
+        self.total = None
+        self.best = []  # best-so-far history
+        self._lock = threading.Lock()
+        self._file = open(path, 'a') if path else None
+        self._last_summary = time.monotonic()
+        self._server = None
+        self.port = None
+        if port is not None:
+            self._serve(port)
+
+    def emit(self, event: str, **fields):
+        if self._file is None:
+            return
+        line = json.dumps({'time': round(time.time(), 3), 'event': event, **fields}, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def chunk(self, stats: dict, queue_depth: Optional[int] = None):
+        with self._lock:
+            w = self.workers.setdefault(stats['worker'], {'configs': 0, 'backtests': 0, 'busy': 0.0, 'chunks': 0})
+            w['configs'] += stats['configs']
+            w['backtests'] += stats['backtests']
+            w['busy'] += stats['seconds']
+            w['chunks'] += 1
+            self.stages.merge(stats['stages'])
+            for key in self.caches:
+                self.caches[key] += stats.get(key, 0)
+            if queue_depth is not None:
+                self.queue_depth = queue_depth
+        self.emit('chunk', queue_depth=queue_depth, **stats)
+        self._maybe_summary()
+
+    def progress(self, done: int, total: Optional[int] = None):
+        self.done = done
+        if total is not None:
+            self.total = total
+        self.emit('progress', done=done, total=self.total)
+        self._maybe_summary()
+
+    def record_best(self, value, passing: int, params: dict, backtests: Optional[int] = None):
+        entry = {'elapsed': round(time.time() - self.started, 3), 'backtests': backtests,
+                 'value': value, 'passing': passing, 'params': params}
+        with self._lock:
+            self.best.append(entry)
+        self.emit('best', **entry)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = max(time.time() - self.started, 1e-9)
+            workers = {
+                name: {**w, 'busy': round(w['busy'], 3),
+                       'configs_per_s': round(w['configs'] / w['busy'], 2) if w['busy'] else 0.0,
+                       'backtests_per_s': round(w['backtests'] / w['busy'], 2) if w['busy'] else 0.0}
+                for name, w in self.workers.items()
+            }
+            stage_total = sum(s for k, (s, _, _) in self.stages.stages.items() if '.' not in k)
+            caches = {}
+            for cache in CACHES:
+                hits, misses = self.caches[f'{cache}_hits'], self.caches[f'{cache}_misses']
+                caches[cache] = {'hits': hits, 'misses': misses,
+                                 'hit_rate': round(hits / (hits + misses), 4) if hits + misses else None}
+            return {
+                'elapsed': round(elapsed, 3),
+                'done': self.done, 'total': self.total,
+                'queue_depth': self.queue_depth,
+                'configs_per_s': round(sum(w['configs'] for w in self.workers.values()) / elapsed, 2),
+                'backtests_per_s': round(sum(w['backtests'] for w in self.workers.values()) / elapsed, 2),
+                'workers': workers,
+                'stages': {k: {'seconds': round(s, 3), 'share': round(s / stage_total, 4) if stage_total else 0.0,
+                               'calls': c, 'items': i}
+                           for k, (s, c, i) in self.stages.stages.items()},
+                'caches': caches,
+                'best': list(self.best),
+            }
+
+    def _maybe_summary(self):
+        now = time.monotonic()
+        if now - self._last_summary >= self.summary_every:
+            self._last_summary = now
+            self.emit('summary', **self.snapshot())
+
+    def _serve(self, port: int):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/', '/status'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(telemetry.snapshot(), default=str).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.emit('summary', final=True, **self.snapshot())
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -3,6 +3,7 @@ import os
 import sys
 sys.path.append(os.path.dirname(__file__))
 from backtester import load_data
+from indicators import shared_cache
 import glob
 
 DATA_DIR = r'C:\Users\danie\projects\elliott-wave-indicator\data'
@@ -29,13 +30,6 @@ for f in list(set(files)):
 print(f"Loaded {len(data)} 4H assets: {sorted(data.keys())}")
 print()
 
-def calculate_rsi(df, period=14):
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
 def calculate_zigzag(df, depth):
     highs = df['high'].values
     lows = df['low'].values
@@ -53,7 +47,7 @@ def calculate_zigzag(df, depth):
     return pivots
 
 def backtest(df, zz, rsi_max, tol, rr):
-    rsi = calculate_rsi(df)
+    rsi = shared_cache(df).get('rsi', 14)
     pivots = calculate_zigzag(df, zz)
     signals = []
     for i in range(2, len(pivots)):
@@ -65,7 +59,7 @@ def backtest(df, zz, rsi_max, tol, rr):
             tolerance = (wave1_high - wave1_low) * tol
             if abs(wave2_low - fib_price) <= tolerance:
                 bar = p2['idx']
-                if rsi.iloc[bar] < rsi_max:
+                if rsi[bar] < rsi_max:
                     entry = df['close'].iloc[bar]
                     sl = wave1_low * 0.99
                     tp = entry + (entry - sl) * rr
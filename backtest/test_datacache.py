@@ -0,0 +1,59 @@
+"""
+Test the CSV binary cache: cached frames behave like pd.read_csv's
+Usage: python test_datacache.py  (or pytest backtest/test_datacache.py)
+"""
+import os
+import sys
+import tempfile
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from backtester import load_data
+
+CSV = "time,open,high,low,close,Volume\n" + "".join(
+    f"{1700000000 + 3600 * i},{100 + i},{101 + i},{99 + i},{100.5 + i},{1000 + i}\n" for i in range(20))
+
+
+def _cached_csv(directory: str) -> str:
+    path = os.path.join(directory, 'TEST_1H.csv')
+    with open(path, 'w') as f:
+        f.write(CSV)
+    load_data(path)  # first read parses the CSV and fills the cache
+    assert os.path.isdir(os.path.join(directory, '.cache'))
+    return path
+
+
+def test_cached_frame_is_writable():
+    with tempfile.TemporaryDirectory() as directory:
+        path = _cached_csv(directory)
+        df = load_data(path)
+        expected = load_data(path).copy()
+        df.iloc[0, 0] = 1.0
+        df.loc[df.index[1], 'close'] = 2.0
+        df['close'] *= 2
+        assert df.iloc[0, 0] == 1.0 and df['close'].iloc[1] == 4.0
+        # the cache itself is untouched
+        pd.testing.assert_frame_equal(load_data(path), expected)
+
+
+def test_mmap_frame_is_read_only():
+    with tempfile.TemporaryDirectory() as directory:
+        path = _cached_csv(directory)
+        df = load_data(path, mmap=True)
+        pd.testing.assert_frame_equal(df, load_data(path))
+        try:
+            df['close'].values[0] = 1.0
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("mmap=True columns should be read-only")
+        assert np.isclose(load_data(path)['close'].iloc[0], 100.5)
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            test()
+            print(f"ok {name}")
@@ -9,6 +9,8 @@ import numpy as np
 from pathlib import Path
 from multiprocessing import Pool, cpu_count
 from itertools import product
+from indicators import shared_cache
+from resolver import resolve_signals
 
 DATA_DIR = Path(r'C:\Users\danie\projects\elliott-wave-indicator\data')
 
@@ -78,13 +80,9 @@ def test_engulfing(df, params):
     rr_ratio = 1.0
     
     # Calculate indicators
-    ema = df['close'].ewm(span=ema_period).mean()
-    
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(rsi_period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(rsi_period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    indicators = shared_cache(df)
+    ema = indicators.get('ema', ema_period)
+    rsi = indicators.get('rsi', rsi_period)
     
     signals = []
     last_bar = -signal_gap - 1
@@ -94,11 +92,11 @@ def test_engulfing(df, params):
             continue
         
         # Trend filter
-        if df['close'].iloc[bar] <= ema.iloc[bar]:
+        if df['close'].iloc[bar] <= ema[bar]:
             continue
         
         # RSI filter
-        if pd.isna(rsi.iloc[bar]) or rsi.iloc[bar] > rsi_max:
+        if pd.isna(rsi[bar]) or rsi[bar] > rsi_max:
             continue
         
         # Pattern check
@@ -117,14 +115,11 @@ def test_engulfing(df, params):
         last_bar = bar
     
     # Process signals
-    for signal in signals:
-        for bar in range(signal['bar'] + 1, len(df)):
-            if df['low'].iloc[bar] <= signal['sl']:
-                signal['result'] = -1
-                break
-            if df['high'].iloc[bar] >= signal['tp']:
-                signal['result'] = 1
-                break
+    results, _ = resolve_signals(
+        df['high'].values, df['low'].values,
+        [s['bar'] for s in signals], [s['tp'] for s in signals], [s['sl'] for s in signals])
+    for signal, result in zip(signals, results.tolist()):
+        signal['result'] = result
     
     wins = sum(1 for s in signals if s['result'] == 1)
     losses = sum(1 for s in signals if s['result'] == -1)
@@ -3,6 +3,7 @@ import os
 import sys
 sys.path.append(os.path.dirname(__file__))
 from backtester import load_data
+from indicators import shared_cache
 import glob
 import numpy as np
 import pandas as pd
@@ -27,18 +28,6 @@ for f in list(set(files)):
     except:
         pass
 
-def calculate_rsi(df, period=14):
-    """Calculate RSI"""
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
-
-def calculate_ema(df, period=50):
-    """Calculate EMA"""
-    return df['close'].ewm(span=period, adjust=False).mean()
-
 def calculate_zigzag(df, depth=5):
     """Calculate zigzag points"""
     highs = df['high'].values
@@ -87,9 +76,9 @@ def backtest_with_filters(df, params):
     min_wave_pct = params.get('min_wave_pct', 5.0)
     
     # Calculate indicators
-    rsi = calculate_rsi(df) if use_rsi else None
-    ema = calculate_ema(df, ema_period) if use_ema else None
-    vol_ma = df['volume'].rolling(20).mean() if use_volume and 'volume' in df.columns else None
+    rsi = shared_cache(df).get('rsi', 14) if use_rsi else None
+    ema = shared_cache(df).get('ema', ema_period, False) if use_ema else None
+    vol_ma = shared_cache(df).get('volume_sma', 20) if use_volume and 'volume' in df.columns else None
     
     # Get zigzag
     pivots = calculate_zigzag(df, zz_depth)
@@ -118,11 +107,11 @@ def backtest_with_filters(df, params):
                     
                     # Apply filters
                     if use_rsi and rsi is not None:
-                        if rsi.iloc[bar] > rsi_max or rsi.iloc[bar] < rsi_min:
+                        if rsi[bar] > rsi_max or rsi[bar] < rsi_min:
                             continue
                     
                     if use_ema and ema is not None:
-                        if df['close'].iloc[bar] < ema.iloc[bar]:  # Price below EMA = no buy
+                        if df['close'].iloc[bar] < ema[bar]:  # Price below EMA = no buy
                             continue
                     
                     if use_bullish_candle:
@@ -130,7 +119,7 @@ def backtest_with_filters(df, params):
                             continue
                     
                     if use_volume and vol_ma is not None:
-                        if df['volume'].iloc[bar] < vol_ma.iloc[bar] * volume_mult:
+                        if df['volume'].iloc[bar] < vol_ma[bar] * volume_mult:
                             continue
                     
                     if use_wave_strength:
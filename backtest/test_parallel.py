@@ -6,6 +6,11 @@ import sys
 sys.path.insert(0, r'C:\Users\danie\projects\elliott-wave-indicator\backtest')
 
 from backtester import ElliottICTBacktester, load_data
+from bars import BarArrays
+from shared_data import publish, attach
+from pruning import shared_best, raise_best, can_still_win, AssetOrder
+from results_db import ResultsDB
+from schedule import plan_configs
 from pathlib import Path
 from itertools import product
 from multiprocessing import Pool, cpu_count
@@ -36,17 +41,30 @@ FILES_1H = {
     'USDILS': 'FOREXCOM_USDILS, 60_14147.csv',
 }
 
-# Load data once globally
-print("Loading data...", flush=True)
+# Loaded once in the parent, workers attach to it through shared memory
 DATA = {}
-for asset, file in FILES_1H.items():
-    path = DATA_DIR / file
-    if path.exists():
-        try:
-            DATA[asset] = load_data(str(path))
-        except:
-            pass
-print(f"Loaded {len(DATA)} assets", flush=True)
+
+def load_all():
+    print("Loading data...", flush=True)
+    for asset, file in FILES_1H.items():
+        path = DATA_DIR / file
+        if path.exists():
+            try:
+                DATA[asset] = BarArrays.from_df(load_data(str(path)))
+            except:
+                pass
+    print(f"Loaded {len(DATA)} assets", flush=True)
+
+# Branch-and-bound: skip the rest of a combo's assets once it can't reach the best
+PRUNE = True
+BEST = None
+ORDER = None
+
+def init_worker(handle, best):
+    global BEST, ORDER
+    DATA.update(attach(handle))
+    BEST = best
+    ORDER = AssetOrder(DATA)
 
 # REDUCED but comprehensive grid
 ZZ = [2, 3, 4, 5]
@@ -58,31 +76,72 @@ TREND = [True, False]
 VOL = [True, False]
 RSI_F = [True, False]
 
-def test_single_combo(args):
-    """Test a single combination - for parallel execution"""
+CHUNK = 120  # max combos per task; each task runs one run_batch per asset
+
+def combo_params(args):
     zz, fib, tol, rsi, gap, trend, vol, rsi_f = args
-    
-    params = {
+    return {
         'zz_depth': zz, 'fib_entry_level': fib, 'fib_tolerance': tol,
         'rsi_threshold': rsi, 'signal_gap': gap, 'use_trend_filter': trend,
         'use_volume_filter': vol, 'use_rsi_filter': rsi_f,
         'rr_ratio': 1.0, 'zz_dev': 0.2, 'ema_period': 200,
     }
+
+def summarize(result):
+    total = result.wins + result.losses
+    return {'total': total, 'wins': result.wins, 'wr': result.win_rate if total > 0 else 0}
+
+def test_single_combo(args):
+    """Test a single combination - for parallel execution"""
+    params = combo_params(args)
     
     results = {}
     for asset, df in DATA.items():
         try:
             bt = ElliottICTBacktester(df, params)
-            result = bt.run_backtest()
-            total = result.wins + result.losses
-            results[asset] = {'total': total, 'wins': result.wins, 'wr': result.win_rate if total > 0 else 0}
+            results[asset] = summarize(bt.run_backtest(batch=True))
         except:
             pass
     
     passing = sum(1 for r in results.values() if r['total'] >= 2 and r['wr'] >= 80)
     return (passing, args, results)
 
+def test_combo_chunk(chunk):
+    """
+    Test a chunk of combos with one run_batch call per asset.
+    With PRUNE, combos that can no longer reach BEST are dropped between
+    assets and come back with results=None.
+    """
+    param_list = [combo_params(args) for args in chunk]
+    results = [{} for _ in chunk]
+    passing = [0] * len(chunk)
+    live = list(range(len(chunk)))
+    
+    assets = ORDER.order() if PRUNE else list(DATA)
+    for k, asset in enumerate(assets):
+        if PRUNE:
+            live = [i for i in live if can_still_win(passing[i], len(assets) - k, BEST)]
+            if not live:
+                break
+        try:
+            per_asset = [summarize(r) for r in ElliottICTBacktester(DATA[asset]).run_batch([param_list[i] for i in live])]
+        except:
+            continue
+        for i, r in zip(live, per_asset):
+            ok = r['total'] >= 2 and r['wr'] >= 80
+            results[i][asset] = r
+            passing[i] += ok
+            ORDER.record(asset, ok)
+        if PRUNE and live:
+            # Partial counts are lower bounds, so they can already tighten BEST
+            raise_best(BEST, max(passing[i] for i in live))
+    
+    done = set(live)
+    return [(passing[i], args, results[i] if i in done else None) for i, args in enumerate(chunk)]
+
 if __name__ == '__main__':
+    load_all()
+    
     # Generate all combinations
     combos = []
     for zz, fib, tol, rsi, gap, trend, vol, rsi_f in product(ZZ, FIB, TOL, RSI, GAP, TREND, VOL, RSI_F):
@@ -96,9 +155,18 @@ if __name__ == '__main__':
     
     # Run in parallel
     best = {'passing': 0}
-    with Pool(processes=cpu_count()) as pool:
-        for i, (passing, args, results) in enumerate(pool.imap_unordered(test_single_combo, combos, chunksize=50)):
-            if passing > best['passing']:
+    shared = publish(DATA)
+    run = ResultsDB().start_run(Path(__file__).stem, '1h')
+    with shared, run, Pool(processes=cpu_count(), initializer=init_worker, initargs=(shared.handle, shared_best())) as pool:
+        # Longest-first by estimated cost, shrinking towards the tail
+        bars = sum(len(b) for b in DATA.values())
+        plan = plan_configs([combo_params(args) for args in combos], bars, cpu_count(), CHUNK)
+        chunks = [[combos[i] for i in chunk] for chunk in plan]
+        done = (r for chunk in pool.imap_unordered(test_combo_chunk, chunks) for r in chunk)
+        for i, (passing, args, results) in enumerate(done):
+            if results is not None:
+                run.add(combo_params(args), results)
+            if results is not None and passing > best['passing']:
                 zz, fib, tol, rsi, gap, trend, vol, rsi_f = args
                 best = {
                     'passing': passing, 'results': results,
@@ -9,7 +9,7 @@ sys.path.append(os.path.dirname(__file__))
 from backtester import ElliottICTBacktester, load_data
 import glob
 
-DATA_DIR = r'C:\Users\danie\projects\elliott-wave-indicator\data'
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
 
 # Current params (will be updated as we learn)
 PARAMS = {
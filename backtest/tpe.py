@@ -0,0 +1,196 @@
+"""
+Offline TPE-style optimizer for grids too large to enumerate (15m, 5m)
+Tree-structured Parzen estimator over discrete choices: completed configs
+are split into the best `gamma` fraction and the rest, each parameter gets
+a smoothed density for both groups, and new proposals are the candidates
+(drawn from the good density) with the highest good/bad ratio. Proposals
+are evaluated a batch at a time through the Evaluator's process pool.
+Pure NumPy, no network, reproducible for a given seed.
+
+    python tpe.py 15m [evaluations] [seed]
+"""
+
+import math
+import sys
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional
+from evaluator import Evaluator, timeframe_files, load_datasets
+from search import SearchResult, report
+from results_db import ResultsDB
+
+
+class TPE:
+    """
+    Proposes configs from space (name -> list of choices) given scored history.
+    excluded: predicate on a config dict; matching configs are never proposed
+    """
+
+    def __init__(self, space: Dict[str, list], fixed: Optional[dict] = None, seed: int = 0,
+                 gamma: float = 0.25, n_startup: int = 20, n_candidates: int = 32,
+                 prior_weight: float = 1.0, excluded: Optional[Callable[[dict], bool]] = None):
+        self.space = space
+        self.names = list(space)
+        self.fixed = fixed or {}
+        self.excluded = excluded
+        self.rng = np.random.default_rng(seed)
+        self.gamma = gamma
+        self.n_startup = n_startup
+        self.n_candidates = n_candidates
+        self.prior_weight = prior_weight
+        self.observed = []  # (choice indices, objective)
+        self.seen = set()
+
+    def config(self, idx) -> dict:
+        return {**self.fixed, **{name: self.space[name][i] for name, i in zip(self.names, idx)}}
+
+    def tell(self, idx, objective: float):
+        self.observed.append((tuple(idx), objective))
+
+    def _ordered(self, name) -> bool:
+        values = self.space[name]
+        return all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values)
+
+    def _density(self, name, indices: List[int]) -> np.ndarray:
+        """
+        Parzen estimate over one parameter's choices: a Gaussian (in choice
+        index units) around each observation for numeric lists, exact
+        matches for booleans/labels, plus a uniform prior
+        """
+        k = len(self.space[name])
+        weights = np.full(k, self.prior_weight / k)
+        if indices:
+            obs = np.asarray(indices)
+            if self._ordered(name):
+                bandwidth = max(0.5, k / (len(obs) ** 0.5 + 1))
+                grid = np.arange(k)[:, None]
+                kernel = np.exp(-0.5 * ((grid - obs[None, :]) / bandwidth) ** 2)
+                kernel /= kernel.sum(axis=0, keepdims=True)
+                weights += kernel.sum(axis=1)
+            else:
+                weights += np.bincount(obs, minlength=k)
+        return weights / weights.sum()
+
+    def _excluded(self, idx) -> bool:
+        return self.excluded is not None and self.excluded(self.config(idx))
+
+    def _random(self):
+        return tuple(int(self.rng.integers(len(self.space[n]))) for n in self.names)
+
+    def ask(self, n: int) -> List[tuple]:
+        """n new (not yet proposed) configs as choice-index tuples"""
+        size = math.prod(len(v) for v in self.space.values())
+        n = min(n, size - len(self.seen))
+        proposals = []
+        tries = 0
+        while len(proposals) < n and len(self.seen) < size:
+            if len(self.observed) < self.n_startup:
+                idx = self._random()
+            else:
+                idx = self._propose()
+            tries += 1
+            if idx in self.seen:
+                if tries > 50 * max(n, 1):
+                    idx = self._random()  # model keeps hitting evaluated points
+                if idx in self.seen:
+                    continue
+            self.seen.add(idx)
+            if self._excluded(idx):
+                continue  # stays in seen, so it's never drawn again
+            proposals.append(idx)
+        return proposals
+
+    def _propose(self) -> tuple:
+        ranked = sorted(self.observed, key=lambda o: o[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(ranked))))
+        good = [o[0] for o in ranked[:n_good]]
+        bad = [o[0] for o in ranked[n_good:]]
+
+        candidates = np.empty((self.n_candidates, len(self.names)), dtype=np.int64)
+        log_ratio = np.zeros(self.n_candidates)
+        for d, name in enumerate(self.names):
+            l = self._density(name, [g[d] for g in good])
+            g = self._density(name, [b[d] for b in bad])
+            picks = self.rng.choice(len(l), size=self.n_candidates, p=l)
+            candidates[:, d] = picks
+            log_ratio += np.log(l[picks]) - np.log(g[picks])
+
+        # Best unseen, allowed candidate, else the best overall (ask() handles repeats)
+        for i in np.argsort(-log_ratio, kind='stable'):
+            idx = tuple(int(v) for v in candidates[i])
+            if idx not in self.seen and not self._excluded(idx):
+                return idx
+        return tuple(int(v) for v in candidates[int(np.argmax(log_ratio))])
+
+
+def objective(key: tuple) -> float:
+    """search.score() key as one number: primary value, mean win rate as tie-break (< 0.1)"""
+    value, mean_wr = key
+    return value + mean_wr / 1000
+
+
+def optimize(evaluator: Evaluator, space: Dict[str, list], fixed: Optional[dict] = None,
+             evaluations: int = 400, batch: Optional[int] = None, seed: int = 0,
+             best: Optional[SearchResult] = None, verbose: bool = True,
+             excluded: Optional[Callable[[dict], bool]] = None) -> SearchResult:
+    """
+    Run TPE until `evaluations` configs have been tried (each on every asset).
+    Configs matching `excluded` are skipped without being evaluated.
+    result.history holds (backtests spent, best passing) after every config.
+    """
+    tpe = TPE(space, fixed, seed=seed, excluded=excluded)
+    if best is None:
+        best = SearchResult(evaluator.assets)
+    batch = batch or max(4, evaluator.processes * 2)
+
+    done = 0
+    while done < evaluations:
+        proposals = tpe.ask(min(batch, evaluations - done))
+        if not proposals:
+            break  # whole space evaluated
+        configs = [tpe.config(idx) for idx in proposals]
+        for idx, params, res in zip(proposals, configs, evaluator.evaluate(configs)):
+            tpe.tell(idx, objective(best.score(res)))
+            best.offer(params, res, evaluator.backtests, verbose)
+        done += len(proposals)
+
+    best.backtests = evaluator.backtests
+    return best
+
+
+# Finer than the task_15m.md / task_5m.md grids: ~1.1M points
+SPACE = {
+    'zz_depth': [2, 3, 4, 5, 6, 7],
+    'zz_dev': [0.1, 0.2, 0.3, 0.5],
+    'fib_entry_level': [0.5, 0.55, 0.618, 0.65, 0.7, 0.75, 0.786, 0.82, 0.85, 0.9],
+    'fib_tolerance': [0.02, 0.03, 0.05, 0.08, 0.10, 0.12, 0.15],
+    'rsi_threshold': [25, 30, 35, 40, 45, 50],
+    'signal_gap': [2, 3, 5, 7, 10],
+    'use_trend_filter': [True, False],
+    'ema_period': [50, 100, 200],
+    'use_volume_filter': [True, False],
+    'use_rsi_filter': [True, False],
+}
+FIXED = {'rr_ratio': 1.0}
+
+
+if __name__ == '__main__':
+    timeframe = sys.argv[1] if len(sys.argv) > 1 else '15m'
+    evaluations = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+
+    files = timeframe_files(timeframe)
+    DATA = load_datasets(files)
+    print(f"Loaded {len(DATA)} {timeframe} assets", flush=True)
+    print(f"TPE: {evaluations} evaluations, seed={seed}", flush=True)
+
+    start = time.time()
+    run = ResultsDB().start_run(f"tpe:seed={seed}", timeframe)
+    with Evaluator(DATA, chunk=1, run=run) as evaluator:
+        best = optimize(evaluator, SPACE, FIXED, evaluations=evaluations, seed=seed)
+    report(best, list(files), time.time() - start)
+
+    print("\nBest passing vs evaluations:", flush=True)
+    step = max(1, len(best.history) // 10)
+    for i in list(range(step - 1, len(best.history), step)):
+        print(f"  {i + 1:5d} configs ({best.history[i][0]} backtests): {best.history[i][1]}/{len(DATA)}", flush=True)
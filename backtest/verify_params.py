@@ -8,9 +8,10 @@ sys.path.append(os.path.dirname(__file__))
 from backtester import ElliottICTBacktester, load_data
 import glob
 
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
 def verify_tf(tf_name, pattern, expected_params):
-    data_dir = r'C:\Users\danie\projects\elliott-wave-indicator\data'
-    files = glob.glob(os.path.join(data_dir, pattern))
+    files = glob.glob(os.path.join(DATA_DIR, pattern))
     
     if not files:
         print(f"No files for {tf_name}")
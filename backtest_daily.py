@@ -2,23 +2,12 @@
 Elliott Wave Optimizer - Daily Timeframe
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from itertools import product
 import warnings
 warnings.filterwarnings('ignore')
 
-print("Downloading NQ Daily data...")
-ticker = yf.Ticker("NQ=F")
-df = ticker.history(period="5y", interval="1d")
-print(f"Downloaded {len(df)} bars")
-
-opens = df['Open'].values
-highs = df['High'].values
-lows = df['Low'].values
-closes = df['Close'].values
-
 def find_zigzag(highs, lows, depth=10, deviation=2.0):
     pivots = []
     direction = 0
@@ -67,7 +56,22 @@ def find_zigzag(highs, lows, depth=10, deviation=2.0):
     
     return pivots
 
-def backtest(params):
+def load_data():
+    """Download NQ daily bars from Yahoo Finance; returns the arrays backtest() takes, by name"""
+    import yfinance as yf
+    print("Downloading NQ Daily data...")
+    ticker = yf.Ticker("NQ=F")
+    df = ticker.history(period="5y", interval="1d")
+    print(f"Downloaded {len(df)} bars")
+
+    opens = df['Open'].values
+    highs = df['High'].values
+    lows = df['Low'].values
+    closes = df['Close'].values
+
+    return {'opens': opens, 'highs': highs, 'lows': lows, 'closes': closes}
+
+def backtest(params, opens, highs, lows, closes):
     min_strength = params['min_strength']
     sl_pct = params['sl_pct']
     tp_fib = params['tp_fib']
@@ -171,46 +175,53 @@ param_grid = {
     'signal_gap': [3, 5, 7]
 }
 
-keys = param_grid.keys()
-values = param_grid.values()
-combinations = [dict(zip(keys, v)) for v in product(*values)]
+def main():
+    data = load_data()
 
-print(f"\nTesting {len(combinations)} combinations for DAILY...\n")
+    keys = param_grid.keys()
+    values = param_grid.values()
+    combinations = [dict(zip(keys, v)) for v in product(*values)]
 
-results = []
-best_result = None
-best_win_rate = 0
+    print(f"\nTesting {len(combinations)} combinations for DAILY...\n")
 
-for i, params in enumerate(combinations):
-    result = backtest(params)
-    results.append(result)
-    
-    if result['win_rate'] > best_win_rate and result['signals'] >= 5:
-        best_win_rate = result['win_rate']
-        best_result = result
-    
-    if (i + 1) % 50 == 0:
-        print(f"Progress: {i+1}/{len(combinations)}")
-
-results.sort(key=lambda x: x['win_rate'], reverse=True)
-
-print("\n" + "="*60)
-print("TOP 10 FOR DAILY TIMEFRAME")
-print("="*60)
-
-for i, r in enumerate(results[:10]):
-    if r['signals'] >= 3:
-        print(f"\n#{i+1} - Win Rate: {r['win_rate']:.1f}% ({r['wins']}/{r['wins']+r['losses']})")
-        print(f"   Signals: {r['signals']}")
-        print(f"   Params: min_str={r['params']['min_strength']}, SL={r['params']['sl_pct']}%, TP={r['params']['tp_fib']}")
-        print(f"           zz_depth={r['params']['zz_depth']}, gap={r['params']['signal_gap']}")
-
-print("\n" + "="*60)
-print("BEST DAILY RESULT")
-print("="*60)
-if best_result:
-    print(f"Win Rate: {best_result['win_rate']:.1f}%")
-    print(f"Signals: {best_result['signals']} ({best_result['wins']} wins, {best_result['losses']} losses)")
-    print(f"\nOptimal Daily Parameters:")
-    for k, v in best_result['params'].items():
-        print(f"  {k}: {v}")
+    results = []
+    best_result = None
+    best_win_rate = 0
+
+    for i, params in enumerate(combinations):
+        result = backtest(params, **data)
+        results.append(result)
+
+        if result['win_rate'] > best_win_rate and result['signals'] >= 5:
+            best_win_rate = result['win_rate']
+            best_result = result
+
+        if (i + 1) % 50 == 0:
+            print(f"Progress: {i+1}/{len(combinations)}")
+
+    results.sort(key=lambda x: x['win_rate'], reverse=True)
+
+    print("\n" + "="*60)
+    print("TOP 10 FOR DAILY TIMEFRAME")
+    print("="*60)
+
+    for i, r in enumerate(results[:10]):
+        if r['signals'] >= 3:
+            print(f"\n#{i+1} - Win Rate: {r['win_rate']:.1f}% ({r['wins']}/{r['wins']+r['losses']})")
+            print(f"   Signals: {r['signals']}")
+            print(f"   Params: min_str={r['params']['min_strength']}, SL={r['params']['sl_pct']}%, TP={r['params']['tp_fib']}")
+            print(f"           zz_depth={r['params']['zz_depth']}, gap={r['params']['signal_gap']}")
+
+    print("\n" + "="*60)
+    print("BEST DAILY RESULT")
+    print("="*60)
+    if best_result:
+        print(f"Win Rate: {best_result['win_rate']:.1f}%")
+        print(f"Signals: {best_result['signals']} ({best_result['wins']} wins, {best_result['losses']} losses)")
+        print(f"\nOptimal Daily Parameters:")
+        for k, v in best_result['params'].items():
+            print(f"  {k}: {v}")
+
+
+if __name__ == '__main__':
+    main()
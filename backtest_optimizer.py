@@ -3,24 +3,16 @@ Elliott Wave + ICT Parameter Optimizer
 Downloads historical data and tests different parameter combinations
 """
 
-import yfinance as yf
+import os
+import sys
 import pandas as pd
 import numpy as np
 from itertools import product
 import warnings
 warnings.filterwarnings('ignore')
 
-# Download data
-print("Downloading NQ data...")
-ticker = yf.Ticker("NQ=F")  # Nasdaq futures
-df = ticker.history(period="2y", interval="4h")
-print(f"Downloaded {len(df)} bars")
-
-# Convert to simple arrays for speed
-opens = df['Open'].values
-highs = df['High'].values
-lows = df['Low'].values
-closes = df['Close'].values
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backtest'))
+from pivots import find_pivots
 
 def find_zigzag(highs, lows, depth=10, deviation=2.0):
     """Find zigzag pivots"""
@@ -28,20 +20,11 @@ def find_zigzag(highs, lows, depth=10, deviation=2.0):
     direction = 0
     last_price = 0
     
-    for i in range(depth, len(highs) - depth):
-        # Check for pivot high
-        is_ph = True
-        for j in range(1, depth + 1):
-            if highs[i] <= highs[i-j] or highs[i] <= highs[i+j]:
-                is_ph = False
-                break
-        
-        # Check for pivot low
-        is_pl = True
-        for j in range(1, depth + 1):
-            if lows[i] >= lows[i-j] or lows[i] >= lows[i+j]:
-                is_pl = False
-                break
+    ph_mask, pl_mask = find_pivots(highs, lows, depth)
+    
+    for i in np.flatnonzero(ph_mask | pl_mask).tolist():
+        is_ph = ph_mask[i]
+        is_pl = pl_mask[i]
         
         if is_ph:
             if direction == -1 and last_price > 0:
@@ -73,7 +56,24 @@ def find_zigzag(highs, lows, depth=10, deviation=2.0):
     
     return pivots
 
-def backtest(params):
+def load_data():
+    """Download NQ 4H bars from Yahoo Finance; returns the arrays backtest() takes, by name"""
+    import yfinance as yf
+    # Download data
+    print("Downloading NQ data...")
+    ticker = yf.Ticker("NQ=F")  # Nasdaq futures
+    df = ticker.history(period="2y", interval="4h")
+    print(f"Downloaded {len(df)} bars")
+
+    # Convert to simple arrays for speed
+    opens = df['Open'].values
+    highs = df['High'].values
+    lows = df['Low'].values
+    closes = df['Close'].values
+
+    return {'opens': opens, 'highs': highs, 'lows': lows, 'closes': closes}
+
+def backtest(params, opens, highs, lows, closes):
     """Run backtest with given parameters"""
     min_strength = params['min_strength']
     sl_pct = params['sl_pct']
@@ -186,52 +186,59 @@ param_grid = {
     'signal_gap': [10, 15, 20]
 }
 
-# Generate all combinations
-keys = param_grid.keys()
-values = param_grid.values()
-combinations = [dict(zip(keys, v)) for v in product(*values)]
+def main():
+    data = load_data()
 
-print(f"\nTesting {len(combinations)} parameter combinations...\n")
+    # Generate all combinations
+    keys = param_grid.keys()
+    values = param_grid.values()
+    combinations = [dict(zip(keys, v)) for v in product(*values)]
 
-results = []
-best_result = None
-best_win_rate = 0
+    print(f"\nTesting {len(combinations)} parameter combinations...\n")
 
-for i, params in enumerate(combinations):
-    result = backtest(params)
-    results.append(result)
-    
-    # Track best
-    if result['win_rate'] > best_win_rate and result['signals'] >= 10:
-        best_win_rate = result['win_rate']
-        best_result = result
-    
-    # Progress
-    if (i + 1) % 50 == 0:
-        print(f"Progress: {i+1}/{len(combinations)}")
-
-# Sort by win rate
-results.sort(key=lambda x: x['win_rate'], reverse=True)
-
-# Print top 10
-print("\n" + "="*60)
-print("TOP 10 PARAMETER COMBINATIONS")
-print("="*60)
-
-for i, r in enumerate(results[:10]):
-    if r['signals'] >= 5:  # Only show if enough signals
-        print(f"\n#{i+1} - Win Rate: {r['win_rate']:.1f}% ({r['wins']}/{r['wins']+r['losses']})")
-        print(f"   Signals: {r['signals']}")
-        print(f"   Params: min_str={r['params']['min_strength']}, SL={r['params']['sl_pct']}%, TP={r['params']['tp_fib']}")
-        print(f"           zz_depth={r['params']['zz_depth']}, gap={r['params']['signal_gap']}")
-
-# Best overall
-print("\n" + "="*60)
-print("BEST RESULT (min 10 signals)")
-print("="*60)
-if best_result:
-    print(f"Win Rate: {best_result['win_rate']:.1f}%")
-    print(f"Signals: {best_result['signals']} ({best_result['wins']} wins, {best_result['losses']} losses)")
-    print(f"\nOptimal Parameters:")
-    for k, v in best_result['params'].items():
-        print(f"  {k}: {v}")
+    results = []
+    best_result = None
+    best_win_rate = 0
+
+    for i, params in enumerate(combinations):
+        result = backtest(params, **data)
+        results.append(result)
+
+        # Track best
+        if result['win_rate'] > best_win_rate and result['signals'] >= 10:
+            best_win_rate = result['win_rate']
+            best_result = result
+
+        # Progress
+        if (i + 1) % 50 == 0:
+            print(f"Progress: {i+1}/{len(combinations)}")
+
+    # Sort by win rate
+    results.sort(key=lambda x: x['win_rate'], reverse=True)
+
+    # Print top 10
+    print("\n" + "="*60)
+    print("TOP 10 PARAMETER COMBINATIONS")
+    print("="*60)
+
+    for i, r in enumerate(results[:10]):
+        if r['signals'] >= 5:  # Only show if enough signals
+            print(f"\n#{i+1} - Win Rate: {r['win_rate']:.1f}% ({r['wins']}/{r['wins']+r['losses']})")
+            print(f"   Signals: {r['signals']}")
+            print(f"   Params: min_str={r['params']['min_strength']}, SL={r['params']['sl_pct']}%, TP={r['params']['tp_fib']}")
+            print(f"           zz_depth={r['params']['zz_depth']}, gap={r['params']['signal_gap']}")
+
+    # Best overall
+    print("\n" + "="*60)
+    print("BEST RESULT (min 10 signals)")
+    print("="*60)
+    if best_result:
+        print(f"Win Rate: {best_result['win_rate']:.1f}%")
+        print(f"Signals: {best_result['signals']} ({best_result['wins']} wins, {best_result['losses']} losses)")
+        print(f"\nOptimal Parameters:")
+        for k, v in best_result['params'].items():
+            print(f"  {k}: {v}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,23 +2,12 @@
 Realistic Backtest - Entry must be touched before TP/SL
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from itertools import product
 import warnings
 warnings.filterwarnings('ignore')
 
-print("Downloading NQ 4H data...")
-ticker = yf.Ticker("NQ=F")
-df = ticker.history(period="2y", interval="4h")
-print(f"Downloaded {len(df)} bars")
-
-opens = df['Open'].values
-highs = df['High'].values
-lows = df['Low'].values
-closes = df['Close'].values
-
 def find_zigzag(highs, lows, depth=12, deviation=2.0):
     pivots = []
     direction = 0
@@ -40,9 +29,24 @@ def find_zigzag(highs, lows, depth=12, deviation=2.0):
     
     return pivots
 
-pivots = find_zigzag(highs, lows, 12, 2.0)
+def load_data():
+    """Download NQ 4H bars from Yahoo Finance; returns the arrays backtest() takes, by name"""
+    import yfinance as yf
+    print("Downloading NQ 4H data...")
+    ticker = yf.Ticker("NQ=F")
+    df = ticker.history(period="2y", interval="4h")
+    print(f"Downloaded {len(df)} bars")
+
+    opens = df['Open'].values
+    highs = df['High'].values
+    lows = df['Low'].values
+    closes = df['Close'].values
+
+    pivots = find_zigzag(highs, lows, 12, 2.0)
 
-def backtest(params):
+    return {'opens': opens, 'highs': highs, 'lows': lows, 'closes': closes, 'pivots': pivots}
+
+def backtest(params, opens, highs, lows, closes, pivots):
     min_strength = params['min_strength']
     sl_pct = params['sl_pct']
     tp_fib = params['tp_fib']
@@ -150,40 +154,47 @@ param_grid = {
     'signal_gap': [8, 10, 12, 15]
 }
 
-combinations = [dict(zip(param_grid.keys(), v)) for v in product(*param_grid.values())]
-print(f"\nTesting {len(combinations)} combinations with REALISTIC backtest...\n")
-
-results = []
-best = None
-
-for i, params in enumerate(combinations):
-    result = backtest(params)
-    results.append(result)
-    if result['win_rate'] > (best['win_rate'] if best else 0) and result['wins'] + result['losses'] >= 10:
-        best = result
-    if (i + 1) % 100 == 0:
-        print(f"Progress: {i+1}/{len(combinations)}")
-
-results.sort(key=lambda x: (x['win_rate'], x['wins']), reverse=True)
-
-print("\n" + "="*70)
-print("TOP 10 - REALISTIC BACKTEST (Entry must be touched)")
-print("="*70)
-
-for i, r in enumerate(results[:10]):
-    if r['wins'] + r['losses'] >= 5:
-        p = r['params']
-        print(f"\n#{i+1} Win Rate: {r['win_rate']:.1f}% ({r['wins']}W / {r['losses']}L)")
-        print(f"   Signals: {r['signals']}, Not filled/open: {r['not_filled']}")
-        print(f"   min_str={p['min_strength']}, SL={p['sl_pct']}%, TP={p['tp_fib']}, gap={p['signal_gap']}")
-
-print("\n" + "="*70)
-print("BEST REALISTIC CONFIGURATION")
-print("="*70)
-if best:
-    print(f"\nWin Rate: {best['win_rate']:.1f}%")
-    print(f"Trades: {best['wins']}W / {best['losses']}L (total: {best['wins']+best['losses']})")
-    print(f"Signals: {best['signals']}, Not executed: {best['not_filled']}")
-    print(f"\nOptimal Parameters:")
-    for k, v in best['params'].items():
-        print(f"  {k}: {v}")
+def main():
+    data = load_data()
+
+    combinations = [dict(zip(param_grid.keys(), v)) for v in product(*param_grid.values())]
+    print(f"\nTesting {len(combinations)} combinations with REALISTIC backtest...\n")
+
+    results = []
+    best = None
+
+    for i, params in enumerate(combinations):
+        result = backtest(params, **data)
+        results.append(result)
+        if result['win_rate'] > (best['win_rate'] if best else 0) and result['wins'] + result['losses'] >= 10:
+            best = result
+        if (i + 1) % 100 == 0:
+            print(f"Progress: {i+1}/{len(combinations)}")
+
+    results.sort(key=lambda x: (x['win_rate'], x['wins']), reverse=True)
+
+    print("\n" + "="*70)
+    print("TOP 10 - REALISTIC BACKTEST (Entry must be touched)")
+    print("="*70)
+
+    for i, r in enumerate(results[:10]):
+        if r['wins'] + r['losses'] >= 5:
+            p = r['params']
+            print(f"\n#{i+1} Win Rate: {r['win_rate']:.1f}% ({r['wins']}W / {r['losses']}L)")
+            print(f"   Signals: {r['signals']}, Not filled/open: {r['not_filled']}")
+            print(f"   min_str={p['min_strength']}, SL={p['sl_pct']}%, TP={p['tp_fib']}, gap={p['signal_gap']}")
+
+    print("\n" + "="*70)
+    print("BEST REALISTIC CONFIGURATION")
+    print("="*70)
+    if best:
+        print(f"\nWin Rate: {best['win_rate']:.1f}%")
+        print(f"Trades: {best['wins']}W / {best['losses']}L (total: {best['wins']+best['losses']})")
+        print(f"Signals: {best['signals']}, Not executed: {best['not_filled']}")
+        print(f"\nOptimal Parameters:")
+        for k, v in best['params'].items():
+            print(f"  {k}: {v}")
+
+
+if __name__ == '__main__':
+    main()